@@ -1,213 +1,624 @@
 import os
 import sys
+import csv
+import json
+import time
+import atexit
+import argparse
 import logging
-import requests
+import threading
+from lazy import LazyResource, startup_profiler
+from log_pipeline import setup_logging
+from tracing import tracer
+import httpx
 from dotenv import load_dotenv
 import speech_recognition as sr
-import pyttsx3
-import spacy
-import dateparser
-from datetime import datetime, timedelta
-from notion_client import Client as NotionClient, APIResponseError
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QListWidget, QTabWidget, QStatusBar
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QListView, QComboBox, QLineEdit, QTabWidget, QStatusBar, QAction
 )
-from PyQt5.QtCore import QThread, pyqtSignal, QObject
-from spacy.matcher import Matcher
-from time import sleep
+from PyQt5.QtCore import QThread, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer
+from task_store import TaskStore, LOCAL_ID_PREFIX
+from journal import Journal
+from event_store import EventStore, sync_events, resolve_time_window
+from ttl_cache import TTLCache
+from time_parser import TimeResolver
+from async_services import service_loop, pooled_client
+from resilience import ServicePolicy, ServiceUnavailable, error_status
+from write_queue import WriteQueue
+from speech_pipeline import RecognizerBackend, FallbackBackend, SpeechPipeline, PerUtteranceCapture
+from speech_output import SpeechOutput, combine_items
+from nlu import CommandParser
+from intent_registry import IntentRegistry, plugin_modules
+from prefetch import PrefetchScheduler
+from google_service import GoogleServiceFactory, SCOPES
+from context_store import ContextStore
+from slot_filling import SlotFiller
+from list_models import RecordListModel
+from search_index import SearchIndex
+from records import Task, Event, Priority
+
+# spaCy, pyttsx3, dateparser and the Google client libraries are imported where they
+# are first used, so the window can appear before they finish loading.
+startup_profiler.record("module imports", startup_profiler.origin, time.perf_counter())
 
 # Load environment variables from .env file
 load_dotenv(dotenv_path='myenv/.env')
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Changed to DEBUG level for detailed logs
-    filename='assistant.log',
-    format='%(asctime)s %(levelname)s:%(message)s'
+# Configure logging; set LOG_LEVEL=DEBUG for detailed logs. Records are written by a background thread.
+setup_logging(
+    os.getenv("LOG_FILE", "assistant.log"),
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    max_bytes=int(os.getenv("LOG_MAX_BYTES", "5000000")),
+    backups=int(os.getenv("LOG_BACKUPS", "5")),
+    compress=os.getenv("LOG_COMPRESS", "1") != "0",
+    json_format=os.getenv("LOG_FORMAT", "text").lower() == "json",
+    debug_sample=int(os.getenv("LOG_DEBUG_SAMPLE", "1")),
 )
 
-# Initialize spaCy NLP model
-nlp = spacy.load("en_core_web_sm")
-
-# Define the scope for Google Calendar
-SCOPES = ['https://www.googleapis.com/auth/calendar']
-
-# Retry decorator for network requests
-def retry(exceptions, tries=3, delay=1, backoff=2):
-    def decorator_retry(func):
-        def wrapper_retry(*args, **kwargs):
-            _tries, _delay = tries, delay
-            while _tries > 1:
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    logging.error(f"Error: {e}. Retrying in {_delay} seconds...")
-                    sleep(_delay)
-                    _tries -= 1
-                    _delay *= backoff
-            return func(*args, **kwargs)
-        return wrapper_retry
-    return decorator_retry
+def load_spacy_model():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+def init_tts_engine():
+    import pyttsx3
+    engine = pyttsx3.init()
+    # Set up speech rate for clarity
+    engine.setProperty('rate', 150)
+    return engine
+
+# spaCy NLP model, loaded on first use or warmed in the background
+nlp = LazyResource("spaCy model", load_spacy_model)
+
+# Resolves spoken times in ASSISTANT_TIMEZONE, or the system timezone when unset
+time_resolver = TimeResolver(os.getenv("ASSISTANT_TIMEZONE"))
+
+# Intents come from plugin modules, which are imported when one of their intents is first used
+intent_registry = IntentRegistry(plugin_modules(), os.getenv("INTENT_CACHE_PATH", "intent_cache.json"))
+
+def make_google_services():
+    """Google API client factory, tuned by the GOOGLE_DISCOVERY_CACHE and GOOGLE_TOKEN_REFRESH_MARGIN settings."""
+    return GoogleServiceFactory(
+        SCOPES,
+        cache_dir=os.getenv("GOOGLE_DISCOVERY_CACHE", ".discovery_cache"),
+        refresh_margin=float(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", "300")),
+    )
+
+# One Google Calendar client with a shared transport and a token renewed in the background
+google_services = make_google_services()
+
+def make_policy(name, transient=()):
+    """Circuit breaker and retry policy for one service, tuned by the BREAKER_* and RETRY_* settings."""
+    return ServicePolicy(
+        name, transient,
+        tries=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+        max_retry_after=float(os.getenv("RETRY_MAX_WAIT", "30")),
+        failure_threshold=int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5")),
+        reset_timeout=float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+    )
+
+def search_vectors():
+    """Word vector lookup for fuzzy search, when SEARCH_VECTORS is set and the spaCy model has vectors."""
+    if not os.getenv("SEARCH_VECTORS"):
+        return None
+
+    def lookup(word):
+        vocab = nlp.get().vocab
+        return vocab.get_vector(word) if vocab.has_vector(word) else None
+    return lookup
 
 class NotionManager:
-    def __init__(self):
-        self.notion = NotionClient(auth=os.getenv("NOTION_API_KEY"))
+    def __init__(self, base_url=None):
+        # The Notion client library is only imported once a Notion intent needs it
+        import notion_client
+        from notion_client import AsyncClient as NotionClient, RequestTimeoutError
+        # One pooled async client; calls from any thread run on the shared service loop
+        max_concurrency = int(os.getenv("NOTION_MAX_CONCURRENCY", "3"))
+        # notion-client 3 retries on its own; leave retrying to the service policy
+        options = {'retry': False} if hasattr(notion_client, 'RetryOptions') else {}
+        # Another API root, e.g. a local fake server in tests
+        base_url = base_url or os.getenv("NOTION_BASE_URL")
+        if base_url:
+            options['base_url'] = base_url
+        self.notion = NotionClient(auth=os.getenv("NOTION_API_KEY"), client=pooled_client(max_concurrency), **options)
+        self.semaphore = service_loop.semaphore(max_concurrency)
+        self.policy = make_policy("Notion", (httpx.TransportError, RequestTimeoutError))
         self.database_id = os.getenv("NOTION_DATABASE_ID")
+        # A rich text property that stores each task's idempotency key, so a replay never duplicates a page
+        self.idempotency_property = os.getenv("NOTION_IDEMPOTENCY_PROPERTY")
+        path = os.getenv("TASK_STORE_PATH", "assistant.db")
+        self.index = SearchIndex(lambda task: f"{task.name} {task.type}", search_vectors())
+        self.index_loaded = False
+        # Called with (tasks, removed_ids, full) for every change to the task list; see add_listener
+        self.listeners = []
+        self.change_lock = threading.Lock()
+        self.store = TaskStore(path, on_change=self.update_index)
+        self.journal = Journal(path)
+        self.journal.prune(float(os.getenv("JOURNAL_RETENTION", "604800")))
+        # Seconds between incremental syncs, and between full resyncs that drop deleted pages
+        self.sync_interval = float(os.getenv("TASK_SYNC_INTERVAL", "30"))
+        self.full_sync_interval = float(os.getenv("TASK_FULL_SYNC_INTERVAL", "86400"))
+        # Seconds a read waits for a sync before answering from the local snapshot
+        self.sync_wait = float(os.getenv("SYNC_WAIT", "2"))
+        self.sync_lock = threading.Lock()
+        self.sync_thread_lock = threading.Lock()
+        self.sync_thread = None
+        self.sync_error = None
+        self.last_sync = 0.0
+        # Notion allows an average of three requests per second per integration
+        self.write_queue = WriteQueue(
+            self.journal, 'task', self.replay_task,
+            rate=float(os.getenv("NOTION_WRITE_RATE", "3")),
+            workers=int(os.getenv("NOTION_WRITE_WORKERS", "3")),
+            name="notion-writer", on_applied=self.task_applied, policy=self.policy, on_failed=self.task_failed
+        )
+        self.write_queue.start()
 
-    @retry((APIResponseError, requests.exceptions.RequestException))
     def add_task(self, task_name, task_type, priority='normal'):
-        """Add a task to Notion with name, type, and priority."""
+        """Journal a task locally and replay it to Notion without waiting on the API."""
         try:
-            self.notion.pages.create(
-                parent={"database_id": self.database_id},
-                properties={
-                    "Name": {"title": [{"text": {"content": task_name}}]},
-                    "Type": {"rich_text": [{"text": {"content": task_type}}]},
-                    "Priority": {"select": {"name": priority.capitalize()}}
-                }
-            )
-            return True, "Task added to Notion successfully!"
+            payload = {'name': task_name, 'type': task_type, 'priority': priority}
+            key = self.write_queue.enqueue(payload)
+            self.notify([self.local_task(key, payload, time.time())], [])
+            return True, "Task added. It will be synced to Notion in the background."
         except Exception as e:
             logging.exception("Failed to add task.")
             return False, "Failed to add task due to an error."
 
-    @retry((APIResponseError, requests.exceptions.RequestException))
-    def read_tasks(self):
-        """Retrieve tasks from Notion and return them as a list."""
+    def bulk_add_tasks(self, tasks):
+        """Queue many (name, type, priority) tasks in one local transaction."""
         try:
-            response = self.notion.databases.query(database_id=self.database_id)
-            tasks = response.get("results", [])
-            if not tasks:
-                return False, "There are no tasks in your Notion database."
-
-            task_list = []
-            for task in tasks:
-                name_property = task["properties"]["Name"]["title"]
-                type_property = task["properties"]["Type"]["rich_text"]
-                priority_property = task["properties"].get("Priority", {}).get("select", {})
-                task_name = name_property[0]["text"]["content"] if name_property else "Unnamed Task"
-                task_type = type_property[0]["text"]["content"] if type_property else "No Type Specified"
-                priority = priority_property.get("name", "Normal")
-                task_details = f"Task: {task_name}, Type: {task_type}, Priority: {priority}."
-                task_list.append(task_details)
-            return True, task_list
+            payloads = [{'name': name, 'type': task_type or "General", 'priority': priority or "normal"}
+                        for name, task_type, priority in tasks]
+            keys = self.write_queue.enqueue_many(payloads)
+            now = time.time()
+            self.notify([self.local_task(key, payload, now) for key, payload in zip(keys, payloads)], [])
+            return True, f"{len(payloads)} tasks queued for Notion."
         except Exception as e:
-            logging.exception("Failed to read tasks from Notion.")
-            return False, "Failed to read tasks from Notion due to an error."
+            logging.exception("Failed to queue tasks.")
+            return False, "Failed to add tasks due to an error."
 
-class CalendarManager:
-    def __init__(self):
-        self.service = self.get_calendar_service()
+    def import_tasks_from_file(self, path):
+        """Queue tasks from a CSV file (name, type, priority columns) or a JSON/JSON Lines file."""
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                if path.endswith('.csv'):
+                    rows = list(csv.DictReader(f))
+                elif path.endswith('.jsonl'):
+                    rows = [json.loads(line) for line in f if line.strip()]
+                else:
+                    rows = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.exception("Failed to read task import file.")
+            return False, f"Could not read tasks from {path}."
+        return self.bulk_add_tasks(
+            (row["name"], row.get("type"), row.get("priority")) for row in rows if row.get("name")
+        )
 
-    def authenticate_google_calendar(self):
-        creds = None
-        if os.path.exists('token.json'):
-            try:
-                creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-            except Exception as e:
-                logging.error("Invalid token.json file.")
-                creds = None
-        if not creds or not creds.valid:
+    def replay_task(self, entry):
+        """Create the Notion page for a journaled task; errors propagate to the write queue."""
+        page = None
+        if entry.attempts and self.idempotency_property:
+            # An earlier send, even from a run that crashed, may have reached Notion before its response was lost
+            page = self.find_page(entry.key)
+        if page is None:
+            task = entry.payload
+            page = self.create_page(task['name'], task['type'], task['priority'], entry.key)
+        self.store.upsert_pages([page])
+        return page["id"]
+
+    def task_applied(self, entry, page_id):
+        # The page itself reached the list through the store; drop its local stand-in
+        self.notify([], [LOCAL_ID_PREFIX + entry.key])
+
+    def task_failed(self, entry, error):
+        # Notion rejected the task, so it will never get a page; stop showing it as pending
+        self.notify([], [LOCAL_ID_PREFIX + entry.key])
+
+    def find_page(self, key):
+        """Return the page created for an idempotency key, or None."""
+        response = self.query_database(
+            database_id=self.database_id, page_size=1,
+            filter={"property": self.idempotency_property, "rich_text": {"equals": key}}
+        )
+        results = response.get("results", [])
+        return results[0] if results else None
+
+    def create_page(self, task_name, task_type, priority, key=None):
+        return service_loop.run(self.create_page_async(task_name, task_type, priority, key))
+
+    @tracer.traced('api', 'notion.create')
+    async def create_page_async(self, task_name, task_type, priority, key=None):
+        properties = {
+            "Name": {"title": [{"text": {"content": task_name}}]},
+            "Type": {"rich_text": [{"text": {"content": task_type}}]},
+            "Priority": {"select": {"name": priority.capitalize()}}
+        }
+        if key and self.idempotency_property:
+            properties[self.idempotency_property] = {"rich_text": [{"text": {"content": key}}]}
+
+        async def create():
+            async with self.semaphore:
+                return await self.notion.pages.create(
+                    parent={"database_id": self.database_id},
+                    properties=properties
+                )
+        # The write queue does its own retrying, so this only goes through the breaker
+        return await self.policy.run_async(create, tries=1)
+
+    def query_pages(self, query_filter=None):
+        """Yield every page of the database, following start_cursor pagination."""
+        cursor = None
+        while True:
+            kwargs = {"database_id": self.database_id, "page_size": 100}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            if query_filter:
+                kwargs["filter"] = query_filter
+            response = self.query_database(**kwargs)
+            yield from response.get("results", [])
+            if not response.get("has_more"):
+                break
+            cursor = response.get("next_cursor")
+
+    def query_database(self, **kwargs):
+        return service_loop.run(self.query_database_async(**kwargs))
+
+    @tracer.traced('api', 'notion.query')
+    async def query_database_async(self, **kwargs):
+        async def query():
+            async with self.semaphore:
+                if hasattr(self.notion.databases, 'query'):
+                    return await self.notion.databases.query(**kwargs)
+                # notion-client 3 dropped databases.query; the endpoint is still there
+                body = dict(kwargs)
+                return await self.notion.request(path=f"databases/{body.pop('database_id')}/query",
+                                                 method="POST", body=body)
+        return await self.policy.run_async(query)
+
+    def sync_tasks(self, full=False):
+        """Pull new and changed pages from Notion into the local task store."""
+        with self.sync_lock:
             try:
-                if creds and creds.expired and creds.refresh_token:
-                    creds.refresh(Request())
+                watermark = self.store.get_meta("last_edited_time")
+                last_full = float(self.store.get_meta("last_full_sync", "0"))
+                if full or not watermark or time.time() - last_full > self.full_sync_interval:
+                    logging.info("Running full Notion task sync.")
+                    newest = self.store.replace_all(self.query_pages())
+                    self.store.set_meta("last_full_sync", str(time.time()))
                 else:
-                    flow = InstalledAppFlow.from_client_secrets_file('credentials.json', SCOPES)
-                    creds = flow.run_local_server(port=0)
-                with open('token.json', 'w') as token:
-                    token.write(creds.to_json())
+                    # Notion timestamps are minute-granular, so re-read the boundary minute
+                    newest = self.store.upsert_pages(self.query_pages({
+                        "timestamp": "last_edited_time",
+                        "last_edited_time": {"on_or_after": watermark}
+                    }))
+                if newest and (not watermark or newest > watermark):
+                    self.store.set_meta("last_edited_time", newest)
+                self.last_sync = time.monotonic()
+                self.sync_error = None
+                # Notion is reachable, so journaled tasks waiting out a backoff can go now
+                self.write_queue.nudge()
+                return True, "Tasks synced with Notion."
+            except ServiceUnavailable:
+                self.sync_error = "Notion is unavailable right now."
             except Exception as e:
-                logging.exception("Failed to authenticate with Google Calendar.")
-                return None
-        return creds
+                logging.exception("Failed to sync tasks from Notion.")
+                self.sync_error = "Failed to read tasks from Notion due to an error."
+            return False, self.sync_error
 
-    def get_calendar_service(self):
-        creds = self.authenticate_google_calendar()
-        if creds:
-            try:
-                service = build('calendar', 'v3', credentials=creds)
-                return service
-            except Exception as e:
-                logging.exception("Failed to build calendar service.")
-        return None
+    def start_sync(self):
+        """Sync in a background thread unless a sync is already running. Returns the thread."""
+        with self.sync_thread_lock:
+            if self.sync_thread is None or not self.sync_thread.is_alive():
+                self.sync_thread = threading.Thread(target=self.sync_tasks, name="notion-sync", daemon=True)
+                self.sync_thread.start()
+            return self.sync_thread
+
+    def sync_due(self, within=0):
+        """True if read_tasks would sync with Notion if asked in `within` seconds."""
+        return time.monotonic() - self.last_sync + within > self.sync_interval
+
+    def pending_tasks(self):
+        """Journaled tasks Notion has not confirmed yet, newest first."""
+        return [self.local_task(entry.key, entry.payload, entry.created)
+                for entry in reversed(self.write_queue.pending())]
+
+    @staticmethod
+    def local_task(key, payload, created):
+        """The Task shown for a journaled write until Notion confirms it."""
+        return Task(LOCAL_ID_PREFIX + key, payload['name'], payload['type'], payload['priority'],
+                    datetime.fromtimestamp(created, timezone.utc).isoformat())
+
+    def read_tasks(self):
+        """Answer from the local snapshot plus unsent tasks, syncing changes from Notion when stale.
+
+        A sync gets sync_wait seconds before the snapshot is used as is, so an
+        unreachable Notion never holds up the answer once a first sync has run.
+        """
+        if self.sync_due():
+            synced_before = self.store.get_meta("last_edited_time") is not None
+            self.start_sync().join(self.sync_wait if synced_before else None)
+        tasks = self.pending_tasks() + self.store.all_tasks()
+        if not tasks:
+            return False, self.sync_error or "There are no tasks in your Notion database."
+        return True, tasks
+
+    def update_index(self, tasks, removed_ids, full=False):
+        if full:
+            self.index.replace(tasks)
+            self.index_loaded = True
+        else:
+            self.index.upsert(tasks)
+            self.index.remove(removed_ids)
+        self.notify(tasks, removed_ids, full)
+
+    def add_listener(self, listener):
+        """Call listener(tasks, removed_ids, full) whenever the task list changes.
+
+        tasks are the added or edited tasks and removed_ids the ids that went
+        away, so a view can update just those rows; after a full resync, full is
+        True and tasks is the whole list, unsent tasks included. Listeners run on
+        whichever thread made the change.
+        """
+        self.listeners.append(listener)
+
+    def notify(self, tasks, removed_ids, full=False):
+        if not self.listeners or not (tasks or removed_ids or full):
+            return
+        # Serialized, and a full list is read under the lock, so it cannot overtake a change made meanwhile
+        with self.change_lock:
+            if full:
+                tasks = self.pending_tasks() + self.store.all_tasks()
+            for listener in self.listeners:
+                listener(tasks, removed_ids, full)
+
+    def search_tasks(self, query, limit=5):
+        """Find tasks matching a query in the local index, without waiting on Notion."""
+        if not self.index_loaded:
+            # Later changes reach the index through the store's on_change hook
+            self.index.replace(self.store.all_tasks())
+            self.index_loaded = True
+        if time.monotonic() - self.last_sync > self.sync_interval:
+            self.start_sync()
+        matches = self.index.search(query, limit, extra=self.pending_tasks())
+        if not matches:
+            return False, "I couldn't find any matching tasks."
+        return True, [task for _, task in matches]
+
+class CalendarManager:
+    def __init__(self, service=None):
+        import httplib2
+        # The discovery client shares one httplib2 connection, which is not thread-safe
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.policy = make_policy("Google Calendar", (httplib2.HttpLib2Error,))
+        # Managers are built on background threads, where the browser sign-in must not start
+        self.service = service or self.get_calendar_service(interactive=False)
+        self.connect_lock = threading.Lock()
+        self.last_connect = time.monotonic()
+        path = os.getenv("TASK_STORE_PATH", "assistant.db")
+        self.index = SearchIndex(attrgetter('summary'), search_vectors())
+        self.index_loaded = False
+        self.store = EventStore(path, on_change=self.update_index)
+        self.journal = Journal(path)
+        self.sync_interval = float(os.getenv("EVENT_SYNC_INTERVAL", "30"))
+        self.sync_wait = float(os.getenv("SYNC_WAIT", "2"))
+        self.list_limit = int(os.getenv("EVENT_LIST_LIMIT", "50"))
+        self.sync_thread_lock = threading.Lock()
+        self.sync_thread = None
+        self.sync_error = None
+        self.last_sync = 0.0
+        self.write_queue = WriteQueue(self.journal, 'event', self.replay_event, rate=5, workers=2,
+                                      name="calendar-writer", policy=self.policy)
+        self.write_queue.start()
+
+    def get_calendar_service(self, interactive=True):
+        try:
+            return google_services.service('calendar', 'v3', interactive)
+        except Exception as e:
+            logging.exception("Failed to build calendar service.")
+            return None
+
+    def execute(self, request):
+        """Run a Calendar API request under the connection lock, the circuit breaker and retries."""
+        def run():
+            with self.lock:
+                return request.execute()
+        return self.policy.run(run)
+
+    def connect(self):
+        """Return the Calendar service, retrying a connection that failed (e.g. offline) once a minute."""
+        with self.connect_lock:
+            if self.service is None and time.monotonic() - self.last_connect > 60:
+                self.last_connect = time.monotonic()
+                # Never start the interactive sign-in from a background thread
+                self.service = self.get_calendar_service(interactive=False)
+            if self.service is None:
+                raise ServiceUnavailable("Google Calendar is not connected")
+            return self.service
 
-    @retry((requests.exceptions.RequestException,))
     def add_event(self, event_name, event_time, priority='normal'):
-        """Add an event to Google Calendar."""
-        if not self.service:
-            return False, "Calendar service is not available."
+        """Journal an event locally and replay it to Google Calendar without waiting on the API."""
         try:
-            start_time = event_time.isoformat()
-            end_time = (event_time + timedelta(hours=1)).isoformat()
-            event = {
+            if event_time.tzinfo is None:
+                event_time = event_time.replace(tzinfo=time_resolver.tz)
+            start = {'dateTime': event_time.isoformat()}
+            end = {'dateTime': (event_time + timedelta(hours=1)).isoformat()}
+            if time_resolver.tz_name:
+                # Lets Google show the event in the right zone across DST changes
+                start['timeZone'] = end['timeZone'] = time_resolver.tz_name
+            self.write_queue.enqueue({
                 'summary': f"[{priority.capitalize()}] {event_name}",
-                'start': {
-                    'dateTime': start_time,
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': end_time,
-                    'timeZone': 'UTC',
-                }
-            }
-            self.service.events().insert(calendarId='primary', body=event).execute()
-            return True, "Event added to your calendar successfully!"
+                'start': start,
+                'end': end
+            })
+            return True, "Event added. It will be synced to your calendar in the background."
         except Exception as e:
             logging.exception("Failed to add event.")
             return False, "Failed to add event to your calendar due to an error."
 
-    @retry((requests.exceptions.RequestException,))
-    def read_events(self):
-        """Retrieve upcoming events from Google Calendar."""
-        if not self.service:
-            return False, "Calendar service is not available."
+    @tracer.traced('api', 'calendar.insert')
+    def replay_event(self, entry):
+        """Insert a journaled event, using its key as the event id so a replay cannot create it twice."""
+        service = self.connect()
         try:
-            now = datetime.utcnow().isoformat() + 'Z'
-            events_result = self.service.events().list(
-                calendarId='primary', timeMin=now,
-                maxResults=10, singleEvents=True,
-                orderBy='startTime').execute()
-            events = events_result.get('items', [])
-            if not events:
-                return False, "No upcoming events found."
-
-            event_list = []
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                event_summary = f"Event: {event['summary']} at {start}"
-                event_list.append(event_summary)
-            return True, event_list
+            created = self.execute(service.events().insert(calendarId='primary', body=dict(entry.payload, id=entry.key)))
         except Exception as e:
-            logging.exception("Failed to read events.")
-            return False, "Failed to read events from your calendar due to an error."
+            if error_status(e) != 409:
+                raise
+            # 409 Conflict: an earlier attempt got through before its response was lost
+            created = self.execute(service.events().get(calendarId='primary', eventId=entry.key))
+        self.store.apply_changes([created])
+        return created['id']
+
+    @tracer.traced('api', 'calendar.sync')
+    def sync_events(self):
+        """Pull changed events into the local store using the saved syncToken."""
+        with self.sync_lock:
+            try:
+                count = sync_events(self.connect(), self.store, execute=self.execute)
+            except ServiceUnavailable:
+                self.sync_error = "Google Calendar is unavailable right now."
+                return
+            except Exception as e:
+                logging.exception("Failed to sync events; answering from the local store.")
+                self.sync_error = "Failed to read events from your calendar due to an error."
+                return
+            self.last_sync = time.monotonic()
+            self.sync_error = None
+        logging.debug("Calendar sync applied %s changed events.", count)
+        # Google is reachable, so journaled events waiting out a backoff can go now
+        self.write_queue.nudge()
+
+    def start_sync(self):
+        """Sync in a background thread unless a sync is already running. Returns the thread."""
+        with self.sync_thread_lock:
+            if self.sync_thread is None or not self.sync_thread.is_alive():
+                self.sync_thread = threading.Thread(target=self.sync_events, name="calendar-sync", daemon=True)
+                self.sync_thread.start()
+            return self.sync_thread
+
+    def sync_due(self, within=0):
+        """True if read_events would sync with Google Calendar if asked in `within` seconds."""
+        return time.monotonic() - self.last_sync + within > self.sync_interval
+
+    def pending_events(self):
+        """Journaled events Google has not confirmed yet."""
+        events = []
+        for entry in self.write_queue.pending():
+            event = entry.payload
+            events.append(Event(entry.key, event['summary'], datetime.fromisoformat(event['start']['dateTime']),
+                                datetime.fromisoformat(event['end']['dateTime'])))
+        return events
+
+    def read_events(self, window=None):
+        """Retrieve upcoming events, or events in a window like "tomorrow" or "next week".
+
+        Answers from the local store plus unsent events; like read_tasks, a stale
+        store gets sync_wait seconds to catch up once it has been synced before.
+        """
+        if self.sync_due():
+            synced_before = self.store.get_meta('calendar_sync_token') is not None
+            self.start_sync().join(self.sync_wait if synced_before else None)
+        now = time_resolver.now()
+        bounds = resolve_time_window(window, now) if window else None
+        if bounds:
+            events = self.store.events_between(*bounds, limit=self.list_limit)
+            pending = [event for event in self.pending_events() if event.end > bounds[0] and event.start < bounds[1]]
+        else:
+            events = self.store.upcoming(now, self.list_limit)
+            pending = [event for event in self.pending_events() if event.end > now]
+        if pending:
+            stored = {event.id for event in events}
+            events = sorted(events + [event for event in pending if event.id not in stored],
+                            key=lambda event: event.start)[:self.list_limit]
+        if not events:
+            if self.sync_error and self.store.get_meta('calendar_sync_token') is None:
+                return False, self.sync_error
+            return False, f"You have no events {window}." if bounds else "No upcoming events found."
+        return True, events
+
+    def update_index(self, events, removed_ids):
+        self.index.upsert(events)
+        self.index.remove(removed_ids)
+
+    def search_events(self, query, limit=5):
+        """Find events matching a query in the local index; upcoming ones come before past ones."""
+        if not self.index_loaded:
+            self.index.replace(self.store.all_events())
+            self.index_loaded = True
+        if self.service and time.monotonic() - self.last_sync > self.sync_interval:
+            self.start_sync()
+        matches = self.index.search(query, None, extra=self.pending_events())
+        if not matches:
+            return False, "I couldn't find any matching events."
+        now = time_resolver.now()
+        # Equally good matches: the next upcoming one first, then the most recent past one
+        matches.sort(key=lambda match: (-match[0], match[1].end <= now, abs((match[1].start - now).total_seconds())))
+        return True, [event for _, event in matches[:limit]]
 
 class WeatherManager:
-    def __init__(self):
+    def __init__(self, base_url=None):
         self.api_key = os.getenv("OPENWEATHER_API_KEY")
-        self.base_url = "https://api.openweathermap.org/data/2.5/weather"
+        self.base_url = base_url or os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather")
+        self.cache = TTLCache(
+            ttl=float(os.getenv("WEATHER_CACHE_TTL", "600")),
+            max_entries=int(os.getenv("WEATHER_CACHE_SIZE", "64")),
+            stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600"))
+        )
+        max_concurrency = int(os.getenv("WEATHER_MAX_CONCURRENCY", "4"))
+        self.http = pooled_client(max_concurrency)
+        self.semaphore = service_loop.semaphore(max_concurrency)
+        self.policy = make_policy("The weather service", (httpx.TransportError,))
+
+    @staticmethod
+    def normalize_location(location):
+        return " ".join(location.lower().strip(" .,?!").split())
 
-    @retry((requests.exceptions.RequestException,))
     def get_weather(self, location):
-        """Fetch weather data for the given location."""
+        """Return weather for the location, served from the cache when possible."""
         if not self.api_key:
             logging.error("OpenWeather API key is not set.")
             return False, "Weather service is not configured properly."
+        key = self.normalize_location(location)
+        return self.cache.get_or_load(key, lambda: self.fetch_weather(location))
 
+    def is_fresh(self, location, within=0):
+        """True if the cached report for location will still be fresh in `within` seconds."""
+        return self.cache.is_fresh(self.normalize_location(location), within)
+
+    def refresh(self, location):
+        """Fetch the weather for location and cache it, replacing any older report."""
+        if not self.api_key:
+            return False, "Weather service is not configured properly."
+        success, weather_report = self.fetch_weather(location)
+        if success:
+            self.cache.put(self.normalize_location(location), weather_report)
+        return success, weather_report
+
+    def fetch_weather(self, location):
+        """Fetch weather data for the given location."""
+        return service_loop.run(self.fetch_weather_async(location))
+
+    @tracer.traced('api', 'weather.fetch')
+    async def request_weather(self, location):
         params = {
             'q': location,
             'appid': self.api_key,
             'units': 'metric'
         }
+        async def get():
+            async with self.semaphore:
+                response = await self.http.get(self.base_url, params=params)
+            response.raise_for_status()
+            return response.json()
+        return await self.policy.run_async(get)
 
+    async def fetch_weather_async(self, location):
         try:
-            response = requests.get(self.base_url, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            data = await self.request_weather(location)
 
             weather_description = data['weather'][0]['description'].capitalize()
             temperature = data['main']['temp']
@@ -222,8 +633,12 @@ class WeatherManager:
             )
             return True, weather_report
 
-        except requests.exceptions.HTTPError as http_err:
-            logging.error(f"HTTP error occurred while fetching weather: {http_err}")
+        except ServiceUnavailable:
+            return False, "The weather service is unavailable right now."
+        except httpx.HTTPStatusError as http_err:
+            logging.error("HTTP error occurred while fetching weather: %s", http_err)
+            if self.policy.is_transient(http_err):
+                return False, "The weather service is busy right now. Please try again later."
             return False, "Could not retrieve weather data. Please check the location and try again."
         except Exception as e:
             logging.exception("Error occurred while fetching weather.")
@@ -232,270 +647,219 @@ class WeatherManager:
 class Assistant(QObject):
     # Define signals
     update_tasks_signal = pyqtSignal(list)
+    # (tasks, removed_ids, full) from NotionManager.add_listener
+    tasks_changed_signal = pyqtSignal(list, list, bool)
     update_events_signal = pyqtSignal(list)
     update_weather_signal = pyqtSignal(str)
+    update_status_signal = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, notion_manager=None, calendar_manager=None, weather_manager=None,
+                 speech_output=None, parser=None, context=None):
         super().__init__()
         self.recognizer = sr.Recognizer()
-        self.engine = pyttsx3.init()
-        self.notion_manager = NotionManager()
-        self.calendar_manager = CalendarManager()
-        self.weather_manager = WeatherManager()
-        self.context = {}
-        self.nlp = nlp
-        self.matcher = Matcher(self.nlp.vocab)
-        self.define_intent_patterns()
-        # Removed self.intents as it's not used
-        # Set up speech rate for clarity
-        self.engine.setProperty('rate', 150)
-
-    def define_intent_patterns(self):
-        # Define patterns for intents
-        self.intent_patterns = {
-            "add_task": [
-                [{"LEMMA": "add"}, {"POS": "DET", "OP": "?"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LEMMA": "create"}, {"POS": "DET", "OP": "?"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LOWER": "new"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LEMMA": "need"}, {"LOWER": "to"}, {"LEMMA": "add"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LEMMA": "set"}, {"LOWER": "up"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LEMMA": "make"}, {"LOWER": "task"}, {"OP": "*"}],
-                [{"LEMMA": "add"}, {"LOWER": "a"}, {"LOWER": "task"}, {"OP": "*"}],
-            ],
-            "read_tasks": [
-                [{"LEMMA": "read"}, {"LOWER": "tasks"}, {"OP": "*"}],
-                [{"LEMMA": "show"}, {"LOWER": "tasks"}, {"OP": "*"}],
-                [{"LEMMA": "list"}, {"LOWER": "tasks"}, {"OP": "*"}],
-                [{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "tasks"}, {"OP": "*"}],
-                [{"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"LOWER": "any"}, {"LOWER": "tasks"}, {"OP": "*"}],
-            ],
-            "add_event": [
-                [{"LEMMA": "add"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
-                [{"LEMMA": "create"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
-                [{"LEMMA": "schedule"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
-                [{"LEMMA": "set"}, {"LOWER": "up"}, {"LOWER": "event"}, {"OP": "*"}],
-                [{"LEMMA": "make"}, {"LOWER": "appointment"}, {"OP": "*"}],
-                [{"LEMMA": "schedule"}, {"LOWER": "meeting"}, {"OP": "*"}],
-            ],
-            "read_events": [
-                [{"LEMMA": "read"}, {"LOWER": "events"}, {"OP": "*"}],
-                [{"LEMMA": "show"}, {"LOWER": "events"}, {"OP": "*"}],
-                [{"LEMMA": "list"}, {"LOWER": "events"}, {"OP": "*"}],
-                [{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "schedule"}, {"OP": "*"}],
-                [{"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"LOWER": "any"}, {"LOWER": "events"}, {"OP": "*"}],
-            ],
-            "get_weather": [
-                [{"LOWER": "what"}, {"LEMMA": "'s", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
-                [{"LEMMA": "tell"}, {"LOWER": "me"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
-                [{"LEMMA": "what"}, {"LOWER": "is", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
-                [{"LEMMA": "how"}, {"LOWER": "is", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
-            ],
-            "exit": [
-                [{"LEMMA": "exit"}],
-                [{"LEMMA": "quit"}],
-                [{"LEMMA": "stop"}],
-                [{"LEMMA": "end"}],
-                [{"LOWER": "goodbye"}],
-                [{"LOWER": "bye"}],
-            ]
-        }
-        for intent, patterns in self.intent_patterns.items():
-            self.matcher.add(intent, patterns)
-
-    def extract_object(self, doc, verb):
-        # Use noun chunks to extract the object related to the verb
-        for np in doc.noun_chunks:
-            if verb.i < np.start:
-                # Exclude patterns like 'a task' or 'an event'
-                if np.text.lower() not in ['a task', 'an event', 'the task', 'the event']:
-                    return np.text
-        return None
+        # Heavy dependencies are created on first use; see warm_up()
+        # The speech output thread creates the TTS engine in the background as soon as it starts
+        self.speech_output = speech_output or SpeechOutput(self.create_tts_engine)
+        self.max_spoken_items = int(os.getenv("TTS_MAX_LIST_ITEMS", "5"))
+        self.speech_resource = LazyResource("speech input", self.start_speech_input)
+        self.notion_resource = LazyResource("Notion client",
+                                            lambda: self.follow_tasks(notion_manager or NotionManager()))
+        self.calendar_resource = LazyResource("Google Calendar", lambda: calendar_manager or CalendarManager())
+        self.weather_manager = weather_manager or WeatherManager()
+        # Recent locations, task types and requests, kept across restarts
+        self.context = context or ContextStore(
+            os.getenv("TASK_STORE_PATH", "assistant.db"),
+            ttl=float(os.getenv("CONTEXT_TTL", "86400")),
+            max_history=int(os.getenv("CONTEXT_HISTORY", "50")),
+        )
+        self.slot_filler = SlotFiller(self.listen, self.context)
+        self.parser = parser or CommandParser(nlp, intent_registry)
+        self.registry = self.parser.registry
+        self.time_resolver = time_resolver
+        # Refreshes likely next answers while run() waits for speech
+        self.prefetcher = PrefetchScheduler(
+            self.registry,
+            budget=int(os.getenv("PREFETCH_BUDGET", "60")),
+            per_listen=int(os.getenv("PREFETCH_PER_LISTEN", "2")),
+        )
+        for intent, _, _ in self.context.history():
+            self.prefetcher.record(intent)
+        # Seconds a briefing or other composite request waits for its slowest service
+        self.briefing_budget = float(os.getenv("BRIEFING_BUDGET", "3"))
+
+    @staticmethod
+    def create_tts_engine():
+        with startup_profiler.stage("TTS engine"):
+            return init_tts_engine()
+
+    def follow_tasks(self, manager):
+        """Pass the manager's task changes on as tasks_changed_signal, so the Tasks list updates row by row."""
+        manager.add_listener(self.tasks_changed_signal.emit)
+        return manager
+
+    @property
+    def notion_manager(self):
+        return self.notion_resource.get()
+
+    @property
+    def calendar_manager(self):
+        return self.calendar_resource.get()
+
+    def warm_up(self):
+        """Load the spaCy model, and the service clients recent requests used, in the background.
+
+        An integration that none of the requests in the context history used is
+        left to load on first use, so its client library is never imported
+        when it is not needed. Logs startup timings when done.
+        """
+        clients = {'notion_manager': self.notion_resource, 'calendar_manager': self.calendar_resource}
+        used = self.registry.services(intent for intent, _, _ in self.context.history())
+
+        def run():
+            # The TTS engine is created by the speech output thread, which must own it
+            for resource in [nlp] + [clients[name] for name in sorted(used) if name in clients]:
+                resource.warm()
+            logging.info("Startup timings:\n" + startup_profiler.report())
+            if os.getenv("ASSISTANT_PROFILE_STARTUP"):
+                print(startup_profiler.report())
+        threading.Thread(target=run, name="warm-up", daemon=True).start()
 
     def speak(self, text):
-        """Make the assistant speak out the given text."""
-        self.engine.say(text)
-        self.engine.runAndWait()
+        """Queue text for the speech output thread and return immediately."""
+        self.speech_output.say(text)
+
+    def speak_list(self, items, intro=None):
+        """Speak a list as one utterance, capped at max_spoken_items."""
+        self.speech_output.say(combine_items(items, self.max_spoken_items, intro))
+
+    def start_speech_input(self):
+        backend = RecognizerBackend(self.recognizer, os.getenv("SPEECH_BACKEND", "google"))
+        if os.getenv("SPEECH_FALLBACK_BACKEND"):
+            backend = FallbackBackend(backend, RecognizerBackend(self.recognizer, os.getenv("SPEECH_FALLBACK_BACKEND")))
+        if os.getenv("SPEECH_CAPTURE", "continuous") == "per_utterance":
+            return PerUtteranceCapture(self.recognizer, backend).start()
+        return SpeechPipeline(self.recognizer, backend).start()
+
+    @property
+    def speech_input(self):
+        return self.speech_resource.get()
 
     def listen(self, prompt=None):
         """Listen to the user's voice input and return the recognized text."""
         if prompt:
+            # Let the question finish before the listening timeout starts, and ignore its echo
             self.speak(prompt)
-        with sr.Microphone() as source:
-            try:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                print("Listening...")
-                audio = self.recognizer.listen(source, timeout=5)
-                print("Recognizing speech...")
-                text = self.recognizer.recognize_google(audio)
-                print(f"Recognized text: {text}")  # Debug statement
-                logging.debug(f"Recognized text: {text}")
-                return text.lower()
-            except sr.WaitTimeoutError:
-                self.speak("Listening timed out. Please try again.")
-                return None
-            except sr.UnknownValueError:
-                self.speak("Sorry, I did not understand that. Please repeat.")
-                return None
-            except sr.RequestError as e:
-                logging.error(f"Speech recognition error: {e}")
-                self.speak("Could not request results; please check your network connection.")
-                return None
+            self.speech_output.wait_until_idle()
+            self.speech_input.discard_pending()
+        print("Listening...")
+        deadline = time.monotonic() + 5
+        with tracer.span('listen'):
+            while True:
+                kind, text = self.speech_input.next_utterance(timeout=max(deadline - time.monotonic(), 0))
+                if kind == 'text' and self.speech_output.is_echo(text):
+                    logging.debug("Ignoring own speech: %s", text)
+                    continue
+                break
+        if kind == 'text':
+            print(f"Recognized text: {text}")  # Debug statement
+            logging.debug("Recognized text: %s", text)
+            return text.lower()
+        elif kind == 'timeout':
+            self.speak("Listening timed out. Please try again.")
+        elif kind == 'unknown':
+            self.speak("Sorry, I did not understand that. Please repeat.")
+        else:
+            logging.error("Speech recognition error: %s", text)
+            self.speak("Could not request results; please check your network connection.")
+        return None
 
     def parse_command(self, command):
         """Parse the command and extract intent and entities."""
-        logging.debug(f"Command received: {command}")
-        doc = self.nlp(command)
-        matches = self.matcher(doc)
-        intent = None
-        entities = {}
-        if matches:
-            # Get the match with the longest span
-            match_id, start, end = max(matches, key=lambda x: x[2]-x[1])
-            intent = self.nlp.vocab.strings[match_id]
-            logging.debug(f"Intent identified: {intent}")
-            # Get the span of the matched pattern
-            matched_span = doc[start:end]
-            # Find the verb in the matched span
-            verb = None
-            for token in matched_span:
-                if token.pos_ == 'VERB':
-                    verb = token
-                    break
-            if verb:
-                obj = self.extract_object(doc, verb)
-                if obj:
-                    if intent == 'add_task':
-                        entities['TASK_NAME'] = obj
-                    elif intent == 'add_event':
-                        entities['EVENT_NAME'] = obj
-            # Extract time expressions
-            for ent in doc.ents:
-                if ent.label_ in ('DATE', 'TIME'):
-                    entities['TIME'] = ent.text
-            # For get_weather, extract location
-            if intent == 'get_weather':
-                for ent in doc.ents:
-                    if ent.label_ in ('GPE', 'LOC'):
-                        entities['LOCATION'] = ent.text
-            logging.debug(f"Entities extracted: {entities}")
-        else:
-            logging.debug("No intent matched.")
-            intent = None
-
-        # Check for priority indicators
-        priority = 'normal'
-        if any(token.lemma_ in ['urgent', 'important', 'high'] for token in doc):
-            priority = 'high'
-        elif any(token.lemma_ in ['quick', 'low priority', 'low'] for token in doc):
-            priority = 'low'
+        started = time.perf_counter()
+        result = self.parser.parse(command)
+        tracer.record('parse', (time.perf_counter() - started) * 1000, result[0])
+        return result
 
-        logging.debug(f"Priority detected: {priority}")
+    def parse_commands(self, command):
+        """Parse an utterance into one or more (intent, entities, priority) requests."""
+        started = time.perf_counter()
+        results = self.parser.parse_commands(command)
+        label = results[0][0] if len(results) == 1 else 'multi'
+        tracer.record('parse', (time.perf_counter() - started) * 1000, label)
+        return results
 
-        return intent, entities, priority
+    def handle_commands(self, commands):
+        """Handle every request from one utterance; several are all read-only and answered together."""
+        if len(commands) == 1:
+            self.handle_intent(*commands[0])
+            return
+        for intent, entities, _ in commands:
+            self.prefetcher.record(intent)
+            self.context.record(intent, entities)
+        with tracer.span('handle', 'multi'):
+            self.give_briefing([(intent, entities) for intent, entities, _ in commands])
 
     def handle_intent(self, intent, entities, priority):
         """Handle the parsed intent with entities and priority."""
-        try:
-            logging.debug(f"Handling intent: {intent}")
-            logging.debug(f"Entities: {entities}")
-            if intent == "add_task":
-                task_name = entities.get('TASK_NAME')
-                if not task_name:
-                    self.speak("What is the name of the task?")
-                    task_name = self.listen()
-                if not task_name:
-                    self.speak("Task name is required to add a task.")
-                    return
-                task_type = entities.get('TASK_TYPE')
-                if not task_type:
-                    self.speak("What is the type of the task?")
-                    task_type = self.listen()
-                    if not task_type:
-                        task_type = "General"
-                success, message = self.notion_manager.add_task(task_name, task_type, priority)
-                if success:
-                    # Update context
-                    self.context['last_task'] = {'name': task_name, 'type': task_type, 'priority': priority}
-                    self.update_tasks_signal.emit([f"Task: {task_name}, Type: {task_type}, Priority: {priority.capitalize()}"])
-                self.speak(message)
-
-            elif intent == "read_tasks":
-                success, result = self.notion_manager.read_tasks()
-                if success:
-                    self.update_tasks_signal.emit(result)
-                    for task in result:
-                        self.speak(task)
-                else:
-                    self.speak(result)
-
-            elif intent == "add_event":
-                event_name = entities.get('EVENT_NAME')
-                if not event_name:
-                    self.speak("Please provide the event name.")
-                    event_name = self.listen()
-                if not event_name:
-                    self.speak("Event name is required to add an event.")
-                    return
-                event_time_str = entities.get('TIME')
-                if not event_time_str:
-                    self.speak("Please provide the event time.")
-                    event_time_str = self.listen()
-                if not event_time_str:
-                    self.speak("Event time is required to add an event.")
-                    return
-                event_time = dateparser.parse(event_time_str)
-                if not event_time:
-                    self.speak("Could not understand the date and time. Please try again.")
-                    return
-                success, message = self.calendar_manager.add_event(event_name, event_time, priority)
-                if success:
-                    # Store in context
-                    self.context['last_event'] = {'name': event_name, 'time': event_time, 'priority': priority}
-                    self.update_events_signal.emit([f"Event: {event_name} at {event_time}, Priority: {priority.capitalize()}"])
-                self.speak(message)
-
-            elif intent == "read_events":
-                success, result = self.calendar_manager.read_events()
-                if success:
-                    self.update_events_signal.emit(result)
-                    for event in result:
-                        self.speak(event)
-                else:
-                    self.speak(result)
-
-            elif intent == "get_weather":
-                location = entities.get('LOCATION') or self.context.get('last_location')
-                if not location:
-                    self.speak("For which location would you like the weather report?")
-                    location = self.listen()
-                if not location:
-                    self.speak("Location is required to fetch weather information.")
-                    return
-                success, weather_report = self.weather_manager.get_weather(location)
-                if success:
-                    self.context['last_location'] = location
-                    self.update_weather_signal.emit(weather_report)
-                self.speak(weather_report)
+        self.prefetcher.record(intent)
+        with tracer.span('handle', intent):
+            self.dispatch_intent(intent, entities, priority)
 
-            elif intent == "exit":
-                self.speak("Exiting assistant. Goodbye!")
-                sys.exit()
-
-            else:
+    def dispatch_intent(self, intent, entities, priority):
+        try:
+            logging.debug("Handling intent: %s", intent)
+            logging.debug("Entities: %s", entities)
+            spec = self.registry.intent(intent) if intent else None
+            if spec is None:
                 self.speak("Sorry, I didn't understand that command. Please try again.")
+                return
+            if spec.slots:
+                success, filled = self.slot_filler.fill(spec.slots, entities)
+                if not success:
+                    self.speak(filled)
+                    return
+                entities = filled
+            self.context.record(intent, entities)
+            spec.handle(self, entities, priority)
         except Exception as e:
             logging.exception("Error handling intent.")
             self.speak("An error occurred while processing your request.")
 
+    def give_briefing(self, parts):
+        """Fetch several read-only answers in parallel and speak them as one summary.
+
+        parts is a list of (intent, entities). Every service is queried at once,
+        so the reply takes as long as the slowest one, capped at briefing_budget.
+        """
+        specs = [self.registry.intent(intent) for intent, _ in parts]
+        calls = [spec.fetch(self, entities) for spec, (_, entities) in zip(specs, parts)]
+        results = service_loop.gather_calls(calls, timeout=self.briefing_budget)
+        summary = []
+        for spec, (intent, entities), result in zip(specs, parts, results):
+            if isinstance(result, TimeoutError):
+                logging.warning("%s did not answer within the briefing budget.", intent)
+                summary.append(f"I couldn't get {spec.part_name} in time.")
+            elif isinstance(result, Exception):
+                logging.error("Failed to get %s for the briefing: %s", intent, result)
+                summary.append(f"I couldn't get {spec.part_name}.")
+            else:
+                summary.append(spec.report(self, result, entities))
+        self.update_status_signal.emit(" ".join(summary))
+        self.speak(" ".join(summary))
+
     def run(self):
         """Main loop to handle user commands."""
         self.speak("Hello! How can I assist you today?")
         while True:
+            # Use the time spent waiting for speech to refresh what is likely to be asked next
+            self.prefetcher.on_listen(self)
             command = self.listen()
             if command:
-                intent, entities, priority = self.parse_command(command)
-                if intent:
-                    self.handle_intent(intent, entities, priority)
+                # Barge-in: a new command cuts off whatever is still being read out
+                self.speech_output.cancel()
+                commands = self.parse_commands(command)
+                if commands[0][0]:
+                    self.handle_commands(commands)
                 else:
                     self.speak("I'm sorry, I didn't catch that. Could you please repeat?")
             else:
@@ -505,6 +869,16 @@ class AssistantGUI(QMainWindow):
     def __init__(self, assistant):
         super().__init__()
         self.assistant = assistant
+        # Shared pool for network refreshes so the UI thread never blocks on retries
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(3)
+        self.refresh_generation = {'tasks': 0, 'events': 0, 'weather': 0}
+        self.refresh_in_flight = set()
+        self.refresh_pending = set()
+        # The Tasks list follows tasks_changed_signal once a first full list is shown;
+        # changes that arrive before then are kept to be replayed over that list
+        self.tasks_loaded = False
+        self.early_task_changes = []
         self.initUI()
         self.connect_signals()
 
@@ -520,10 +894,26 @@ class AssistantGUI(QMainWindow):
         self.tasks_tab = QWidget()
         self.tasks_layout = QVBoxLayout()
         tasks_label = QLabel('Tasks')
-        self.tasks_list = QListWidget()
+        self.tasks_model = RecordListModel(parent=self)
+        self.tasks_list = self.create_list_view(self.tasks_model)
+        self.task_sort = QComboBox()
+        self.task_sort.addItems(['Most recent', 'Priority', 'Name', 'Type'])
+        self.task_sort.currentTextChanged.connect(self.apply_task_view)
+        self.task_priority_filter = QComboBox()
+        self.task_priority_filter.addItems(['All priorities', 'High', 'Normal', 'Low'])
+        self.task_priority_filter.currentTextChanged.connect(self.apply_task_view)
+        self.task_type_filter = QLineEdit()
+        self.task_type_filter.setPlaceholderText('Filter by type')
+        self.task_type_filter.textChanged.connect(self.apply_task_view)
+        task_controls = QHBoxLayout()
+        task_controls.addWidget(QLabel('Sort by'))
+        task_controls.addWidget(self.task_sort)
+        task_controls.addWidget(self.task_priority_filter)
+        task_controls.addWidget(self.task_type_filter)
         refresh_tasks_btn = QPushButton('Refresh Tasks')
         refresh_tasks_btn.clicked.connect(self.refresh_tasks)
         self.tasks_layout.addWidget(tasks_label)
+        self.tasks_layout.addLayout(task_controls)
         self.tasks_layout.addWidget(self.tasks_list)
         self.tasks_layout.addWidget(refresh_tasks_btn)
         self.tasks_tab.setLayout(self.tasks_layout)
@@ -532,10 +922,23 @@ class AssistantGUI(QMainWindow):
         self.events_tab = QWidget()
         self.events_layout = QVBoxLayout()
         events_label = QLabel('Events')
-        self.events_list = QListWidget()
+        self.events_model = RecordListModel(parent=self)
+        self.events_list = self.create_list_view(self.events_model)
+        self.event_sort = QComboBox()
+        self.event_sort.addItems(['Time', 'Priority', 'Name'])
+        self.event_sort.currentTextChanged.connect(self.apply_event_view)
+        self.event_priority_filter = QComboBox()
+        self.event_priority_filter.addItems(['All priorities', 'High', 'Normal', 'Low'])
+        self.event_priority_filter.currentTextChanged.connect(self.apply_event_view)
+        event_controls = QHBoxLayout()
+        event_controls.addWidget(QLabel('Sort by'))
+        event_controls.addWidget(self.event_sort)
+        event_controls.addWidget(self.event_priority_filter)
+        event_controls.addStretch()
         refresh_events_btn = QPushButton('Refresh Events')
         refresh_events_btn.clicked.connect(self.refresh_events)
         self.events_layout.addWidget(events_label)
+        self.events_layout.addLayout(event_controls)
         self.events_layout.addWidget(self.events_list)
         self.events_layout.addWidget(refresh_events_btn)
         self.events_tab.setLayout(self.events_layout)
@@ -557,72 +960,197 @@ class AssistantGUI(QMainWindow):
         self.tabs.addTab(self.events_tab, "Events")
         self.tabs.addTab(self.weather_tab, "Weather")
 
+        # Toolbar
+        toolbar = self.addToolBar('Actions')
+        refresh_all_action = QAction('Refresh All', self)
+        refresh_all_action.setShortcut('F5')
+        refresh_all_action.triggered.connect(self.refresh_all)
+        toolbar.addAction(refresh_all_action)
+
         # Status Bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        self.latency_label = QLabel()
+        self.status_bar.addPermanentWidget(self.latency_label)
+        self.latency_timer = QTimer(self)
+        self.latency_timer.timeout.connect(self.update_latency_label)
+        self.latency_timer.start(2000)
 
         # Start assistant in a separate thread
         self.assistant_thread = AssistantThread(self.assistant)
         self.assistant_thread.start()
 
+    @staticmethod
+    def create_list_view(model):
+        view = QListView()
+        # Uniform rows let the view lay out only what is on screen, however long the list
+        view.setUniformItemSizes(True)
+        view.setModel(model)
+        return view
+
+    def apply_task_view(self):
+        """Apply the Tasks tab's sort and filter controls to its model."""
+        sort = self.task_sort.currentText()
+        self.tasks_model.sort_key = {
+            'Priority': attrgetter('priority'),
+            'Name': lambda row: row.name.lower(),
+            'Type': lambda row: row.type.lower(),
+        }.get(sort)
+        priority = self.task_priority_filter.currentText()
+        task_type = self.task_type_filter.text().strip().lower()
+        if priority == 'All priorities' and not task_type:
+            self.tasks_model.set_filter(None)
+        else:
+            wanted = None if priority == 'All priorities' else Priority.parse(priority)
+            self.tasks_model.set_filter(lambda row: (wanted is None or row.priority == wanted)
+                                        and task_type in row.type.lower())
+
+    def apply_event_view(self):
+        sort = self.event_sort.currentText()
+        self.events_model.sort_key = {
+            'Priority': attrgetter('priority'),
+            'Name': lambda row: row.summary.lower(),
+        }.get(sort)
+        priority = self.event_priority_filter.currentText()
+        if priority == 'All priorities':
+            self.events_model.set_filter(None)
+        else:
+            wanted = Priority.parse(priority)
+            self.events_model.set_filter(lambda row: row.priority == wanted)
+
+    def update_latency_label(self):
+        """Show p50/p95 latency of the main pipeline stages."""
+        parts = []
+        for stage in ('recognize', 'parse', 'handle', 'speak'):
+            percentiles = tracer.percentiles(stage)
+            if percentiles:
+                parts.append(f"{stage} {percentiles[0]:.0f}/{percentiles[1]:.0f} ms")
+        self.latency_label.setText(" | ".join(parts) + (" (p50/p95)" if parts else ""))
+
     def connect_signals(self):
         self.assistant.update_tasks_signal.connect(self.update_tasks_list)
+        self.assistant.tasks_changed_signal.connect(self.apply_task_changes)
         self.assistant.update_events_signal.connect(self.update_events_list)
         self.assistant.update_weather_signal.connect(self.update_weather_info)
+        self.assistant.update_status_signal.connect(self.status_bar.showMessage)
 
     def refresh_tasks(self):
-        self.status_bar.showMessage("Refreshing tasks...")
-        success, result = self.assistant.notion_manager.read_tasks()
-        if success:
-            self.tasks_list.clear()
-            for task in result:
-                self.tasks_list.addItem(task)
-            self.status_bar.showMessage("Tasks refreshed.", 5000)
-        else:
-            self.tasks_list.clear()
-            self.tasks_list.addItem(result)
-            self.status_bar.showMessage("Failed to refresh tasks.", 5000)
+        self.start_refresh('tasks')
 
     def refresh_events(self):
-        self.status_bar.showMessage("Refreshing events...")
-        success, result = self.assistant.calendar_manager.read_events()
-        if success:
-            self.events_list.clear()
-            for event in result:
-                self.events_list.addItem(event)
-            self.status_bar.showMessage("Events refreshed.", 5000)
-        else:
-            self.events_list.clear()
-            self.events_list.addItem(result)
-            self.status_bar.showMessage("Failed to refresh events.", 5000)
+        self.start_refresh('events')
 
     def refresh_weather(self):
-        self.status_bar.showMessage("Refreshing weather...")
-        location = self.assistant.context.get('last_location', 'Your Default Location')
-        success, weather_report = self.assistant.weather_manager.get_weather(location)
-        if success:
-            self.weather_info.setText(weather_report)
-            self.status_bar.showMessage("Weather refreshed.", 5000)
+        self.start_refresh('weather')
+
+    def refresh_all(self):
+        """Refresh tasks, events and weather concurrently."""
+        for kind in self.refresh_generation:
+            self.start_refresh(kind)
+
+    def start_refresh(self, kind):
+        """Run a refresh on the worker pool, merging clicks that arrive while one is in flight."""
+        if kind in self.refresh_in_flight:
+            # Re-run once the current refresh lands instead of stacking duplicate requests
+            self.refresh_pending.add(kind)
+            return
+        # Resolve lazy managers inside the worker so first-use loading stays off the UI thread
+        if kind == 'tasks' and self.tasks_loaded:
+            # The list follows the manager's changes, so a sync is all a refresh needs
+            job = (lambda: self.assistant.notion_manager.sync_tasks(),)
+        elif kind == 'tasks':
+            job = (lambda: self.assistant.notion_manager.read_tasks(),)
+        elif kind == 'events':
+            job = (lambda: self.assistant.calendar_manager.read_events(),)
         else:
-            self.weather_info.setText(weather_report)
-            self.status_bar.showMessage("Failed to refresh weather.", 5000)
+            # The same location the weather intent would use: the last one asked about, else ASSISTANT_LOCATION
+            from plugins.weather import fetch_weather
+            job = fetch_weather(self.assistant, {})
+        self.refresh_generation[kind] += 1
+        self.refresh_in_flight.add(kind)
+        self.status_bar.showMessage(f"Refreshing {kind}...")
+        worker = RefreshWorker(kind, self.refresh_generation[kind], *job)
+        worker.signals.finished.connect(self.on_refresh_finished)
+        self.thread_pool.start(worker)
+
+    def on_refresh_finished(self, kind, generation, result):
+        self.refresh_in_flight.discard(kind)
+        # A newer update (e.g. from a voice command) superseded this refresh; drop its result
+        if generation == self.refresh_generation[kind]:
+            success, data = result
+            if not success:
+                # Keep showing the last good list; the status bar says what went wrong
+                self.status_bar.showMessage(f"Failed to refresh {kind}: {data}", 5000)
+            else:
+                if kind == 'tasks':
+                    self.load_tasks(data)
+                elif kind == 'events':
+                    self.events_model.set_items(data)
+                else:
+                    self.weather_info.setText(data)
+                self.status_bar.showMessage(f"{kind.capitalize()} refreshed.", 5000)
+        if kind in self.refresh_pending:
+            self.refresh_pending.discard(kind)
+            self.start_refresh(kind)
 
     def update_tasks_list(self, tasks):
-        self.tasks_list.clear()
-        for task in tasks:
-            self.tasks_list.addItem(task)
+        self.refresh_generation['tasks'] += 1
+        self.load_tasks(tasks)
         self.status_bar.showMessage("Tasks updated.", 5000)
 
+    def load_tasks(self, tasks):
+        """Show a full task list the first time one arrives; after that, changes keep the list current."""
+        if self.tasks_loaded:
+            return
+        self.tasks_model.set_items(tasks)
+        for changed, removed_ids in self.early_task_changes:
+            self.tasks_model.apply_changes(changed, removed_ids)
+        self.early_task_changes = []
+        self.tasks_loaded = True
+
+    def apply_task_changes(self, tasks, removed_ids, full):
+        if full:
+            # A full resync replaces the list; only then is every row compared
+            self.tasks_model.set_items(tasks)
+            self.early_task_changes = []
+            self.tasks_loaded = True
+            return
+        self.tasks_model.apply_changes(tasks, removed_ids)
+        if not self.tasks_loaded:
+            self.early_task_changes.append((tasks, removed_ids))
+
     def update_events_list(self, events):
-        self.events_list.clear()
-        for event in events:
-            self.events_list.addItem(event)
+        self.refresh_generation['events'] += 1
+        self.events_model.set_items(events)
         self.status_bar.showMessage("Events updated.", 5000)
 
     def update_weather_info(self, weather_report):
+        self.refresh_generation['weather'] += 1
         self.weather_info.setText(weather_report)
         self.status_bar.showMessage("Weather information updated.", 5000)
 
+class WorkerSignals(QObject):
+    finished = pyqtSignal(str, int, object)
+
+class RefreshWorker(QRunnable):
+    """Run a manager call off the UI thread and report back through a signal."""
+
+    def __init__(self, kind, generation, func, *args):
+        super().__init__()
+        self.kind = kind
+        self.generation = generation
+        self.func = func
+        self.args = args
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            logging.exception("Failed to refresh %s.", self.kind)
+            result = (False, f"Failed to refresh {self.kind} due to an error.")
+        self.signals.finished.emit(self.kind, self.generation, result)
+
 class AssistantThread(QThread):
     def __init__(self, assistant):
         QThread.__init__(self)
@@ -632,8 +1160,42 @@ class AssistantThread(QThread):
         self.assistant.run()
 
 if __name__ == "__main__":
-    assistant = Assistant()
-    app = QApplication(sys.argv)
-    gui = AssistantGUI(assistant)
-    gui.show()
+    arg_parser = argparse.ArgumentParser(description="Voice-activated personal assistant")
+    arg_parser.add_argument('--import-tasks', metavar='FILE',
+                            help="queue tasks from a CSV, JSON or JSON Lines file for Notion and exit")
+    # Unrecognised arguments are left for Qt
+    args, qt_args = arg_parser.parse_known_args()
+
+    if args.import_tasks:
+        notion_manager = NotionManager()
+        # Only report the tasks Notion rejects from this import, not ones set aside by earlier runs
+        rejected_before = {entry.key for entry, _ in notion_manager.write_queue.failed()}
+        success, message = notion_manager.import_tasks_from_file(args.import_tasks)
+        print(message)
+        if success:
+            print("Writing tasks to Notion... (Ctrl+C to stop; unsent tasks are retried on the next start)")
+            notion_manager.write_queue.wait_until_flushed()
+            rejected = [(entry, error) for entry, error in notion_manager.write_queue.failed()
+                        if entry.key not in rejected_before]
+            for entry, error in rejected:
+                print(f"Notion rejected \"{entry.payload['name']}\": {error}")
+            success = not rejected
+            print("Done." if success else f"Done; {len(rejected)} tasks were not written.")
+        sys.exit(0 if success else 1)
+
+    if os.getenv("METRICS_PORT"):
+        tracer.serve(int(os.getenv("METRICS_PORT")))
+    if os.getenv("METRICS_DUMP"):
+        atexit.register(tracer.dump_json, os.getenv("METRICS_DUMP"))
+
+    if not os.path.exists(google_services.token_path):
+        # First run: sign in to Google here, since the calendar is connected from a background thread
+        google_services.credentials(interactive=True)
+    with startup_profiler.stage("assistant init"):
+        assistant = Assistant()
+    app = QApplication(sys.argv[:1] + qt_args)
+    with startup_profiler.stage("window shown"):
+        gui = AssistantGUI(assistant)
+        gui.show()
+    assistant.warm_up()
     sys.exit(app.exec_())
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import httpx
+
+
+class ServiceLoop:
+    """One asyncio event loop on a background thread, shared by the network clients.
+
+    Manager methods stay synchronous for the voice loop and the GUI workers; they
+    hand their requests to this loop, so pooled connections and retry waits never
+    tie up a thread each.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="service-loop", daemon=True).start()
+                self.loop = loop
+        return self.loop
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the service loop from any other thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.start()).result(timeout)
+
+    def semaphore(self, value):
+        """An asyncio.Semaphore made on the service loop, where it is used.
+
+        Before Python 3.10 a semaphore binds to the event loop of the thread that
+        creates it, so one made on a caller's thread fails on this loop.
+        """
+        async def create():
+            return asyncio.Semaphore(value)
+        return self.run(create())
+
+    def gather_calls(self, calls, timeout=None):
+        """Run blocking (func, *args) calls concurrently and return their results in order.
+
+        A call that raised gives its exception in place of a result, and one still
+        running after `timeout` seconds gives a TimeoutError, so one slow or
+        failing service does not hold back or hide the others.
+        """
+        async def run_all():
+            tasks = [asyncio.ensure_future(asyncio.to_thread(func, *args)) for func, *args in calls]
+            if not tasks:
+                return []
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            results = []
+            for task in tasks:
+                if task in pending:
+                    # The worker thread finishes in the background; its result is dropped
+                    task.cancel()
+                    results.append(TimeoutError(f"No result within {timeout} seconds"))
+                else:
+                    results.append(task.exception() or task.result())
+            return results
+        return self.run(run_all())
+
+
+service_loop = ServiceLoop()
+
+
+def pooled_client(max_connections=4, timeout=5, keepalive_expiry=60):
+    """Create an httpx.AsyncClient that keeps connections alive between calls."""
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+    )
+
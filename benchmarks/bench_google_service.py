@@ -0,0 +1,113 @@
+"""Calendar client start-up cost, offline: building a client per CalendarManager versus the shared factory.
+
+The old path built the client with googleapiclient's build() for every
+CalendarManager and refreshed an expired token on the calling thread just
+before the first request. The factory builds the client once, from the
+discovery document cached on disk, and renews the token in the background.
+Token refreshes are simulated with --refresh-ms of latency, and requests go
+to an in-memory HTTP mock, so no network or Google account is needed.
+
+Usage: python benchmarks/bench_google_service.py [--rounds N] [--refresh-ms MS]
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from google_service import GoogleServiceFactory, utcnow
+
+EVENTS_RESPONSE = '{"kind": "calendar#events", "items": []}'
+
+
+class SimulatedCredentials:
+    """Credentials whose refresh takes refresh_ms, like a round trip to Google's token endpoint."""
+
+    def __init__(self, refresh_ms, expires_in):
+        self.refresh_ms = refresh_ms
+        self.refresh_token = 'refresh'
+        self.token = 'token'
+        self.expiry = utcnow() + timedelta(seconds=expires_in)
+
+    @property
+    def valid(self):
+        return self.expiry > utcnow()
+
+    def refresh(self, request=None):
+        time.sleep(self.refresh_ms / 1000)
+        self.expiry = utcnow() + timedelta(hours=1)
+
+    def to_json(self):
+        return '{}'
+
+
+def mock_http():
+    from googleapiclient.http import HttpMock
+    http = HttpMock(headers={'status': '200'})
+    http.data = EVENTS_RESPONSE
+    return http
+
+
+def old_first_call(refresh_ms):
+    """build() per manager, then a synchronous refresh of the expired token before the first request."""
+    from googleapiclient.discovery import build
+    creds = SimulatedCredentials(refresh_ms, expires_in=-1)
+    started = time.perf_counter()
+    service = build('calendar', 'v3', http=mock_http(), static_discovery=True)
+    built = time.perf_counter()
+    if not creds.valid:
+        creds.refresh()
+    service.events().list(calendarId='primary').execute()
+    return (built - started) * 1000, (time.perf_counter() - built) * 1000
+
+
+def factory_first_call(factory):
+    """The shared client; the token was already renewed in the background."""
+    started = time.perf_counter()
+    service = factory.service('calendar', 'v3')
+    built = time.perf_counter()
+    service.events().list(calendarId='primary').execute()
+    return (built - started) * 1000, (time.perf_counter() - built) * 1000
+
+
+def median(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--rounds', type=int, default=20)
+    arg_parser.add_argument('--refresh-ms', type=float, default=150)
+    args = arg_parser.parse_args()
+
+    # Both paths import the client library, so import it up front and time only the building
+    import googleapiclient.discovery
+    import googleapiclient.http
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Cold start: the first client, before any client or discovery document is cached
+        factory = GoogleServiceFactory(cache_dir=cache_dir, token_path=os.path.join(cache_dir, 'token.json'),
+                                       refresh_margin=1, http=mock_http())
+        factory.creds = SimulatedCredentials(args.refresh_ms, expires_in=1.5)
+        factory.schedule_refresh()
+        cold_factory = factory_first_call(factory)
+        cold_old = old_first_call(args.refresh_ms)
+        # Wait for the background renewal before measuring warm calls
+        time.sleep(1.0 + args.refresh_ms / 1000)
+        old = [old_first_call(args.refresh_ms) for _ in range(args.rounds)]
+        new = [factory_first_call(factory) for _ in range(args.rounds)]
+        factory.close()
+
+    print(f"{'':34}{'build ms':>10}{'first call ms':>15}")
+    print(f"{'cold, build() per manager':34}{cold_old[0]:10.2f}{cold_old[1]:15.2f}")
+    print(f"{'cold, shared factory':34}{cold_factory[0]:10.2f}{cold_factory[1]:15.2f}")
+    print(f"{'build() per manager (median)':34}{median([b for b, _ in old]):10.2f}{median([c for _, c in old]):15.2f}")
+    print(f"{'shared factory (median)':34}{median([b for b, _ in new]):10.2f}{median([c for _, c in new]):15.2f}")
+
+
+if __name__ == '__main__':
+    main()
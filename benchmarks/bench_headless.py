@@ -0,0 +1,100 @@
+"""Throughput and latency benchmark for the NLU and dispatch layers, using stub backends.
+
+Reports commands/sec and p50/p95/p99 latency for:
+  - parse: the tiered parser, one command at a time
+  - batch parse: parse_many with nlp.pipe, for each --processes value
+  - dispatch: handle_intent against in-memory Notion/Calendar/Weather stubs
+
+Usage: python benchmarks/bench_headless.py [--commands N] [--processes 1 2 4] [--seed S]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from headless import HeadlessAssistant, make_managers
+from app import nlp, intent_registry
+from nlu import CommandParser
+
+TEMPLATES = [
+    "read tasks",
+    "what are my tasks",
+    "show events",
+    "what's on {day}",
+    "show events next week",
+    "what's the weather in {city}",
+    "how is the weather in {city}",
+    "add a task to {thing}",
+    "create a task called {thing} urgent",
+    "schedule an event {thing} {day} at {hour} pm",
+    "add an event {thing} on {day} at {hour} am",
+    "tell me a joke",
+]
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "tomorrow"]
+CITIES = ["london", "paris", "new york", "tokyo", "kathmandu", "berlin"]
+THINGS = ["finish the report", "call the bank", "team meeting", "dentist appointment", "buy groceries"]
+
+
+def make_corpus(count, seed):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(day=rng.choice(DAYS), city=rng.choice(CITIES),
+                                     thing=rng.choice(THINGS), hour=rng.randint(1, 11))
+        for _ in range(count)
+    ]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(name, samples_ms, elapsed):
+    print(f"{name:<22}{len(samples_ms) / elapsed:>12.1f}{percentile(samples_ms, 0.5):>10.3f}"
+          f"{percentile(samples_ms, 0.95):>10.3f}{percentile(samples_ms, 0.99):>10.3f}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--commands', type=int, default=2000)
+    arg_parser.add_argument('--processes', type=int, nargs='+', default=[1, 2])
+    arg_parser.add_argument('--seed', type=int, default=42)
+    args = arg_parser.parse_args()
+
+    corpus = make_corpus(args.commands, args.seed)
+    parser = CommandParser(nlp, intent_registry)
+    assistant = HeadlessAssistant(parser=parser, **make_managers(stub=True))
+    # Load the model and compile the Matcher before timing
+    parser.parse_full(corpus[0])
+
+    print(f"{len(corpus)} commands, seed {args.seed}")
+    print(f"{'layer':<22}{'cmds/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    samples, parsed = [], []
+    started = time.perf_counter()
+    for command in corpus:
+        t = time.perf_counter()
+        parsed.append(parser.parse(command))
+        samples.append((time.perf_counter() - t) * 1000)
+    report("parse", samples, time.perf_counter() - started)
+
+    for processes in args.processes:
+        started = time.perf_counter()
+        parser.parse_many(corpus, n_process=processes)
+        elapsed = time.perf_counter() - started
+        print(f"{f'batch parse x{processes}':<22}{len(corpus) / elapsed:>12.1f}")
+
+    samples = []
+    started = time.perf_counter()
+    for command, result in zip(corpus, parsed):
+        t = time.perf_counter()
+        assistant.process(command, parsed=result)
+        samples.append((time.perf_counter() - t) * 1000)
+    report("dispatch (stubs)", samples, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Refresh cost of the Tasks list: rebuilding a QListWidget, diffing into RecordListModel, or applying deltas.
+
+Each round changes --changes of N tasks (added, removed or edited), the way a
+sync after a few edits in Notion does. The widget and the diff get the whole
+new list; apply_changes gets only the delta NotionManager passes to its listeners.
+
+Usage: python benchmarks/bench_list_model.py [--tasks N] [--changes K] [--rounds R]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication, QListWidget, QListView
+from list_models import RecordListModel
+from records import Task, Priority
+
+PRIORITIES = list(Priority)
+
+
+def make_tasks(count, rng):
+    return [Task(f"task-{i}", f"Task {i}", f"Type {i % 7}", rng.choice(PRIORITIES)) for i in range(count)]
+
+
+def mutate(tasks, changes, rng, counter):
+    """Return the changed list, and the same change as (upserted, removed ids)."""
+    tasks = list(tasks)
+    upserted, removed = [], []
+    for _ in range(changes):
+        action = rng.choice(['add', 'remove', 'edit'])
+        if action == 'add':
+            counter[0] += 1
+            task = Task(f"new-{counter[0]}", f"New task {counter[0]}", "General")
+            tasks.insert(0, task)
+            upserted.append(task)
+        elif action == 'remove' and tasks:
+            removed.append(tasks.pop(rng.randrange(len(tasks))).id)
+        elif tasks:
+            # An edit makes the task the most recently edited one, so it moves to the top
+            counter[0] += 1
+            task = tasks.pop(rng.randrange(len(tasks)))
+            tasks.insert(0, Task(task.id, task.name, task.type, Priority.HIGH, f"edit-{counter[0]}"))
+            upserted.append(tasks[0])
+    # Like the task store's changes, the delta holds each task's final state once, oldest first
+    present = {task.id for task in tasks}
+    upserted = list({task.id: task for task in upserted if task.id in present}.values())
+    upserted.sort(key=lambda task: -tasks.index(task))
+    removed = [task_id for task_id in removed if task_id not in present]
+    return tasks, upserted, removed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--tasks', type=int, default=5000)
+    arg_parser.add_argument('--changes', type=int, default=5)
+    arg_parser.add_argument('--rounds', type=int, default=20)
+    args = arg_parser.parse_args()
+
+    app = QApplication(sys.argv)
+    rng = random.Random(42)
+    snapshots = [make_tasks(args.tasks, rng)]
+    deltas = []
+    counter = [0]
+    for _ in range(args.rounds):
+        tasks, upserted, removed = mutate(snapshots[-1], args.changes, rng, counter)
+        snapshots.append(tasks)
+        deltas.append((upserted, removed))
+
+    widget = QListWidget()
+    widget.show()
+    started = time.perf_counter()
+    for tasks in snapshots:
+        widget.clear()
+        widget.addItems([str(task) for task in tasks])
+        app.processEvents()
+    widget_ms = (time.perf_counter() - started) * 1000 / len(snapshots)
+
+    model = RecordListModel()
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(model)
+    view.show()
+
+    def run(updates):
+        """Mean ms per update spent in the model, and in the model plus the view's repaint."""
+        model.set_items(snapshots[0])
+        app.processEvents()
+        in_model = total = 0.0
+        for update in updates:
+            started = time.perf_counter()
+            update()
+            updated = time.perf_counter()
+            app.processEvents()
+            in_model += updated - started
+            total += time.perf_counter() - started
+        assert model.rows == snapshots[-1]
+        return in_model * 1000 / len(updates), total * 1000 / len(updates)
+
+    diff_ms = run([lambda tasks=tasks: model.set_items(tasks) for tasks in snapshots[1:]])
+    delta_ms = run([lambda delta=delta: model.apply_changes(*delta) for delta in deltas])
+
+    print(f"{args.tasks} tasks, {args.changes} changes per refresh; ms per refresh (model only / with view)")
+    print(f"QListWidget clear + addItems             {widget_ms:8.2f}")
+    print(f"RecordListModel diff           {diff_ms[0]:8.2f}  {diff_ms[1]:8.2f}")
+    print(f"RecordListModel apply_changes  {delta_ms[0]:8.2f}  {delta_ms[1]:8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Microbenchmark: time a logging call spends on the calling thread.
+
+Compares a plain FileHandler, which formats and writes on the thread that
+logs (as logging.basicConfig did), with the assistant's queue pipeline, where
+a background thread formats, writes and rotates. Every --stall-every records
+the file write is held up by --stall-ms to stand in for a slow or busy disk.
+
+Usage: python benchmarks/bench_logging.py [--records N] [--stall-ms MS] [--stall-every N]
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from log_pipeline import TEXT_FORMAT, setup_logging
+
+
+def stall_writes(handler, every, seconds):
+    """Make every `every`-th emit on handler wait `seconds` before writing."""
+    emit = handler.emit
+    count = 0
+
+    def stalled_emit(record):
+        nonlocal count
+        count += 1
+        if seconds and count % every == 0:
+            time.sleep(seconds)
+        emit(record)
+
+    handler.emit = stalled_emit
+
+
+def measure(records, pause):
+    samples = []
+    for i in range(records):
+        started = time.perf_counter()
+        logging.info("Intent: %s, Entities: %s", "read_tasks", {"TASK_NAME": i})
+        samples.append(time.perf_counter() - started)
+        # Space the calls out roughly like commands, rather than a tight loop
+        time.sleep(pause)
+    return sorted(samples)
+
+
+def report(label, samples):
+    def us(fraction):
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1e6
+
+    print(f"{label:<22} mean {sum(samples) / len(samples) * 1e6:8.1f} us   p50 {us(0.5):7.1f} us"
+          f"   p99 {us(0.99):8.1f} us   max {samples[-1] * 1e6:9.1f} us")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--records', type=int, default=5000)
+    arg_parser.add_argument('--stall-ms', type=float, default=20)
+    arg_parser.add_argument('--stall-every', type=int, default=200)
+    arg_parser.add_argument('--pause-ms', type=float, default=0.2, help="time between logging calls")
+    args = arg_parser.parse_args()
+    stall = args.stall_ms / 1000
+    pause = args.pause_ms / 1000
+    root = logging.getLogger()
+
+    with tempfile.TemporaryDirectory() as directory:
+        handler = logging.FileHandler(os.path.join(directory, 'sync.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        stall_writes(handler, args.stall_every, stall)
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        synchronous = measure(args.records, pause)
+        root.removeHandler(handler)
+        handler.close()
+
+        listener = setup_logging(os.path.join(directory, 'queued.log'))
+        stall_writes(listener.handlers[0], args.stall_every, stall)
+        queued = measure(args.records, pause)
+        listener.stop()
+
+    print(f"{args.records} records, a {args.stall_ms:g} ms stall every {args.stall_every} writes")
+    report("file handler", synchronous)
+    report("queue pipeline", queued)
+
+
+if __name__ == '__main__':
+    main()
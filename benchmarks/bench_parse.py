@@ -0,0 +1,76 @@
+"""Compare per-utterance parse latency of the full spaCy path and the tiered parser.
+
+Usage: python benchmarks/bench_parse.py [--repeat N]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import spacy
+from lazy import LazyResource
+from nlu import CommandParser
+
+UTTERANCES = [
+    "bye",
+    "exit",
+    "read tasks",
+    "show tasks",
+    "what are my tasks",
+    "do i have any tasks",
+    "list events",
+    "what is my schedule",
+    "do i have any events",
+    "what's the weather in london",
+    "how is the weather in new york",
+    "add a task to finish the report",
+    "create a task called prepare presentation urgent",
+    "schedule an event team meeting tomorrow at 10 am",
+    "add an event dentist appointment on friday at 2 pm",
+    "hello there",
+]
+
+
+def measure(parse, repeat):
+    timings = {}
+    for utterance in UTTERANCES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(utterance)
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[utterance] = samples
+    return timings
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--repeat', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    parser = CommandParser(LazyResource('spaCy model', lambda: spacy.load("en_core_web_sm")))
+    # Warm up both paths so model loading doesn't skew the first samples
+    for utterance in UTTERANCES:
+        parser.parse_full(utterance)
+        parser.parse(utterance)
+
+    full = measure(parser.parse_full, args.repeat)
+    tiered = measure(parser.parse, args.repeat)
+
+    print(f"{'utterance':<52}{'intent':<13}{'full ms':>10}{'tiered ms':>11}{'speedup':>9}")
+    for utterance in UTTERANCES:
+        intent = parser.parse(utterance)[0]
+        before = statistics.median(full[utterance])
+        after = statistics.median(tiered[utterance])
+        print(f"{utterance:<52}{str(intent):<13}{before:>10.3f}{after:>11.3f}{before / after:>8.1f}x")
+    all_full = [t for samples in full.values() for t in samples]
+    all_tiered = [t for samples in tiered.values() for t in samples]
+    print(f"\nmean per utterance: full {statistics.mean(all_full):.3f} ms, "
+          f"tiered {statistics.mean(all_tiered):.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Memory per task and parse cost per page: raw Notion JSON, formatted strings and Task records.
+
+The old path kept each page's JSON around or turned it into a display string up
+front; the Task record pulls the fields out once and formats only when shown.
+
+Usage: python benchmarks/bench_records.py [--tasks N] [--page-size P]
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from records import Task
+
+PRIORITIES = ['High', 'Normal', 'Low']
+
+
+def make_page(i, rng):
+    return {
+        "object": "page",
+        "id": f"{rng.getrandbits(128):032x}",
+        "last_edited_time": f"2024-05-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00.000Z",
+        "properties": {
+            "Name": {"id": "title", "type": "title",
+                     "title": [{"type": "text", "text": {"content": f"Task number {i}"}, "plain_text": f"Task number {i}"}]},
+            "Type": {"id": "type", "type": "rich_text",
+                     "rich_text": [{"type": "text", "text": {"content": f"Type {i % 7}"}, "plain_text": f"Type {i % 7}"}]},
+            "Priority": {"id": "prio", "type": "select", "select": {"name": rng.choice(PRIORITIES)}},
+        },
+    }
+
+
+def format_page(page):
+    """What read_tasks used to hand out: one display string per task."""
+    properties = page["properties"]
+    name = properties["Name"]["title"][0]["text"]["content"]
+    task_type = properties["Type"]["rich_text"][0]["text"]["content"]
+    priority = properties["Priority"]["select"]["name"]
+    return f"Task: {name}, Type: {task_type}, Priority: {priority}."
+
+
+def measure(build):
+    """Return (result, bytes allocated and still held) for build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def time_pages(parse, payloads, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for payload in payloads:
+            [parse(page) for page in json.loads(payload)["results"]]
+    return (time.perf_counter() - started) * 1000 / (rounds * len(payloads))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--tasks', type=int, default=100000)
+    arg_parser.add_argument('--page-size', type=int, default=100)
+    arg_parser.add_argument('--rounds', type=int, default=3)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(42)
+    pages = [make_page(i, rng) for i in range(args.tasks)]
+    payloads = [json.dumps({"results": pages[i:i + args.page_size]})
+                for i in range(0, len(pages), args.page_size)]
+
+    def keep(parse):
+        # Parse every page and keep only what parse() returns, as read_tasks would
+        return lambda: [parse(page) for payload in payloads for page in json.loads(payload)["results"]]
+
+    del pages
+    _, raw_bytes = measure(keep(lambda page: page))
+    _, string_bytes = measure(keep(format_page))
+    _, record_bytes = measure(keep(Task.from_notion))
+
+    print(f"{args.tasks} tasks, {args.page_size} per page")
+    print(f"{'':26}{'bytes/task':>12}{'ms/page':>10}")
+    print(f"{'raw JSON dicts':26}{raw_bytes / args.tasks:12.0f}"
+          f"{time_pages(lambda page: page, payloads, args.rounds):10.3f}")
+    print(f"{'formatted strings':26}{string_bytes / args.tasks:12.0f}"
+          f"{time_pages(format_page, payloads, args.rounds):10.3f}")
+    print(f"{'Task records':26}{record_bytes / args.tasks:12.0f}"
+          f"{time_pages(Task.from_notion, payloads, args.rounds):10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Local search latency over a large synthetic task list.
+
+Builds the inverted index once, then measures incremental updates (a sync that
+changed a few tasks) and p50/p95 lookup time for typical spoken queries,
+compared with scanning every task's text for the query words.
+
+Usage: python benchmarks/bench_search.py [--tasks N] [--queries Q]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from records import Task
+from search_index import SearchIndex, terms
+
+VERBS = ['write', 'review', 'send', 'prepare', 'call', 'book', 'pay', 'update', 'plan', 'fix', 'order', 'renew']
+NOUNS = ['report', 'invoice', 'slides', 'dentist', 'budget', 'passport', 'newsletter', 'contract', 'flights',
+         'car insurance', 'team offsite', 'tax return', 'garden', 'website', 'birthday gift', 'quarterly review']
+TYPES = ['Work', 'Personal', 'Errand', 'Finance', 'Health', 'Home']
+QUERIES = [
+    "find tasks about the quarterly report",
+    "find my dentist task",
+    "search for the tax return",
+    "look for invoices",
+    "find anything about the team offsite",
+    "find tasks about the garden website",
+]
+
+
+def make_tasks(count, rng):
+    return [Task(f"task-{i}", f"{rng.choice(VERBS).capitalize()} {rng.choice(NOUNS)} {i}", rng.choice(TYPES))
+            for i in range(count)]
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def scan(tasks, query):
+    words = set(terms(query))
+    return [task for task in tasks if words & set(terms(f"{task.name} {task.type}"))]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--tasks', type=int, default=50000)
+    arg_parser.add_argument('--queries', type=int, default=200)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(42)
+    tasks = make_tasks(args.tasks, rng)
+    index = SearchIndex(lambda task: f"{task.name} {task.type}")
+    started = time.perf_counter()
+    index.replace(tasks)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    update_samples = []
+    for round_number in range(20):
+        changed = [Task(task.id, f"Renamed {task.name} {round_number}", task.type) for task in rng.sample(tasks, 10)]
+        started = time.perf_counter()
+        index.upsert(changed)
+        update_samples.append((time.perf_counter() - started) * 1000)
+
+    search_samples = []
+    for i in range(args.queries):
+        query = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        index.search(query, 5)
+        search_samples.append((time.perf_counter() - started) * 1000)
+
+    scan_samples = []
+    for query in QUERIES:
+        started = time.perf_counter()
+        scan(tasks, query)
+        scan_samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"{args.tasks} tasks")
+    print(f"index build                 {build_ms:9.1f} ms")
+    print(f"update 10 tasks        p50  {percentile(update_samples, 0.5):9.3f} ms")
+    print(f"indexed search         p50  {percentile(search_samples, 0.5):9.3f} ms   "
+          f"p95 {percentile(search_samples, 0.95):.3f} ms")
+    print(f"linear scan            p50  {percentile(scan_samples, 0.5):9.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
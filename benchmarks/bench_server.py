@@ -0,0 +1,164 @@
+"""Load test for server mode, against the in-memory service stubs.
+
+Starts the server in-process on a free port. --clients threads then each
+open sessions over HTTP, run --commands commands in each and close it, for
+--seconds. Reports sessions/sec, per-command latency and how many requests
+were turned away by backpressure. Afterwards it opens --idle-sessions idle
+sessions and reports the memory each one holds.
+
+The command mix stays on the parser's lexical fast path, so it needs no
+spaCy model.
+
+Usage: python benchmarks/bench_server.py [--clients N] [--workers N] [--queue N] [--seconds S]
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import argparse
+import threading
+import tracemalloc
+import http.client
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import nlp, intent_registry
+from nlu import CommandParser
+from headless import make_managers
+from server import create_server
+
+COMMANDS = [
+    "read tasks",
+    "what are my tasks",
+    "show events next week",
+    "what's on friday",
+    "find tasks about sample",
+    "brief me",
+]
+
+
+def request(port, method, path, body=None):
+    """Return (status, decoded JSON body)."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        connection.request(method, path, payload, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+    except (BrokenPipeError, ConnectionResetError):
+        # A busy server answers 503 and closes without reading the body
+        return 503, {}
+    finally:
+        connection.close()
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else 0.0
+
+
+def client(port, deadline, commands, rng, stats, lock):
+    latencies, sessions, busy = [], 0, 0
+
+    def call(method, path, body=None):
+        nonlocal busy
+        while True:
+            started = time.perf_counter()
+            status, data = request(port, method, path, body)
+            if status != 503:
+                return status, data, (time.perf_counter() - started) * 1000
+            busy += 1
+            time.sleep(0.01)
+
+    while time.monotonic() < deadline:
+        status, data, _ = call('POST', '/sessions')
+        session = data['session']
+        for _ in range(commands):
+            status, data, ms = call('POST', f'/sessions/{session}', {'text': rng.choice(COMMANDS)})
+            latencies.append(ms)
+        call('DELETE', f'/sessions/{session}')
+        sessions += 1
+    with lock:
+        stats['latencies'] += latencies
+        stats['sessions'] += sessions
+        stats['busy'] += busy
+
+
+def resident_bytes():
+    """Resident set size from /proc, or None where that is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def session_memory(server, count):
+    """(Python bytes, resident bytes or None) held per idle session.
+
+    tracemalloc sees only Python allocations; each session's SQLite context
+    store allocates outside it, which the resident size includes.
+    """
+    gc.collect()
+    rss_before = resident_bytes()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [server.sessions.create() for _ in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = resident_bytes()
+    for session in sessions:
+        server.sessions.close(session.id)
+    rss = (rss_after - rss_before) / count if rss_before is not None else None
+    return (after - before) / count, rss
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--clients', type=int, default=16)
+    arg_parser.add_argument('--workers', type=int, default=8)
+    arg_parser.add_argument('--queue', type=int, default=8)
+    arg_parser.add_argument('--commands', type=int, default=3, help="commands per session")
+    arg_parser.add_argument('--seconds', type=float, default=5)
+    arg_parser.add_argument('--idle-sessions', type=int, default=200)
+    arg_parser.add_argument('--stub-latency-ms', type=float, default=5)
+    args = arg_parser.parse_args()
+
+    managers = make_managers(stub=True, latency_ms=args.stub_latency_ms)
+    server = create_server(0, managers, CommandParser(nlp, intent_registry), workers=args.workers,
+                           max_pending=args.queue, max_sessions=args.clients * 4 + args.idle_sessions)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    stats = {'latencies': [], 'sessions': 0, 'busy': 0}
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.seconds
+    threads = [threading.Thread(target=client, args=(port, deadline, args.commands, random.Random(i), stats, lock))
+               for i in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = stats['latencies']
+    print(f"{args.clients} clients, {args.workers} workers, queue {args.queue}, "
+          f"{args.commands} commands per session, stub latency {args.stub_latency_ms:g} ms")
+    print(f"sessions/sec           {stats['sessions'] / elapsed:9.1f}")
+    print(f"commands/sec           {len(latencies) / elapsed:9.1f}")
+    print(f"command latency   p50  {percentile(latencies, 0.5):9.2f} ms   p95 {percentile(latencies, 0.95):.2f} ms"
+          f"   p99 {percentile(latencies, 0.99):.2f} ms")
+    print(f"turned away (503)      {stats['busy']:9d}")
+    python_bytes, resident = session_memory(server, args.idle_sessions)
+    print(f"memory per session     {python_bytes / 1024:9.1f} KiB Python"
+          + (f", {resident / 1024:.1f} KiB resident" if resident is not None else ""))
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    main()
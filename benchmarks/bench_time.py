@@ -0,0 +1,68 @@
+"""Microbenchmark: spoken time expressions through plain dateparser versus TimeResolver.
+
+TimeResolver handles the common forms with a compiled parser and caches the
+rest, so the cold run shows the fast path plus one dateparser call per
+uncommon phrase, and the warm run shows repeated phrases.
+
+Usage: python benchmarks/bench_time.py [--rounds N]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import dateparser
+from time_parser import TimeResolver, parse_spec
+
+EXPRESSIONS = [
+    "tomorrow at 3pm",
+    "next monday",
+    "in 2 hours",
+    "friday at 10:30 am",
+    "tonight at 8",
+    "3 p.m. on thursday",
+    "the day after tomorrow at noon",
+    "tomorrow morning",
+    "in 45 minutes",
+    "10 am",
+    "December 25th at 5pm",
+    "next week",
+]
+
+
+def time_calls(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        for text in EXPRESSIONS:
+            started = time.perf_counter()
+            func(text)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return sum(samples) / len(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument('--rounds', type=int, default=50)
+    args = arg_parser.parse_args()
+
+    # Load dateparser's language data before timing
+    dateparser.parse("tomorrow")
+    resolver = TimeResolver()
+
+    fast = sum(parse_spec(text) is not None for text in EXPRESSIONS)
+    print(f"{fast} of {len(EXPRESSIONS)} expressions take the fast path")
+    print(f"{'parser':<28}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    results = [("dateparser.parse", time_calls(dateparser.parse, args.rounds))]
+    parse_spec.cache_clear()
+    resolver.cache.clear()
+    results.append(("TimeResolver (cold)", time_calls(resolver.resolve, 1)))
+    results.append(("TimeResolver (warm)", time_calls(resolver.resolve, args.rounds)))
+    for name, (mean, p50, p95) in results:
+        print(f"{name:<28}{mean:>10.3f}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import json
+import time
+import sqlite3
+import threading
+
+
+class ContextStore:
+    """Conversation context that survives restarts: short-lived values plus recent requests.
+
+    Values such as last_location are set like dict items and expire ttl seconds
+    after they were written (or after their own ttl). The history keeps the
+    last max_history (intent, entities) requests. Reads come from memory;
+    every write also goes to SQLite, so a restart picks up where it left off.
+    """
+
+    def __init__(self, path='assistant.db', ttl=86400, max_history=50):
+        self.ttl = ttl
+        self.max_history = max_history
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS context (name TEXT PRIMARY KEY, value TEXT, updated REAL, expires REAL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS context_history ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, intent TEXT, entities TEXT, created REAL)"
+            )
+            now = time.time()
+            self.conn.execute("DELETE FROM context WHERE expires <= ?", (now,))
+            rows = self.conn.execute("SELECT name, value, updated, expires FROM context").fetchall()
+        self.values = {name: (json.loads(value), updated, expires) for name, value, updated, expires in rows}
+
+    def get(self, name, default=None, max_age=None):
+        """Return a value that has not expired, and is at most max_age seconds old if given."""
+        entry = self.values.get(name)
+        if entry is None:
+            return default
+        value, updated, expires = entry
+        now = time.time()
+        if now >= expires or (max_age is not None and now - updated > max_age):
+            return default
+        return value
+
+    def set(self, name, value, ttl=None):
+        now = time.time()
+        expires = now + (ttl if ttl is not None else self.ttl)
+        with self.lock, self.conn:
+            self.values[name] = (value, now, expires)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO context (name, value, updated, expires) VALUES (?, ?, ?, ?)",
+                (name, json.dumps(value, default=str), now, expires)
+            )
+
+    def pop(self, name, default=None):
+        value = self.get(name, default)
+        with self.lock, self.conn:
+            self.values.pop(name, None)
+            self.conn.execute("DELETE FROM context WHERE name = ?", (name,))
+        return value
+
+    def __getitem__(self, name):
+        value = self.get(name, KeyError)
+        if value is KeyError:
+            raise KeyError(name)
+        return value
+
+    def __setitem__(self, name, value):
+        self.set(name, value)
+
+    def __contains__(self, name):
+        return self.get(name, KeyError) is not KeyError
+
+    def record(self, intent, entities):
+        """Add a request to the history, dropping the oldest beyond max_history."""
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO context_history (intent, entities, created) VALUES (?, ?, ?)",
+                (intent, json.dumps(entities, default=str), time.time())
+            )
+            self.conn.execute("DELETE FROM context_history WHERE seq <= ?", (cursor.lastrowid - self.max_history,))
+
+    def history(self, limit=None):
+        """Recent (intent, entities, created) requests, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT intent, entities, created FROM context_history ORDER BY seq DESC LIMIT ?",
+                (limit or self.max_history,)
+            ).fetchall()
+        return [(intent, json.loads(entities), created) for intent, entities, created in reversed(rows)]
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.values.clear()
+            self.conn.execute("DELETE FROM context")
+            self.conn.execute("DELETE FROM context_history")
@@ -0,0 +1,199 @@
+import re
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from records import Event
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+WINDOW_RE = re.compile(
+    r"\b(between .+? and .+|today|tonight|tomorrow|this weekend|(?:this|next) (?:week|month)"
+    r"|(?:next |this |on )?(?:" + "|".join(WEEKDAYS) + r"))\b"
+)
+
+
+def find_time_window(text):
+    """Return the time-window phrase in a command ("next week", "on friday"...), or None."""
+    match = WINDOW_RE.search(text.lower())
+    return match.group(1) if match else None
+
+
+def resolve_time_window(phrase, now=None):
+    """Turn a window phrase into a (start, end) pair of aware datetimes, or None."""
+    now = now or datetime.now().astimezone()
+    phrase = phrase.lower().strip()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = timedelta(days=1)
+    if phrase.startswith('between '):
+        import dateparser
+        first, _, second = phrase[len('between '):].partition(' and ')
+        settings = {'RELATIVE_BASE': now.replace(tzinfo=None), 'PREFER_DATES_FROM': 'future',
+                    'RETURN_AS_TIMEZONE_AWARE': True}
+        start = dateparser.parse(first, settings=settings)
+        if not start:
+            return None
+        # The end is the first such time after the start: on a Wednesday, "between monday and friday"
+        # runs from next Monday to the Friday after it, not back to this Friday
+        end = dateparser.parse(second, settings={**settings, 'RELATIVE_BASE': start.replace(tzinfo=None)})
+        if not end:
+            return None
+        # "between monday and friday" includes all of Friday
+        if end.hour == 0 and end.minute == 0:
+            end += day
+        return start, end
+    if phrase == 'today':
+        return today, today + day
+    if phrase == 'tonight':
+        return today.replace(hour=18), today + day
+    if phrase == 'tomorrow':
+        return today + day, today + 2 * day
+    week_start = today - timedelta(days=today.weekday())
+    if phrase == 'this week':
+        return now, week_start + 7 * day
+    if phrase == 'next week':
+        return week_start + 7 * day, week_start + 14 * day
+    if phrase == 'this weekend':
+        return week_start + 5 * day, week_start + 7 * day
+    if phrase in ('this month', 'next month'):
+        month_start = today.replace(day=1)
+        if phrase == 'next month':
+            month_start = (month_start + 32 * day).replace(day=1)
+        return max(now, month_start), (month_start + 32 * day).replace(day=1)
+    words = phrase.split()
+    if words and words[-1] in WEEKDAYS:
+        days_ahead = (WEEKDAYS.index(words[-1]) - today.weekday()) % 7
+        if words[0] == 'next' and days_ahead == 0:
+            days_ahead = 7
+        start = today + days_ahead * day
+        return start, start + day
+    return None
+
+
+class EventStore:
+    """Local SQLite copy of calendar events, indexed by start time.
+
+    on_change(events, removed_ids), when given, is called after every write.
+    """
+
+    def __init__(self, path='assistant.db', on_change=None):
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id TEXT PRIMARY KEY, summary TEXT, start_ts REAL, end_ts REAL, start_raw TEXT)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS events_start ON events (start_ts)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            if value is None:
+                self.conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def apply_changes(self, events):
+        """Upsert changed events and delete cancelled ones. Returns the ids seen."""
+        rows, changed, removed, seen = [], [], [], set()
+        for item in events:
+            seen.add(item['id'])
+            event = Event.from_google(item)
+            if event is None:
+                removed.append((item['id'],))
+                continue
+            changed.append(event)
+            start_raw = item['start'].get('dateTime', item['start'].get('date'))
+            rows.append((event.id, event.summary, event.start.timestamp(), event.end.timestamp(), start_raw))
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO events (id, summary, start_ts, end_ts, start_raw) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.executemany("DELETE FROM events WHERE id = ?", removed)
+        if self.on_change:
+            self.on_change(changed, [row[0] for row in removed])
+        return seen
+
+    def retain_only(self, ids):
+        """Delete every event not in ids, after a full sync."""
+        with self.lock, self.conn:
+            stale = [(row[0],) for row in self.conn.execute("SELECT id FROM events") if row[0] not in ids]
+            self.conn.executemany("DELETE FROM events WHERE id = ?", stale)
+        if self.on_change and stale:
+            self.on_change([], [row[0] for row in stale])
+
+    @staticmethod
+    def to_event(row):
+        event_id, summary, end_ts, start_raw = row
+        start = datetime.fromisoformat(start_raw.replace('Z', '+00:00'))
+        all_day = 'T' not in start_raw
+        if all_day:
+            start = start.astimezone()
+        return Event(event_id, summary, start, datetime.fromtimestamp(end_ts, start.tzinfo), all_day)
+
+    def events_between(self, start, end, limit=None):
+        """Return Events overlapping [start, end), in start order."""
+        query = "SELECT id, summary, end_ts, start_raw FROM events WHERE end_ts > ? AND start_ts < ? ORDER BY start_ts"
+        params = [start.timestamp(), end.timestamp()]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [self.to_event(row) for row in rows]
+
+    def all_events(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT id, summary, end_ts, start_raw FROM events").fetchall()
+        return [self.to_event(row) for row in rows]
+
+    def upcoming(self, now, limit):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, summary, end_ts, start_raw FROM events WHERE end_ts > ? ORDER BY start_ts LIMIT ?",
+                (now.timestamp(), limit)
+            ).fetchall()
+        return [self.to_event(row) for row in rows]
+
+
+def sync_events(service, store, calendar_id='primary', execute=None):
+    """Bring the store up to date with a full sync, or an incremental one when a syncToken is saved.
+
+    execute(request) runs each API request; by default it just calls request.execute().
+    """
+    execute = execute or (lambda request: request.execute())
+    sync_token = store.get_meta('calendar_sync_token')
+    params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': 250}
+    if sync_token:
+        params['syncToken'] = sync_token
+    seen = set()
+    page_token = None
+    while True:
+        try:
+            result = execute(service.events().list(pageToken=page_token, **params))
+        except Exception as e:
+            # 410 Gone: the sync token expired, so start over with a full sync
+            if sync_token and getattr(getattr(e, 'resp', None), 'status', None) == 410:
+                logging.info("Calendar sync token expired; running a full sync.")
+                store.set_meta('calendar_sync_token', None)
+                return sync_events(service, store, calendar_id, execute)
+            raise
+        seen |= store.apply_changes(result.get('items', []))
+        page_token = result.get('nextPageToken')
+        if not page_token:
+            break
+    if not sync_token:
+        store.retain_only(seen)
+    store.set_meta('calendar_sync_token', result.get('nextSyncToken'))
+    return len(seen)
@@ -0,0 +1,160 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+
+
+def utcnow():
+    # google-auth keeps credential expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class GoogleServiceFactory:
+    """Builds Google API clients once and keeps their credentials fresh.
+
+    The discovery document for each API is kept in cache_dir, so building a
+    client never goes to the network; a stub document placed there is used as
+    is, which also makes the clients buildable offline. Every client shares
+    one authorized httplib2 transport, so its connection is reused, and the
+    OAuth token is refreshed on a background timer refresh_margin seconds
+    before it expires instead of on the first request after it has.
+    """
+
+    def __init__(self, scopes=SCOPES, token_path='token.json', secrets_path='credentials.json',
+                 cache_dir='.discovery_cache', refresh_margin=300, timeout=30, http=None):
+        self.scopes = scopes
+        self.token_path = token_path
+        self.secrets_path = secrets_path
+        self.cache_dir = cache_dir
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.lock = threading.RLock()
+        self.creds = None
+        # A ready-made transport (e.g. googleapiclient.http.HttpMock) skips authorization entirely
+        self.http = http
+        self.services = {}
+        self.refresh_timer = None
+
+    def discovery_document(self, api, version):
+        """Return the parsed discovery document, from the disk cache when it is there."""
+        path = os.path.join(self.cache_dir, f"{api}.{version}.json")
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning("Ignoring unreadable discovery document %s: %s", path, e)
+        from googleapiclient import discovery_cache
+        document = discovery_cache.get_static_doc(api, version)
+        if document is None:
+            document = self.fetch_discovery_document(api, version)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(document)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logging.warning("Could not cache discovery document %s: %s", path, e)
+        return json.loads(document)
+
+    def fetch_discovery_document(self, api, version):
+        import httplib2
+        response, content = httplib2.Http(timeout=self.timeout).request(DISCOVERY_URL.format(api=api, version=version))
+        if response.status >= 400:
+            raise RuntimeError(f"Discovery document for {api} {version} returned HTTP {response.status}")
+        return content.decode('utf-8')
+
+    def credentials(self, interactive=True):
+        """Return valid credentials, or None. Signs in through the browser only if interactive."""
+        from google.oauth2.credentials import Credentials
+        with self.lock:
+            if self.creds is None and os.path.exists(self.token_path):
+                try:
+                    self.creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+                except Exception as e:
+                    logging.error("Invalid token.json file.")
+            try:
+                if self.creds and not self.creds.valid and self.creds.refresh_token:
+                    self.refresh()
+                elif not self.creds or not self.creds.valid:
+                    if not interactive:
+                        return None
+                    from google_auth_oauthlib.flow import InstalledAppFlow
+                    flow = InstalledAppFlow.from_client_secrets_file(self.secrets_path, self.scopes)
+                    self.creds = flow.run_local_server(port=0)
+                    self.save_token()
+            except Exception as e:
+                logging.exception("Failed to authenticate with Google.")
+                return None
+            self.schedule_refresh()
+            return self.creds
+
+    def refresh(self):
+        from google.auth.transport.requests import Request
+        with self.lock:
+            self.creds.refresh(Request())
+            self.save_token()
+
+    def save_token(self):
+        with open(self.token_path + '.tmp', 'w') as token:
+            token.write(self.creds.to_json())
+        os.replace(self.token_path + '.tmp', self.token_path)
+
+    def schedule_refresh(self, delay=None):
+        """Start the timer that renews the token before it expires, unless one is running."""
+        with self.lock:
+            if self.refresh_timer is not None and self.refresh_timer.is_alive():
+                return
+            if not self.creds or not self.creds.refresh_token or not self.creds.expiry:
+                return
+            if delay is None:
+                delay = max((self.creds.expiry - utcnow()).total_seconds() - self.refresh_margin, 0)
+            self.refresh_timer = threading.Timer(delay, self.background_refresh)
+            self.refresh_timer.daemon = True
+            self.refresh_timer.start()
+
+    def background_refresh(self):
+        with self.lock:
+            self.refresh_timer = None
+            try:
+                self.refresh()
+                logging.debug("Refreshed the Google token ahead of its expiry.")
+                self.schedule_refresh()
+            except Exception as e:
+                # Offline, most likely; the token is still good until it expires
+                logging.warning("Background Google token refresh failed: %s", e)
+                self.schedule_refresh(delay=60)
+
+    def authorized_http(self, interactive=True):
+        with self.lock:
+            if self.http is None:
+                creds = self.credentials(interactive)
+                if creds is None:
+                    return None
+                import httplib2
+                from google_auth_httplib2 import AuthorizedHttp
+                self.http = AuthorizedHttp(creds, http=httplib2.Http(timeout=self.timeout))
+            return self.http
+
+    def service(self, api, version, interactive=True):
+        """Return the client for an API, building it on first use, or None if not signed in."""
+        with self.lock:
+            service = self.services.get((api, version))
+            if service is None:
+                http = self.authorized_http(interactive)
+                if http is None:
+                    return None
+                from googleapiclient.discovery import build_from_document
+                service = build_from_document(self.discovery_document(api, version), http=http)
+                self.services[(api, version)] = service
+            return service
+
+    def close(self):
+        with self.lock:
+            if self.refresh_timer is not None:
+                self.refresh_timer.cancel()
+                self.refresh_timer = None
@@ -0,0 +1,211 @@
+"""Headless text mode: run commands through the assistant without a microphone, TTS or window.
+
+Commands are read one per line as plain text, or as JSON objects like
+{"id": 1, "text": "add a task", "answers": ["buy milk", "errand"]} where
+"answers" are replies to any follow-up questions. Each result is written as
+one JSON line.
+
+Usage:
+    python headless.py [--input FILE] [--output FILE] [--stub]
+    python headless.py --socket PORT [--stub]
+    python headless.py --batch FILE [--processes N] [--parse-only] [--stub]
+"""
+import sys
+import json
+import time
+import argparse
+import socketserver
+
+from app import Assistant, NotionManager, CalendarManager, WeatherManager, nlp, intent_registry
+from nlu import CommandParser
+from context_store import ContextStore
+from stub_services import StubNotionManager, StubCalendarManager, StubWeatherManager
+
+
+class ReplyCollector:
+    """Stands in for SpeechOutput and records what the assistant would have said."""
+
+    def __init__(self):
+        self.replies = []
+
+    def say(self, text):
+        self.replies.append(text)
+
+    def cancel(self):
+        pass
+
+    def wait_until_idle(self, timeout=None):
+        return True
+
+    def is_echo(self, heard):
+        return False
+
+
+class HeadlessAssistant(Assistant):
+    """Assistant whose input is text and whose output is a structured reply."""
+
+    def __init__(self, **kwargs):
+        self.collector = ReplyCollector()
+        # Each headless session starts from an empty context and leaves the user's saved one alone
+        kwargs.setdefault('context', ContextStore(':memory:'))
+        super().__init__(speech_output=self.collector, **kwargs)
+        self.answers = []
+        self.data = {}
+        self.update_tasks_signal.connect(lambda tasks: self.data.__setitem__('tasks', tasks))
+        self.update_events_signal.connect(lambda events: self.data.__setitem__('events', events))
+        self.update_weather_signal.connect(lambda report: self.data.__setitem__('weather', report))
+        self.update_status_signal.connect(lambda summary: self.data.__setitem__('summary', summary))
+
+    def follow_tasks(self, manager):
+        # Sessions share one manager, which would keep every session's listener alive
+        return manager
+
+    def listen(self, prompt=None):
+        """Answer follow-up questions from the command's "answers" list instead of the microphone."""
+        if prompt:
+            self.speak(prompt)
+        return self.answers.pop(0).lower() if self.answers else None
+
+    def process(self, text, answers=(), parsed=None):
+        """Run one command end to end and return the result as a dict."""
+        self.collector.replies = []
+        self.answers = list(answers)
+        self.data = {}
+        started = time.perf_counter()
+        commands = [parsed] if parsed else self.parse_commands(text)
+        intent, entities, priority = commands[0]
+        parsed_at = time.perf_counter()
+        exited = False
+        if intent:
+            try:
+                self.handle_commands(commands)
+            except SystemExit:
+                exited = True
+        else:
+            self.speak("I'm sorry, I didn't catch that. Could you please repeat?")
+        finished = time.perf_counter()
+        return {
+            'command': text,
+            'intent': intent,
+            'entities': entities,
+            'priority': priority,
+            'intents': [command[0] for command in commands],
+            'replies': self.collector.replies,
+            'data': self.data,
+            'parse_ms': (parsed_at - started) * 1000,
+            'handle_ms': (finished - parsed_at) * 1000,
+            'exit': exited,
+        }
+
+
+def make_managers(stub=False, latency_ms=0):
+    if stub:
+        return {
+            'notion_manager': StubNotionManager(latency_ms),
+            'calendar_manager': StubCalendarManager(latency_ms),
+            'weather_manager': StubWeatherManager(latency_ms),
+        }
+    return {
+        'notion_manager': NotionManager(),
+        'calendar_manager': CalendarManager(),
+        'weather_manager': WeatherManager(),
+    }
+
+
+def read_command(line):
+    """Decode a plain-text or JSON command line into (id, text, answers)."""
+    line = line.strip()
+    if line.startswith('{'):
+        command = json.loads(line)
+        return command.get('id'), command['text'], command.get('answers', [])
+    return None, line, []
+
+
+def process_stream(assistant, lines, output):
+    for line in lines:
+        if not line.strip():
+            continue
+        command_id, text, answers = read_command(line)
+        result = assistant.process(text, answers)
+        if command_id is not None:
+            result['id'] = command_id
+        output.write(json.dumps(result, default=str) + "\n")
+        output.flush()
+        if result['exit']:
+            break
+
+
+def process_batch(assistant, lines, output, processes=1, parse_only=False):
+    """Parse a corpus with nlp.pipe across processes, then dispatch each command."""
+    commands = [read_command(line) for line in lines if line.strip()]
+    parsed = assistant.parser.parse_many([text for _, text, _ in commands], n_process=processes)
+    for (command_id, text, answers), (intent, entities, priority) in zip(commands, parsed):
+        if parse_only:
+            result = {'command': text, 'intent': intent, 'entities': entities, 'priority': priority}
+        else:
+            result = assistant.process(text, answers, parsed=(intent, entities, priority))
+        if command_id is not None:
+            result['id'] = command_id
+        output.write(json.dumps(result, default=str) + "\n")
+
+
+def serve(port, managers, parser):
+    """Serve commands over a local TCP socket; each connection is its own session."""
+
+    class CommandHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            assistant = HeadlessAssistant(parser=parser, **managers)
+            lines = (line.decode('utf-8') for line in self.rfile)
+            writer = self.wfile
+
+            class SocketOutput:
+                def write(self, text):
+                    writer.write(text.encode('utf-8'))
+
+                def flush(self):
+                    writer.flush()
+
+            process_stream(assistant, lines, SocketOutput())
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(('127.0.0.1', port), CommandHandler) as server:
+        print(f"Listening for commands on 127.0.0.1:{port}", file=sys.stderr)
+        server.serve_forever()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run assistant commands from text instead of speech")
+    arg_parser.add_argument('--input', metavar='FILE', help="read commands from FILE instead of stdin")
+    arg_parser.add_argument('--output', metavar='FILE', help="write results to FILE instead of stdout")
+    arg_parser.add_argument('--socket', type=int, metavar='PORT', help="accept commands on a local TCP port")
+    arg_parser.add_argument('--batch', metavar='FILE', help="parse a command corpus in batch with nlp.pipe")
+    arg_parser.add_argument('--processes', type=int, default=1, help="spaCy worker processes for --batch")
+    arg_parser.add_argument('--parse-only', action='store_true', help="with --batch, only report parse results")
+    arg_parser.add_argument('--stub', action='store_true', help="use in-memory Notion, Calendar and Weather stubs")
+    arg_parser.add_argument('--stub-latency-ms', type=float, default=0, help="simulated latency per stub call")
+    args = arg_parser.parse_args()
+
+    managers = make_managers(args.stub, args.stub_latency_ms)
+    parser = CommandParser(nlp, intent_registry)
+    if args.socket:
+        serve(args.socket, managers, parser)
+        return
+
+    assistant = HeadlessAssistant(parser=parser, **managers)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.batch:
+            with open(args.batch, encoding='utf-8') as f:
+                process_batch(assistant, f.readlines(), output, args.processes, args.parse_only)
+        elif args.input:
+            with open(args.input, encoding='utf-8') as f:
+                process_stream(assistant, f, output)
+        else:
+            process_stream(assistant, sys.stdin, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
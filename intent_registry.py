@@ -0,0 +1,220 @@
+import os
+import json
+import logging
+import hashlib
+import importlib
+import importlib.util
+import threading
+
+# Plugin modules shipped with the assistant; ASSISTANT_PLUGINS adds more
+DEFAULT_PLUGINS = (
+    'plugins.tasks',
+    'plugins.calendar',
+    'plugins.weather',
+    'plugins.search',
+    'plugins.briefing',
+    'plugins.session',
+)
+
+# Bump when the cache layout or the trie format changes
+CACHE_VERSION = 2
+
+
+class Slot:
+    """One entity an intent needs before its handler runs.
+
+    question names it in a prompt ("the event name"). A missing slot is taken
+    from the context entry `recall` when that is set and recent enough,
+    otherwise asked for; an optional slot that is still missing gets default.
+    kind 'time' lets the answer to a combined prompt carry the time as well.
+    missing is said when a required slot could not be filled.
+    """
+
+    __slots__ = ('name', 'question', 'required', 'default', 'kind', 'recall', 'recall_ttl', 'missing')
+
+    def __init__(self, name, question, required=True, default=None, kind='text', recall=None, recall_ttl=None,
+                 missing=None):
+        self.name = name
+        self.question = question
+        self.required = required
+        self.default = default
+        self.kind = kind
+        self.recall = recall
+        self.recall_ttl = recall_ttl
+        self.missing = missing or f"I need {question} to do that."
+
+
+class Intent:
+    """One intent as declared by a plugin.
+
+    patterns are spaCy Matcher patterns. handle(assistant, entities, priority)
+    carries out the request. Entities come from extract(command, tokens) when
+    given, otherwise from the spaCy components in pipes: () needs none, None
+    runs the full pipeline, and the object of the matched verb is stored under
+    object_entity. Read-only intents also give fetch(assistant, entities),
+    returning a (func, *args) call that can run alongside other services, and
+    report(assistant, result, entities), which turns its result into speech;
+    topics are words that ask for them again after "and". prefetch(assistant,
+    within) returns a call that refreshes the intent's data in the background,
+    or None if it will still be fresh in `within` seconds. slots are filled
+    by the slot filler before handle is called. services names the assistant
+    managers the intent uses, e.g. 'notion_manager', so startup only loads
+    the clients of integrations that recent requests used.
+    """
+
+    __slots__ = ('name', 'patterns', 'handle', 'pipes', 'extract', 'object_entity',
+                 'fetch', 'report', 'part_name', 'topics', 'prefetch', 'slots', 'services')
+
+    def __init__(self, name, patterns, handle, pipes=(), extract=None, object_entity=None,
+                 fetch=None, report=None, part_name=None, topics=(), prefetch=None, slots=(), services=()):
+        self.name = name
+        self.patterns = patterns
+        self.handle = handle
+        self.pipes = None if pipes is None else tuple(pipes)
+        self.extract = extract
+        self.object_entity = object_entity
+        self.fetch = fetch
+        self.report = report
+        self.part_name = part_name or name.replace('_', ' ')
+        self.topics = tuple(topics)
+        self.prefetch = prefetch
+        self.slots = tuple(slots)
+        self.services = tuple(services)
+
+    @property
+    def needs_pipeline(self):
+        return self.extract is None and self.pipes != ()
+
+
+def plugin_modules():
+    """The built-in plugins plus any listed in ASSISTANT_PLUGINS (comma separated module names)."""
+    extra = [name.strip() for name in os.getenv("ASSISTANT_PLUGINS", "").split(",") if name.strip()]
+    return list(DEFAULT_PLUGINS) + [name for name in extra if name not in DEFAULT_PLUGINS]
+
+
+class IntentRegistry:
+    """Dispatch table from intent names to the plugins that declare them.
+
+    A plugin module is imported the first time one of its intents is parsed or
+    handled, so an integration nobody uses never loads its client library. The
+    intent manifest and the compiled word trie are cached in a JSON file keyed
+    by the plugins' source, so a start with unchanged plugins imports none of
+    them and skips compiling the patterns.
+    """
+
+    def __init__(self, modules=DEFAULT_PLUGINS, cache_path=None):
+        self.modules = list(modules)
+        self.cache_path = cache_path
+        self.lock = threading.RLock()
+        # Intents of the plugins imported so far; lookups are a dict access
+        self.intents = {}
+        self.owners = {}
+        self.imported = set()
+        # name -> {'module', 'read', 'topics', 'services'} for every intent, loaded from the cache or the plugins
+        self.manifest = None
+        self.trie = None
+        self.read_names = set()
+        self.topic_intents = {}
+
+    def source_key(self):
+        digest = hashlib.sha1(str(CACHE_VERSION).encode())
+        for module in self.modules:
+            digest.update(module.encode())
+            spec = importlib.util.find_spec(module)
+            if spec is None or not spec.origin:
+                raise ImportError(f"Intent plugin {module} not found")
+            with open(spec.origin, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()
+
+    def load(self):
+        """Read the manifest and trie from the cache, or import the plugins and build them."""
+        with self.lock:
+            if self.manifest is not None:
+                return
+            key = self.source_key()
+            cached = self.read_cache()
+            if cached and cached.get('key') == key:
+                manifest, self.trie = cached['manifest'], cached['trie']
+            else:
+                from nlu import LexicalIntentMatcher
+                patterns = self.patterns()
+                manifest = {
+                    name: {'module': self.owners[name], 'read': intent.fetch is not None, 'topics': list(intent.topics),
+                           'services': list(intent.services)}
+                    for name, intent in self.intents.items()
+                }
+                self.trie = LexicalIntentMatcher(patterns).root
+                self.write_cache({'key': key, 'manifest': manifest, 'trie': self.trie})
+            self.read_names = {name for name, entry in manifest.items() if entry['read']}
+            self.topic_intents = {topic: name for name, entry in manifest.items() for topic in entry['topics']}
+            self.manifest = manifest
+
+    def read_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable intent cache %s: %s", self.cache_path, e)
+            return None
+
+    def write_cache(self, data):
+        if not self.cache_path:
+            return
+        try:
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logging.warning("Could not write intent cache %s: %s", self.cache_path, e)
+
+    def import_module(self, module):
+        with self.lock:
+            if module in self.imported:
+                return
+            plugin = importlib.import_module(module)
+            for intent in plugin.INTENTS:
+                if intent.name in self.owners and self.owners[intent.name] != module:
+                    logging.warning("Intent %s from %s replaces the one from %s.",
+                                    intent.name, module, self.owners[intent.name])
+                self.intents[intent.name] = intent
+                self.owners[intent.name] = module
+            self.imported.add(module)
+
+    def patterns(self):
+        """Matcher patterns of every intent; imports all plugins."""
+        for module in self.modules:
+            self.import_module(module)
+        return {name: intent.patterns for name, intent in self.intents.items()}
+
+    def intent(self, name):
+        """Return the Intent for a name, importing its plugin on first use, or None if unknown."""
+        intent = self.intents.get(name)
+        if intent is None:
+            self.load()
+            entry = self.manifest.get(name)
+            if entry is None:
+                return None
+            self.import_module(entry['module'])
+            intent = self.intents.get(name)
+        return intent
+
+    def services(self, names):
+        """The managers used by the named intents, without importing their plugins."""
+        self.load()
+        return {service for name in names for service in self.manifest.get(name, {}).get('services', ())}
+
+    @property
+    def read_intents(self):
+        """Intents that can be answered together in one composite reply."""
+        self.load()
+        return self.read_names
+
+    @property
+    def topics(self):
+        """Words that continue a read request, as in "my tasks and events and the weather"."""
+        self.load()
+        return self.topic_intents
@@ -0,0 +1,142 @@
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import namedtuple
+
+JournalEntry = namedtuple('JournalEntry', 'seq key kind payload created attempts')
+
+
+def new_key():
+    # 32 lowercase hex digits, which Google Calendar also accepts as a client-chosen event id
+    return uuid.uuid4().hex
+
+
+class Journal:
+    """Append-only log of writes made while offline or before the remote service confirmed them.
+
+    Each entry has an idempotency key that is sent with every replay, so a write
+    that reached the service before the connection dropped is not created twice.
+    Entries are never edited after they are appended; only their delivery state
+    (attempts, next retry, when it was applied) changes. attempts counts sends
+    started, so an entry with attempts may already exist remotely, even if the
+    process died before hearing back. An entry the service rejected for good is
+    marked failed and kept with its error, but is no longer pending.
+    """
+
+    def __init__(self, path='assistant.db'):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS journal ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE NOT NULL, kind TEXT NOT NULL, "
+                "payload TEXT NOT NULL, created REAL, attempts INTEGER DEFAULT 0, next_attempt REAL DEFAULT 0, "
+                "last_error TEXT, applied REAL, remote_id TEXT, failed REAL)"
+            )
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(journal)")]
+            if 'failed' not in columns:
+                # Journals written before rejected entries were set aside
+                self.conn.execute("ALTER TABLE journal ADD COLUMN failed REAL")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS journal_pending ON journal (kind, applied, next_attempt)")
+
+    def append(self, kind, payload, key=None):
+        """Record one write. Returns its idempotency key."""
+        return self.append_many(kind, [payload], [key])[0]
+
+    def append_many(self, kind, payloads, keys=None):
+        """Record several writes in one transaction. Returns their keys."""
+        payloads = list(payloads)
+        keys = [key or new_key() for key in (keys or [None] * len(payloads))]
+        now = time.time()
+        with self.lock, self.conn:
+            # A key that is already journaled is the same write again, so it is ignored
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO journal (key, kind, payload, created) VALUES (?, ?, ?, ?)",
+                [(key, kind, json.dumps(payload), now) for key, payload in zip(keys, payloads)]
+            )
+        return keys
+
+    @staticmethod
+    def to_entry(row):
+        seq, key, kind, payload, created, attempts = row
+        return JournalEntry(seq, key, kind, json.loads(payload), created, attempts)
+
+    def pending(self, kind):
+        """Return the entries of a kind not yet applied, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, key, kind, payload, created, attempts FROM journal "
+                "WHERE kind = ? AND applied IS NULL AND failed IS NULL ORDER BY seq", (kind,)
+            ).fetchall()
+        return [self.to_entry(row) for row in rows]
+
+    def due(self, kind, limit, exclude=()):
+        """Return up to limit unapplied entries whose retry time has come, skipping seqs in exclude."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, key, kind, payload, created, attempts FROM journal "
+                "WHERE kind = ? AND applied IS NULL AND failed IS NULL AND next_attempt <= ? ORDER BY seq LIMIT ?",
+                (kind, time.time(), limit + len(exclude))
+            ).fetchall()
+        return [self.to_entry(row) for row in rows if row[0] not in exclude][:limit]
+
+    def mark_applied(self, seq, remote_id=None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE journal SET applied = ?, remote_id = ?, last_error = NULL WHERE seq = ?",
+                (time.time(), remote_id, seq)
+            )
+
+    def mark_sending(self, seq):
+        """Count an attempt before the write is sent, so a replay after a crash mid-send knows to look for it."""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE journal SET attempts = attempts + 1 WHERE seq = ?", (seq,))
+
+    def mark_failed(self, seq, next_attempt, error):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE journal SET next_attempt = ?, last_error = ? WHERE seq = ?",
+                (next_attempt, error, seq)
+            )
+
+    def mark_dead(self, seq, error):
+        """Set aside an entry the service will never accept, keeping its error; it is not retried."""
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE journal SET failed = ?, last_error = ? WHERE seq = ?", (time.time(), error, seq))
+
+    def failed(self, kind):
+        """Return (entry, error) for each entry of a kind the service rejected, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT seq, key, kind, payload, created, attempts, last_error FROM journal "
+                "WHERE kind = ? AND failed IS NOT NULL ORDER BY seq", (kind,)
+            ).fetchall()
+        return [(self.to_entry(row[:6]), row[6]) for row in rows]
+
+    def retry_now(self, kind):
+        """Make every waiting entry of a kind due, e.g. once the service is reachable again."""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE journal SET next_attempt = 0 WHERE kind = ? AND applied IS NULL AND failed IS NULL "
+                "AND next_attempt > ?",
+                (kind, time.time())
+            ).rowcount
+
+    def pending_count(self, kind=None):
+        query = "SELECT COUNT(*) FROM journal WHERE applied IS NULL AND failed IS NULL"
+        params = ()
+        if kind:
+            query += " AND kind = ?"
+            params = (kind,)
+        with self.lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def prune(self, older_than):
+        """Drop entries applied more than older_than seconds ago."""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "DELETE FROM journal WHERE applied IS NOT NULL AND applied < ?", (time.time() - older_than,)
+            ).rowcount
@@ -0,0 +1,70 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Records when each startup stage ran and how long it took."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stages = []
+        self.lock = threading.Lock()
+
+    def record(self, name, started, finished):
+        with self.lock:
+            self.stages.append((name, started - self.origin, finished - started, threading.current_thread().name))
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, time.perf_counter())
+
+    def report(self):
+        """Return the recorded stages as a table ordered by start time."""
+        with self.lock:
+            stages = sorted(self.stages, key=lambda stage: stage[1])
+        lines = [f"{'stage':<28}{'start ms':>10}{'took ms':>10}  thread"]
+        for name, offset, duration, thread in stages:
+            lines.append(f"{name:<28}{offset * 1000:>10.1f}{duration * 1000:>10.1f}  {thread}")
+        return "\n".join(lines)
+
+
+startup_profiler = StartupProfiler()
+
+
+class LazyResource:
+    """Thread-safe value that is built on first use and can be warmed in the background."""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.loaded:
+            return self.value
+        with self.lock:
+            if not self.loaded:
+                with startup_profiler.stage(self.name):
+                    self.value = self.factory()
+                self.loaded = True
+        return self.value
+
+    def warm(self):
+        """Load the resource now, logging instead of raising on failure."""
+        try:
+            self.get()
+        except Exception as e:
+            logging.exception("Failed to load %s.", self.name)
+
+    def warm_in_background(self):
+        thread = threading.Thread(target=self.warm, name=f"warm-{self.name}", daemon=True)
+        thread.start()
+        return thread
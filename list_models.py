@@ -0,0 +1,207 @@
+from operator import attrgetter
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+# Logged inserts and removals a row lookup may have to step through before the rows are renumbered
+SHIFT_LOG_LIMIT = 128
+
+
+class RecordListModel(QAbstractListModel):
+    """List model over records keyed by `key`, with sorting and filtering done in the model.
+
+    apply_changes() applies a delta from the data source (upserted rows and
+    removed keys) through a key to row index, so its cost follows the number of
+    changes rather than the length of the list. set_items() replaces the whole
+    list and diffs it against the visible rows; it is meant for the first load
+    and for a full resync. Either way the view keeps its scroll position and
+    selection.
+    """
+
+    def __init__(self, key=attrgetter('id'), display=str, parent=None):
+        super().__init__(parent)
+        self.key = key
+        self.display = display
+        # Source rows by key, oldest first, so a newly upserted row is simply appended
+        self.items = {}
+        self.rows = []
+        self.keys = []
+        # key -> (row, len(shifts) then) for the visible rows. Rows inserted or removed since
+        # are logged in shifts, so a lookup catches up without renumbering the whole list.
+        self.positions = {}
+        self.shifts = []
+        self.sort_key = None
+        self.filter = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        row = self.rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.display(row)
+        if role == Qt.UserRole:
+            return row
+        return None
+
+    def set_items(self, items):
+        """Replace the source rows, newest first, updating only the visible rows that changed."""
+        self.items = {self.key(row): row for row in reversed(list(items))}
+        self.refresh()
+
+    def set_sort(self, sort_key):
+        """Sort by sort_key(row), or show the newest rows first when None."""
+        self.sort_key = sort_key
+        self.refresh()
+
+    def set_filter(self, predicate):
+        """Show only rows for which predicate(row) is true, or every row when None."""
+        self.filter = predicate
+        self.refresh()
+
+    def refresh(self):
+        rows = [row for row in reversed(self.items.values()) if self.filter is None or self.filter(row)]
+        if self.sort_key is not None:
+            rows.sort(key=self.sort_key)
+        self.apply_diff(rows)
+
+    def apply_changes(self, upserted=(), removed_keys=()):
+        """Apply a delta: rows that were added or edited, and keys that were removed.
+
+        An edited row is repainted in place unless it moves; an added one is
+        placed by the sort key, or at the top as the newest row when unsorted.
+        """
+        if len(self.shifts) > SHIFT_LOG_LIMIT:
+            self.reindex()
+        removals = set()
+        inserts = []
+        for key in removed_keys:
+            if self.items.pop(key, None) is not None and key in self.positions:
+                removals.add(self.row_of(key))
+                del self.positions[key]
+        latest = {}
+        for row in upserted:
+            # A row upserted twice counts once, as the later, newer copy
+            key = self.key(row)
+            latest.pop(key, None)
+            latest[key] = row
+        for key, row in latest.items():
+            old = self.items.get(key)
+            if old == row:
+                continue
+            position = self.row_of(key)
+            shown = self.filter is None or self.filter(row)
+            in_place = position is not None and shown and self.sort_key is not None
+            if in_place and self.sort_key(old) == self.sort_key(row):
+                self.items[key] = row
+                self.rows[position] = row
+                index = self.index(position)
+                self.dataChanged.emit(index, index)
+                continue
+            # Added, or moved: out of the filter, to the top as the newest row, or to a new sort position
+            self.items.pop(key, None)
+            self.items[key] = row
+            if position is not None:
+                removals.add(position)
+                del self.positions[key]
+            if shown:
+                inserts.append(row)
+        # Bottom up, so the rows above keep their numbers
+        for first, last in reversed(runs(sorted(removals))):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            del self.keys[first:last + 1]
+            self.endRemoveRows()
+            self.shifts.extend([(first, -1)] * (last - first + 1))
+        if inserts and self.sort_key is None:
+            # Newest first: the last row upserted ends up on top
+            self.beginInsertRows(QModelIndex(), 0, len(inserts) - 1)
+            self.rows[0:0] = reversed(inserts)
+            self.keys[0:0] = [self.key(row) for row in reversed(inserts)]
+            self.endInsertRows()
+            self.shifts.extend([(0, 1)] * len(inserts))
+            for position, key in enumerate(self.keys[:len(inserts)]):
+                self.positions[key] = (position, len(self.shifts))
+            return
+        for row in inserts:
+            position = self.sort_position(row)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self.rows.insert(position, row)
+            self.keys.insert(position, self.key(row))
+            self.endInsertRows()
+            self.shifts.append((position, 1))
+            self.positions[self.key(row)] = (position, len(self.shifts))
+
+    def sort_position(self, row):
+        """Where row goes among the sorted visible rows: before equal ones, as a full refresh puts the newest."""
+        sort_key = self.sort_key
+        target = sort_key(row)
+        low, high = 0, len(self.rows)
+        while low < high:
+            middle = (low + high) // 2
+            if sort_key(self.rows[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def row_of(self, key):
+        """The visible row of key, or None: its indexed row, moved by the inserts and removals since."""
+        entry = self.positions.get(key)
+        if entry is None:
+            return None
+        position, seen = entry
+        for shifted, change in self.shifts[seen:]:
+            if shifted < position or (change > 0 and shifted == position):
+                position += change
+        return position
+
+    def reindex(self):
+        """Renumber every visible row, emptying the shift log."""
+        self.positions = {key: (position, 0) for position, key in enumerate(self.keys)}
+        self.shifts = []
+
+    def apply_diff(self, new_rows):
+        if new_rows == self.rows:
+            return
+        old_keys = self.keys
+        new_keys = [self.key(row) for row in new_rows]
+        new_set = set(new_keys)
+        old_set = set(old_keys)
+        if (len(new_set) != len(new_keys) or len(old_set) != len(old_keys) or
+                [key for key in old_keys if key in new_set] != [key for key in new_keys if key in old_set]):
+            # Duplicate keys or a new order (e.g. after changing the sort): rebuild the view
+            self.beginResetModel()
+            self.rows = list(new_rows)
+            self.keys = new_keys
+            self.reindex()
+            self.endResetModel()
+            return
+        removed = [i for i, key in enumerate(old_keys) if key not in new_set]
+        inserted = [i for i, key in enumerate(new_keys) if key not in old_set]
+        # Remove bottom up and insert top down, one contiguous run at a time
+        for first, last in reversed(runs(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+        for first, last in runs(inserted):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self.rows[first:first] = new_rows[first:last + 1]
+            self.endInsertRows()
+        self.keys = new_keys
+        self.reindex()
+        for i in [i for i, (old, new) in enumerate(zip(self.rows, new_rows)) if old != new]:
+            self.rows[i] = new_rows[i]
+            index = self.index(i)
+            self.dataChanged.emit(index, index)
+
+
+def runs(positions):
+    """Group sorted row numbers into (first, last) runs of consecutive rows."""
+    result = []
+    for position in positions:
+        if result and result[-1][1] == position - 1:
+            result[-1][1] = position
+        else:
+            result.append([position, position])
+    return result
@@ -0,0 +1,138 @@
+import os
+import gzip
+import json
+import queue
+import atexit
+import shutil
+import logging
+import threading
+import logging.handlers
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s:%(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra= fields passed to the logging call."""
+
+    # Attributes every LogRecord has; anything else came from extra=
+    STANDARD = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self.STANDARD and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RecordQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps a traceback apart from the message, so the file's formatter decides its layout."""
+
+    traceback_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        # Only what must happen on the calling thread: merge the arguments and render the traceback.
+        # The record is changed in place, as QueueHandler itself does.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def gzip_namer(name):
+    return name + ".gz"
+
+
+def gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class DebugSampler(logging.Filter):
+    """Keeps every record at INFO and above, but only one in `rate` of each DEBUG message.
+
+    Records are grouped by the line that logged them, so a per-utterance debug line
+    is thinned out without hiding rarer debug messages.
+    """
+
+    def __init__(self, rate=1):
+        super().__init__()
+        self.rate = max(int(rate), 1)
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.rate == 1 or record.levelno > logging.DEBUG:
+            return True
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + 1
+        return count % self.rate == 0
+
+
+class LogListener(logging.handlers.QueueListener):
+    """QueueListener whose stop() writes out what is queued and can safely be called more than once."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = False
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if not self.running:
+                super().start()
+                self.running = True
+
+    def stop(self):
+        with self.lock:
+            if self.running:
+                super().stop()
+                self.running = False
+                for handler in self.handlers:
+                    handler.close()
+
+
+def setup_logging(path='assistant.log', level='INFO', max_bytes=5_000_000, backups=5, compress=True,
+                  json_format=False, debug_sample=1):
+    """Send root logging through a queue to a rotating file written by a background thread.
+
+    Logging calls only put the record on the queue, so the voice, parser and
+    GUI threads never wait on the disk. Returns the QueueListener; it is
+    stopped, flushing what is queued, when the process exits.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                        encoding='utf-8', delay=True)
+    if compress:
+        # Rotated files are compressed on the listener thread, off the hot path
+        file_handler.namer = gzip_namer
+        file_handler.rotator = gzip_rotator
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = RecordQueueHandler(log_queue)
+    queue_handler.addFilter(DebugSampler(debug_sample))
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = LogListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,314 @@
+import re
+import logging
+import threading
+from intent_registry import IntentRegistry
+
+# Connectives that may join several requests in one utterance
+CONJUNCTION_RE = re.compile(r"(\s*,\s*|\s+(?:and|then|also|plus)\s+)", re.IGNORECASE)
+
+DETERMINERS = {'a', 'an', 'the', 'this', 'that', 'some', 'another', 'any'}
+
+IRREGULAR_FORMS = {
+    'be': {'is', 'are', 'am', 'was', 'were', 'been', 'being', "'s", "'re", "'m"},
+    'have': {'has', 'had', 'having', "'ve"},
+    'make': {'made'},
+    'tell': {'told'},
+    'read': {'read'},
+    "'s": set(),
+}
+
+HIGH_PRIORITY_WORDS = {'urgent', 'important', 'high'}
+LOW_PRIORITY_WORDS = {'quick', 'low'}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+|'[a-z]+")
+
+# Key of the (intent, open_ended) list in a trie node; tokens are never empty, and a string key keeps the trie JSON-serializable
+TERMINAL = ""
+
+
+def tokenize(text):
+    """Lowercase word tokenizer that splits clitics the way spaCy does ("what's" -> what, 's)."""
+    return TOKEN_RE.findall(text.lower().replace("’", "'"))
+
+
+def inflections(lemma):
+    """Surface forms a LEMMA pattern should accept, generated with simple English rules."""
+    forms = {lemma} | IRREGULAR_FORMS.get(lemma, set())
+    if lemma in ('be', "'s"):
+        return forms
+    stem = lemma[:-1] if lemma.endswith('e') else lemma
+    forms |= {lemma + 's', lemma + 'es', stem + 'ed', stem + 'ing'}
+    if re.search(r'[^aeiou][aeiou][bdgmnprt]$', lemma):
+        # stop -> stopped, stopping
+        forms |= {lemma + lemma[-1] + 'ed', lemma + lemma[-1] + 'ing'}
+    return forms
+
+
+def token_options(spec):
+    """Translate one Matcher token spec into (set of accepted words or None for any, optional)."""
+    optional = spec.get('OP') in ('?', '*')
+    if 'LOWER' in spec:
+        return {spec['LOWER']}, optional
+    if 'LEMMA' in spec:
+        return inflections(spec['LEMMA']), optional
+    if spec.get('POS') == 'DET':
+        return DETERMINERS, optional
+    return None, optional
+
+
+class LexicalIntentMatcher:
+    """Word trie compiled from the Matcher patterns, matched without running spaCy."""
+
+    def __init__(self, intent_patterns=None, root=None):
+        # root is a trie compiled earlier, e.g. loaded from the intent cache
+        self.root = root if root is not None else {}
+        for intent, patterns in (intent_patterns or {}).items():
+            for pattern in patterns:
+                for variant, open_ended in self.expand(pattern):
+                    self.insert(variant, intent, open_ended)
+
+    @staticmethod
+    def expand(pattern):
+        """Yield (word sets, open_ended) for every way optional tokens can be present or absent."""
+        open_ended = bool(pattern) and pattern[-1] == {'OP': '*'}
+        if open_ended:
+            pattern = pattern[:-1]
+        variants = [[]]
+        for spec in pattern:
+            words, optional = token_options(spec)
+            if words is None:
+                # Wildcards in the middle of a pattern are left to the spaCy Matcher
+                return
+            extended = [variant + [words] for variant in variants]
+            variants = extended + variants if optional else extended
+        for variant in variants:
+            if variant:
+                yield variant, open_ended
+
+    def insert(self, variant, intent, open_ended):
+        nodes = [self.root]
+        for words in variant:
+            next_nodes = []
+            for node in nodes:
+                for word in words:
+                    next_nodes.append(node.setdefault(word, {}))
+            nodes = next_nodes
+        for node in nodes:
+            terminals = node.setdefault(TERMINAL, [])
+            if [intent, open_ended] not in terminals:
+                terminals.append([intent, open_ended])
+
+    def match(self, tokens):
+        """Return (intent, start, end) for every pattern match; open-ended matches run to the end."""
+        matches = []
+        for start in range(len(tokens)):
+            node = self.root
+            for i in range(start, len(tokens)):
+                node = node.get(tokens[i])
+                if node is None:
+                    break
+                for intent, open_ended in node.get(TERMINAL, ()):
+                    matches.append((intent, start, len(tokens) if open_ended else i + 1))
+        return matches
+
+    def classify(self, tokens):
+        """Return the intent of the longest match, or None."""
+        matches = self.match(tokens)
+        if not matches:
+            return None
+        return max(matches, key=lambda m: m[2] - m[1])[0]
+
+
+def lexical_priority(tokens):
+    words = set(tokens)
+    if words & HIGH_PRIORITY_WORDS:
+        return 'high'
+    if words & LOW_PRIORITY_WORDS:
+        return 'low'
+    return 'normal'
+
+
+class CommandParser:
+    """Tiered intent parser: a lexical fast path first, spaCy only when entities are needed."""
+
+    def __init__(self, nlp, registry=None):
+        # nlp is a LazyResource so commands answered by the fast path never load the model
+        self.nlp_resource = nlp
+        self._matcher = None
+        self.matcher_lock = threading.Lock()
+        # Intents, their patterns and entity needs come from the plugins in the registry
+        self.registry = registry or IntentRegistry()
+        self.registry.load()
+        self.fast_matcher = LexicalIntentMatcher(root=self.registry.trie)
+
+    @property
+    def nlp(self):
+        return self.nlp_resource.get()
+
+    @property
+    def matcher(self):
+        """The spaCy Matcher, compiled on first use."""
+        with self.matcher_lock:
+            if self._matcher is None:
+                from spacy.matcher import Matcher
+                matcher = Matcher(self.nlp.vocab)
+                for intent, patterns in self.registry.patterns().items():
+                    matcher.add(intent, patterns)
+                self._matcher = matcher
+        return self._matcher
+
+    def extract_object(self, doc, verb):
+        # Use noun chunks to extract the object related to the verb
+        for np in doc.noun_chunks:
+            if verb.i < np.start:
+                # Exclude patterns like 'a task' or 'an event'
+                if np.text.lower() not in ['a task', 'an event', 'the task', 'the event']:
+                    return np.text
+        return None
+
+    def run_pipes(self, text, names):
+        """Run only the named pipeline components over the text."""
+        doc = self.nlp.make_doc(text)
+        for name, proc in self.nlp.pipeline:
+            if name in names:
+                doc = proc(doc)
+        return doc
+
+    def parse(self, command):
+        """Parse the command and extract intent and entities."""
+        logging.debug("Command received: %s", command)
+        tokens = tokenize(command)
+        intent = self.fast_matcher.classify(tokens)
+        if intent is None:
+            # Lemma and POS variants the trie doesn't cover still go through the Matcher
+            return self.parse_full(command)
+        logging.debug("Intent identified by fast path: %s", intent)
+        return self.parse_with_intent(command, tokens, intent)
+
+    def parse_with_intent(self, command, tokens, intent):
+        """Extract the entities for an intent that is already known."""
+        spec = self.registry.intent(intent)
+        if spec.extract is not None:
+            return intent, spec.extract(command, tokens), lexical_priority(tokens)
+        if spec.pipes == ():
+            return intent, {}, lexical_priority(tokens)
+        if spec.pipes is None:
+            return self.parse_full(command)
+        entities = {}
+        doc = self.run_pipes(command, spec.pipes)
+        for ent in doc.ents:
+            if ent.label_ in ('DATE', 'TIME'):
+                entities['TIME'] = ent.text
+            elif ent.label_ in ('GPE', 'LOC'):
+                entities['LOCATION'] = ent.text
+        logging.debug("Entities extracted: %s", entities)
+        return intent, entities, lexical_priority(tokens)
+
+    def split_requests(self, command):
+        """Split an utterance into (text, intent) segments, one per request it contains.
+
+        A clause without an intent of its own stays with the clause before it, so
+        "between monday and friday" or "buy bread and milk" are not split apart.
+        Everything after a request that is not read-only belongs to it, since a
+        task or event name is free text ("buy milk and stop by the bank"). Only
+        utterances made entirely of read-only requests are split; any other
+        comes back as one segment.
+        """
+        pieces = CONJUNCTION_RE.split(command)
+        read_intents = self.registry.read_intents
+        segments = []
+        for i in range(0, len(pieces), 2):
+            clause = pieces[i]
+            tokens = tokenize(clause)
+            intent = self.fast_matcher.classify(tokens)
+            if intent is None and segments and segments[-1][1] in read_intents:
+                topics = self.registry.topics
+                intent = next((topics[token] for token in tokens if token in topics), None)
+            if segments and (intent is None or segments[-1][1] not in read_intents):
+                text, previous = segments[-1]
+                segments[-1] = [text + pieces[i - 1] + clause, previous or intent]
+            else:
+                segments.append([clause, intent])
+        if len(segments) > 1 and any(intent not in read_intents for _, intent in segments):
+            return [[command, self.fast_matcher.classify(tokenize(command))]]
+        return segments
+
+    def parse_commands(self, command):
+        """Parse an utterance that may hold several requests, e.g. "what are my tasks and the weather".
+
+        Returns a list of (intent, entities, priority), with a single entry when
+        the utterance is one request.
+        """
+        segments = self.split_requests(command)
+        if len(segments) < 2:
+            return [self.parse(command)]
+        logging.debug("Split command into %d requests.", len(segments))
+        return [self.parse_with_intent(text, tokenize(text), intent) for text, intent in segments]
+
+    def parse_many(self, commands, n_process=1, batch_size=256):
+        """Parse a batch of commands, sending the ones that need spaCy through nlp.pipe."""
+        results = [None] * len(commands)
+        needs_pipeline = []
+        for i, command in enumerate(commands):
+            tokens = tokenize(command)
+            intent = self.fast_matcher.classify(tokens)
+            if intent is not None and not self.registry.intent(intent).needs_pipeline:
+                results[i] = self.parse(command)
+            else:
+                needs_pipeline.append(i)
+        docs = self.nlp.pipe((commands[i] for i in needs_pipeline), n_process=n_process, batch_size=batch_size)
+        for i, doc in zip(needs_pipeline, docs):
+            results[i] = self.parse_doc(commands[i], doc)
+        return results
+
+    def parse_full(self, command):
+        """Parse the command with the full spaCy pipeline and Matcher."""
+        return self.parse_doc(command, self.nlp(command))
+
+    def parse_doc(self, command, doc):
+        """Match intents and extract entities from a fully processed doc."""
+        matches = self.matcher(doc)
+        intent = None
+        entities = {}
+        if matches:
+            # Get the match with the longest span
+            match_id, start, end = max(matches, key=lambda x: x[2]-x[1])
+            intent = self.nlp.vocab.strings[match_id]
+            logging.debug("Intent identified: %s", intent)
+            # Get the span of the matched pattern
+            matched_span = doc[start:end]
+            # Find the verb in the matched span
+            verb = None
+            for token in matched_span:
+                if token.pos_ == 'VERB':
+                    verb = token
+                    break
+            spec = self.registry.intent(intent)
+            if verb and spec.object_entity:
+                obj = self.extract_object(doc, verb)
+                if obj:
+                    entities[spec.object_entity] = obj
+            # Extract time expressions and places
+            for ent in doc.ents:
+                if ent.label_ in ('DATE', 'TIME'):
+                    entities['TIME'] = ent.text
+                elif ent.label_ in ('GPE', 'LOC') and spec.pipes and 'ner' in spec.pipes:
+                    entities['LOCATION'] = ent.text
+            if spec.extract is not None:
+                # Intents with their own extractor take its entities as they are
+                entities = spec.extract(command, tokenize(command))
+            logging.debug("Entities extracted: %s", entities)
+        else:
+            logging.debug("No intent matched.")
+            intent = None
+
+        # Check for priority indicators
+        priority = 'normal'
+        if any(token.lemma_ in ['urgent', 'important', 'high'] for token in doc):
+            priority = 'high'
+        elif any(token.lemma_ in ['quick', 'low priority', 'low'] for token in doc):
+            priority = 'low'
+
+        logging.debug("Priority detected: %s", priority)
+
+        return intent, entities, priority
@@ -0,0 +1,9 @@
+"""Intent plugins.
+
+Each module defines INTENTS, a list of intent_registry.Intent, with the
+patterns that recognise the intent and the handler that carries it out.
+Handlers receive the Assistant, so they reach services through its managers
+and speak through assistant.speak. Client libraries are imported inside the
+handlers or the managers they use, not at module level, so a plugin stays
+cheap to import. Extra plugin modules are listed in ASSISTANT_PLUGINS.
+"""
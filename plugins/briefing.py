@@ -0,0 +1,21 @@
+from intent_registry import Intent
+
+
+def briefing(assistant, entities, priority):
+    assistant.give_briefing([('read_tasks', {}), ('read_events', {'TIME': 'today'}), ('get_weather', {})])
+
+
+INTENTS = [
+    Intent(
+        'briefing',
+        [
+            [{"LEMMA": "brief"}, {"LOWER": "me"}, {"OP": "*"}],
+            [{"LOWER": "morning"}, {"LOWER": "briefing"}, {"OP": "*"}],
+            [{"LOWER": "daily"}, {"LOWER": "briefing"}, {"OP": "*"}],
+            [{"LOWER": "my"}, {"LOWER": "briefing"}, {"OP": "*"}],
+            [{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "day"}, {"OP": "*"}],
+        ],
+        briefing,
+        services=('notion_manager', 'calendar_manager', 'weather_manager'),
+    ),
+]
@@ -0,0 +1,90 @@
+from intent_registry import Intent, Slot
+from event_store import find_time_window
+from records import Event
+from speech_output import combine_items
+
+
+def time_window(command, tokens):
+    window = find_time_window(command)
+    return {'TIME': window} if window else {}
+
+
+def add_event(assistant, entities, priority):
+    event_name = entities['EVENT_NAME']
+    event_time = assistant.time_resolver.resolve(entities['TIME'])
+    if not event_time:
+        assistant.speak("Could not understand the date and time. Please try again.")
+        return
+    success, message = assistant.calendar_manager.add_event(event_name, event_time, priority)
+    if success:
+        # Store in context
+        assistant.context['last_event'] = {'name': event_name, 'time': event_time.isoformat(), 'priority': priority}
+        assistant.update_events_signal.emit([Event(None, f"[{priority.capitalize()}] {event_name}", event_time)])
+    assistant.speak(message)
+
+
+def fetch_events(assistant, entities):
+    return (lambda window=entities.get('TIME'): assistant.calendar_manager.read_events(window),)
+
+
+def report_events(assistant, result, entities):
+    success, events = result
+    if not success:
+        return events
+    assistant.update_events_signal.emit(events)
+    return combine_items(events, assistant.max_spoken_items, f"You have {len(events)} upcoming events.")
+
+
+def prefetch_events(assistant, within):
+    manager = assistant.calendar_manager
+    if not manager.sync_due(within):
+        return None
+    return lambda: manager.start_sync().join()
+
+
+def read_events(assistant, entities, priority):
+    result = assistant.calendar_manager.read_events(entities.get('TIME'))
+    assistant.speak(report_events(assistant, result, entities))
+
+
+INTENTS = [
+    Intent(
+        'add_event',
+        [
+            [{"LEMMA": "add"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
+            [{"LEMMA": "create"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
+            [{"LEMMA": "schedule"}, {"POS": "DET", "OP": "?"}, {"LOWER": "event"}, {"OP": "*"}],
+            [{"LEMMA": "set"}, {"LOWER": "up"}, {"LOWER": "event"}, {"OP": "*"}],
+            [{"LEMMA": "make"}, {"LOWER": "appointment"}, {"OP": "*"}],
+            [{"LEMMA": "schedule"}, {"LOWER": "meeting"}, {"OP": "*"}],
+        ],
+        add_event,
+        pipes=None,
+        object_entity='EVENT_NAME',
+        services=('calendar_manager',),
+        slots=(
+            Slot('EVENT_NAME', "the event name", missing="Event name is required to add an event."),
+            Slot('TIME', "the event time", kind='time', missing="Event time is required to add an event."),
+        ),
+    ),
+    Intent(
+        'read_events',
+        [
+            [{"LEMMA": "read"}, {"LOWER": "events"}, {"OP": "*"}],
+            [{"LEMMA": "show"}, {"LOWER": "events"}, {"OP": "*"}],
+            [{"LEMMA": "list"}, {"LOWER": "events"}, {"OP": "*"}],
+            [{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "schedule"}, {"OP": "*"}],
+            [{"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"LOWER": "any"}, {"LOWER": "events"}, {"OP": "*"}],
+            [{"LOWER": "what"}, {"LEMMA": "be", "OP": "?"}, {"LOWER": "on"}, {"OP": "*"}],
+            [{"LOWER": "what"}, {"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"OP": "*"}],
+        ],
+        read_events,
+        extract=time_window,
+        fetch=fetch_events,
+        report=report_events,
+        part_name='your events',
+        topics=('events', 'schedule', 'calendar'),
+        prefetch=prefetch_events,
+        services=('calendar_manager',),
+    ),
+]
@@ -0,0 +1,59 @@
+from intent_registry import Intent
+from speech_output import combine_items
+
+# Words that narrow a search to tasks or to calendar events
+TASK_WORDS = {'task', 'tasks', 'todo', 'todos'}
+EVENT_WORDS = {'event', 'events', 'appointment', 'appointments', 'meeting', 'meetings', 'calendar', 'schedule'}
+
+
+def search_entities(command, tokens):
+    """QUERY is the whole utterance (the index ignores filler words); KIND is 'task' or 'event' when said."""
+    entities = {'QUERY': command}
+    words = set(tokens)
+    if words & TASK_WORDS:
+        entities['KIND'] = 'task'
+    elif words & EVENT_WORDS or tokens[:1] == ['when']:
+        entities['KIND'] = 'event'
+    return entities
+
+
+def report_search(assistant, query, kind=None):
+    """Search tasks, events or both locally and return what to say about the matches."""
+    parts = []
+    failures = []
+    searches = []
+    if kind in (None, 'task'):
+        searches.append(('task', assistant.notion_manager.search_tasks))
+    if kind in (None, 'event'):
+        searches.append(('event', assistant.calendar_manager.search_events))
+    for name, search in searches:
+        success, result = search(query)
+        if success:
+            noun = name if len(result) == 1 else f"{name}s"
+            parts.append(combine_items(result, assistant.max_spoken_items, f"I found {len(result)} matching {noun}."))
+        else:
+            failures.append(result)
+    if not parts:
+        return failures[0] if len(failures) == 1 else "I couldn't find anything matching that."
+    return " ".join(parts)
+
+
+def search(assistant, entities, priority):
+    assistant.speak(report_search(assistant, entities.get('QUERY', ''), entities.get('KIND')))
+
+
+INTENTS = [
+    Intent(
+        'search',
+        [
+            [{"LEMMA": "find"}, {"OP": "*"}],
+            [{"LEMMA": "search"}, {"OP": "*"}],
+            [{"LEMMA": "look"}, {"LOWER": "for"}, {"OP": "*"}],
+            [{"LOWER": "when"}, {"LEMMA": "be"}, {"OP": "*"}],
+            [{"LOWER": "when"}, {"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"OP": "*"}],
+        ],
+        search,
+        extract=search_entities,
+        services=('notion_manager', 'calendar_manager'),
+    ),
+]
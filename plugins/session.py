@@ -0,0 +1,24 @@
+import sys
+from intent_registry import Intent
+
+
+def exit_assistant(assistant, entities, priority):
+    assistant.speak("Exiting assistant. Goodbye!")
+    assistant.speech_output.wait_until_idle(timeout=5)
+    sys.exit()
+
+
+INTENTS = [
+    Intent(
+        'exit',
+        [
+            [{"LEMMA": "exit"}],
+            [{"LEMMA": "quit"}],
+            [{"LEMMA": "stop"}],
+            [{"LEMMA": "end"}],
+            [{"LOWER": "goodbye"}],
+            [{"LOWER": "bye"}],
+        ],
+        exit_assistant,
+    ),
+]
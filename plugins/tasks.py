@@ -0,0 +1,81 @@
+from intent_registry import Intent, Slot
+from speech_output import combine_items
+
+
+def add_task(assistant, entities, priority):
+    task_name = entities['TASK_NAME']
+    task_type = entities['TASK_TYPE']
+    success, message = assistant.notion_manager.add_task(task_name, task_type, priority)
+    if success:
+        # Update context
+        assistant.context['last_task'] = {'name': task_name, 'type': task_type, 'priority': priority}
+        assistant.context['last_task_type'] = task_type
+    assistant.speak(message)
+
+
+def fetch_tasks(assistant, entities):
+    # The lazy manager is resolved on the worker thread, not here
+    return (lambda: assistant.notion_manager.read_tasks(),)
+
+
+def report_tasks(assistant, result, entities):
+    """Show a read_tasks result in the GUI and return what to say about it."""
+    success, tasks = result
+    if not success:
+        return tasks
+    assistant.update_tasks_signal.emit(tasks)
+    return combine_items(tasks, assistant.max_spoken_items, f"You have {len(tasks)} tasks.")
+
+
+def prefetch_tasks(assistant, within):
+    manager = assistant.notion_manager
+    if not manager.sync_due(within):
+        return None
+    return lambda: manager.start_sync().join()
+
+
+def read_tasks(assistant, entities, priority):
+    assistant.speak(report_tasks(assistant, assistant.notion_manager.read_tasks(), entities))
+
+
+INTENTS = [
+    Intent(
+        'add_task',
+        [
+            [{"LEMMA": "add"}, {"POS": "DET", "OP": "?"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LEMMA": "create"}, {"POS": "DET", "OP": "?"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LOWER": "new"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LEMMA": "need"}, {"LOWER": "to"}, {"LEMMA": "add"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LEMMA": "set"}, {"LOWER": "up"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LEMMA": "make"}, {"LOWER": "task"}, {"OP": "*"}],
+            [{"LEMMA": "add"}, {"LOWER": "a"}, {"LOWER": "task"}, {"OP": "*"}],
+        ],
+        add_task,
+        pipes=None,
+        object_entity='TASK_NAME',
+        services=('notion_manager',),
+        slots=(
+            Slot('TASK_NAME', "the task name", missing="Task name is required to add a task."),
+            # Tasks added one after another usually share a type
+            Slot('TASK_TYPE', "the task type", required=False, default="General",
+                 recall='last_task_type', recall_ttl=600),
+        ),
+    ),
+    Intent(
+        'read_tasks',
+        [
+            [{"LEMMA": "read"}, {"LOWER": "tasks"}, {"OP": "*"}],
+            [{"LEMMA": "show"}, {"LOWER": "tasks"}, {"OP": "*"}],
+            [{"LEMMA": "list"}, {"LOWER": "tasks"}, {"OP": "*"}],
+            [{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "tasks"}, {"OP": "*"}],
+            [{"LOWER": "do"}, {"LOWER": "i"}, {"LEMMA": "have"}, {"LOWER": "any"}, {"LOWER": "tasks"}, {"OP": "*"}],
+        ],
+        read_tasks,
+        fetch=fetch_tasks,
+        report=report_tasks,
+        part_name='your tasks',
+        topics=('tasks',),
+        prefetch=prefetch_tasks,
+        services=('notion_manager',),
+    ),
+]
@@ -0,0 +1,58 @@
+import os
+from intent_registry import Intent, Slot
+
+
+def weather_location(assistant, entities):
+    return entities.get('LOCATION') or assistant.context.get('last_location') or os.getenv("ASSISTANT_LOCATION")
+
+
+def fetch_weather(assistant, entities):
+    location = weather_location(assistant, entities)
+    if not location:
+        return (lambda: (False, "Ask me about the weather in a city to include it next time."),)
+    return (assistant.weather_manager.get_weather, location)
+
+
+def report_weather(assistant, result, entities):
+    success, weather_report = result
+    if success:
+        assistant.context['last_location'] = weather_location(assistant, entities)
+        assistant.update_weather_signal.emit(weather_report)
+    return weather_report
+
+
+def prefetch_weather(assistant, within):
+    location = weather_location(assistant, {})
+    if not location or assistant.weather_manager.is_fresh(location, within):
+        return None
+    return lambda: assistant.weather_manager.refresh(location)
+
+
+def get_weather(assistant, entities, priority):
+    location = entities['LOCATION']
+    assistant.speak(report_weather(assistant, assistant.weather_manager.get_weather(location), entities))
+
+
+INTENTS = [
+    Intent(
+        'get_weather',
+        [
+            [{"LOWER": "what"}, {"LEMMA": "'s", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
+            [{"LEMMA": "tell"}, {"LOWER": "me"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
+            [{"LEMMA": "what"}, {"LOWER": "is", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
+            [{"LEMMA": "how"}, {"LOWER": "is", "OP": "?"}, {"LOWER": "the"}, {"LOWER": "weather"}, {"OP": "*"}],
+        ],
+        get_weather,
+        pipes=('tok2vec', 'ner'),
+        slots=(
+            Slot('LOCATION', "the city for the weather report", recall='last_location',
+                 missing="Location is required to fetch weather information."),
+        ),
+        fetch=fetch_weather,
+        report=report_weather,
+        part_name='the weather',
+        topics=('weather',),
+        prefetch=prefetch_weather,
+        services=('weather_manager',),
+    ),
+]
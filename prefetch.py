@@ -0,0 +1,118 @@
+import time
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from tracing import tracer
+from write_queue import RateLimiter
+
+
+class PrefetchScheduler:
+    """Refreshes the answers the user is likely to ask for next while the assistant listens.
+
+    Every handled intent is recorded. The next one is predicted from what
+    usually follows the last intent and from how often each intent is used,
+    with older use counting for less. When the assistant starts listening,
+    the most likely read intents that have a prefetch hook and whose data is
+    about to go stale are refreshed in the background, so the answer is served
+    from the local copy instead of waiting on the network.
+
+    Requests are capped at `budget` per hour (0 turns prefetching off) and at
+    `per_listen` for each listen window.
+    """
+
+    def __init__(self, registry, budget=60, per_listen=2, min_probability=0.25, lead=5.0, decay=0.9):
+        self.registry = registry
+        self.enabled = budget > 0
+        self.limiter = RateLimiter(budget / 3600.0, burst=max(per_listen, 1)) if self.enabled else None
+        self.per_listen = per_listen
+        self.min_probability = min_probability
+        # Data that goes stale within this many seconds is refreshed, since the answer comes after the listen window
+        self.lead = lead
+        self.decay = decay
+        self.lock = threading.Lock()
+        self.frequency = defaultdict(float)
+        self.transitions = defaultdict(lambda: defaultdict(float))
+        self.last_intent = None
+        self.in_flight = set()
+        self.executor = ThreadPoolExecutor(max_workers=max(per_listen, 1), thread_name_prefix="prefetch")
+        self.issued = 0
+        self.over_budget = 0
+
+    def record(self, intent):
+        """Note that an intent was handled."""
+        if not intent:
+            return
+        with self.lock:
+            for name in self.frequency:
+                self.frequency[name] *= self.decay
+            self.frequency[intent] += 1
+            if self.last_intent:
+                self.transitions[self.last_intent][intent] += 1
+            self.last_intent = intent
+
+    def predict(self):
+        """Return (probability, intent) for likely next read intents, most likely first."""
+        with self.lock:
+            total = sum(self.frequency.values())
+            if not total:
+                return []
+            following = self.transitions.get(self.last_intent, {})
+            following_total = sum(following.values())
+            scores = {}
+            for intent, count in self.frequency.items():
+                probability = count / total
+                if following_total:
+                    # What followed the last intent before says more than overall use
+                    probability = 0.3 * probability + 0.7 * following.get(intent, 0) / following_total
+                scores[intent] = probability
+        read_intents = self.registry.read_intents
+        ranked = sorted(((p, intent) for intent, p in scores.items() if intent in read_intents), reverse=True)
+        return [(p, intent) for p, intent in ranked if p >= self.min_probability]
+
+    def on_listen(self, assistant):
+        """Start background refreshes for the likely next requests. Never blocks."""
+        if not self.enabled:
+            return []
+        started = []
+        for probability, intent in self.predict():
+            if len(started) >= self.per_listen:
+                break
+            spec = self.registry.intent(intent)
+            if spec is None or spec.prefetch is None:
+                continue
+            with self.lock:
+                if intent in self.in_flight:
+                    continue
+                self.in_flight.add(intent)
+            logging.debug("Considering prefetch of %s (p=%.2f).", intent, probability)
+            self.executor.submit(self.run, assistant, spec)
+            started.append(intent)
+        return started
+
+    def run(self, assistant, spec):
+        # The hook may load a service client, so it runs here rather than on the listening thread
+        try:
+            refresh = spec.prefetch(assistant, self.lead)
+            if refresh is None:
+                # Still fresh; no request needed
+                return
+            if not self.limiter.try_acquire():
+                with self.lock:
+                    self.over_budget += 1
+                logging.debug("Prefetch budget spent; not refreshing %s.", spec.name)
+                return
+            with self.lock:
+                self.issued += 1
+            started = time.perf_counter()
+            refresh()
+            tracer.record('prefetch', (time.perf_counter() - started) * 1000, spec.name)
+        except Exception as e:
+            logging.warning("Prefetch of %s failed: %s", spec.name, e)
+        finally:
+            with self.lock:
+                self.in_flight.discard(spec.name)
+
+    def stats(self):
+        with self.lock:
+            return {'issued': self.issued, 'over_budget': self.over_budget, 'in_flight': len(self.in_flight)}
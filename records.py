@@ -0,0 +1,131 @@
+import re
+import sys
+import enum
+from datetime import datetime
+
+# Events created by the assistant carry their priority as a "[High] ..." summary prefix
+PRIORITY_PREFIX_RE = re.compile(r"\[(\w+)\]")
+
+
+class Priority(enum.IntEnum):
+    """Task and event priority; the values sort most urgent first."""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+    @classmethod
+    def parse(cls, value):
+        """Map "high", "High", a Priority or None onto a Priority, defaulting to NORMAL."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return PRIORITY_LABELS[value]
+        except (KeyError, TypeError):
+            return cls.__members__.get(str(value or '').strip().upper(), cls.NORMAL)
+
+    @property
+    def label(self):
+        return self.name.capitalize()
+
+
+# Notion's select names, looked up directly when parsing a page
+PRIORITY_LABELS = {priority.label: priority for priority in Priority}
+
+
+def parse_event_time(value):
+    """Convert a Calendar start/end object into an aware datetime; all-day dates become local midnight."""
+    if 'dateTime' in value:
+        return datetime.fromisoformat(value['dateTime'].replace('Z', '+00:00'))
+    return datetime.fromisoformat(value['date']).astimezone()
+
+
+class Task:
+    """A Notion task, parsed once from the API or the local store and formatted only when shown."""
+
+    __slots__ = ('id', 'name', 'type', 'priority', 'last_edited')
+
+    def __init__(self, id, name, type, priority=Priority.NORMAL, last_edited=''):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.priority = Priority.parse(priority)
+        # Notion's ISO 8601 timestamp; kept as text since it sorts and compares as is
+        self.last_edited = last_edited
+
+    @classmethod
+    def from_notion(cls, page):
+        properties = page.get("properties", {})
+        name_property = properties.get("Name", {}).get("title", [])
+        type_property = properties.get("Type", {}).get("rich_text", [])
+        priority_property = properties.get("Priority", {}).get("select") or {}
+        return cls(
+            page["id"],
+            name_property[0]["text"]["content"] if name_property else "Unnamed Task",
+            # There are only a handful of types, so every task can share one copy of each
+            sys.intern(type_property[0]["text"]["content"]) if type_property else "No Type Specified",
+            priority_property.get("name"),
+            page.get("last_edited_time", "")
+        )
+
+    @property
+    def edited_at(self):
+        return datetime.fromisoformat(self.last_edited.replace('Z', '+00:00')) if self.last_edited else None
+
+    def row(self):
+        """The (id, name, type, priority, last_edited_time) row stored in SQLite."""
+        return self.id, self.name, self.type, self.priority.label, self.last_edited
+
+    def astuple(self):
+        return self.id, self.name, self.type, self.priority, self.last_edited
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.astuple() == other.astuple()
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.name!r}, {self.type!r}, {self.priority.label})"
+
+    def __str__(self):
+        return f"Task: {self.name}, Type: {self.type}, Priority: {self.priority.label}."
+
+
+class Event:
+    """A calendar event with aware start and end times."""
+
+    __slots__ = ('id', 'summary', 'start', 'end', 'all_day', 'priority')
+
+    def __init__(self, id, summary, start, end=None, all_day=False, priority=None):
+        self.id = id
+        self.summary = summary
+        self.start = start
+        self.end = end or start
+        self.all_day = all_day
+        if priority is None:
+            prefix = PRIORITY_PREFIX_RE.match(summary)
+            priority = prefix.group(1) if prefix else None
+        self.priority = Priority.parse(priority)
+
+    @classmethod
+    def from_google(cls, item):
+        """Build an Event from a Calendar API event; None for cancelled ones."""
+        if item.get('status') == 'cancelled' or 'start' not in item:
+            return None
+        return cls(
+            item['id'],
+            item.get('summary', '(No title)'),
+            parse_event_time(item['start']),
+            parse_event_time(item.get('end', item['start'])),
+            all_day='dateTime' not in item['start']
+        )
+
+    def astuple(self):
+        return self.id, self.summary, self.start, self.end, self.all_day, self.priority
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.astuple() == other.astuple()
+
+    def __repr__(self):
+        return f"Event({self.id!r}, {self.summary!r}, {self.start.isoformat()})"
+
+    def __str__(self):
+        start = self.start.date().isoformat() if self.all_day else self.start.isoformat()
+        return f"Event: {self.summary} at {start}"
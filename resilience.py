@@ -0,0 +1,218 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+# Errors that mean the request never got an answer; ConnectionError and TimeoutError are OSErrors
+TRANSIENT_ERRORS = (OSError,)
+
+
+class ServiceUnavailable(Exception):
+    """Raised without calling the service while its circuit breaker is open."""
+
+
+def error_status(exc):
+    """Return the HTTP status carried by a Notion, httpx or Google API error, or None."""
+    status = getattr(exc, 'status', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'resp', None), 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(exc):
+    """Return the seconds asked for by a Retry-After header on the error's response, or None."""
+    headers = getattr(exc, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    if headers is None:
+        # googleapiclient's HttpError keeps the httplib2 response, a dict with lowercase keys
+        headers = getattr(exc, 'resp', None)
+    if not hasattr(headers, 'get'):
+        return None
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Stops calls to a service after repeated failures, then lets one trial call through.
+
+    Closed: calls pass. Open: calls fail immediately until reset_timeout has
+    passed. Half-open: a single trial call decides whether to close or reopen.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_until = 0.0
+        self.trial_started = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.failures < self.failure_threshold:
+                return 'closed'
+            return 'open' if time.monotonic() < self.opened_until else 'half-open'
+
+    def allow(self):
+        with self.lock:
+            if self.failures < self.failure_threshold:
+                return True
+            now = time.monotonic()
+            if now < self.opened_until:
+                return False
+            # A trial that never reported back (e.g. it was cancelled) is given up on after reset_timeout
+            if self.trial_started is not None and now - self.trial_started < self.reset_timeout:
+                return False
+            self.trial_started = now
+            return True
+
+    def record_success(self):
+        with self.lock:
+            if self.failures >= self.failure_threshold:
+                logging.info("%s is reachable again; closing its circuit breaker.", self.name)
+            self.failures = 0
+            self.opened_until = 0.0
+            self.trial_started = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_started = None
+            if self.failures >= self.failure_threshold:
+                if time.monotonic() >= self.opened_until:
+                    logging.warning("%s failed %d times; failing fast for %s seconds.",
+                                    self.name, self.failures, self.reset_timeout)
+                self.opened_until = time.monotonic() + self.reset_timeout
+
+    def trip(self, seconds):
+        """Open the breaker for at least `seconds`, e.g. when rate limited with a long Retry-After."""
+        with self.lock:
+            self.failures = max(self.failures, self.failure_threshold)
+            self.opened_until = max(self.opened_until, time.monotonic() + seconds)
+            self.trial_started = None
+        logging.warning("%s asked us to back off; failing fast for %.0f seconds.", self.name, seconds)
+
+
+class RetryBudget:
+    """Caps retries at a fraction of calls, so retries cannot multiply load during an outage."""
+
+    def __init__(self, ratio=0.2, reserve=3, max_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = float(reserve)
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class ServicePolicy:
+    """Circuit breaker, retry budget and rate-limit-aware backoff for one remote service.
+
+    Only transient failures are retried and counted against the breaker: network
+    errors, timeouts, 408, 429 and 5xx responses. Other errors (a 404 for an
+    unknown city, say) show the service is up and are raised at once.
+    """
+
+    def __init__(self, name, transient=(), tries=3, base_delay=0.5, max_delay=8, max_retry_after=30,
+                 failure_threshold=5, reset_timeout=30, budget=None):
+        self.name = name
+        self.transient = TRANSIENT_ERRORS + tuple(transient)
+        self.tries = tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # A longer Retry-After than this fails the call and opens the breaker instead of waiting
+        self.max_retry_after = max_retry_after
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.budget = budget or RetryBudget()
+
+    def is_transient(self, exc):
+        status = error_status(exc)
+        if status is not None:
+            return status in (408, 429) or status >= 500
+        return isinstance(exc, self.transient)
+
+    def check(self):
+        if not self.breaker.allow():
+            raise ServiceUnavailable(f"{self.name} is unavailable")
+
+    def next_delay(self, exc, attempt, tries):
+        """Record a failed attempt and return how long to wait before retrying, or None to give up."""
+        if not self.is_transient(exc):
+            self.breaker.record_success()
+            return None
+        wait = retry_after(exc)
+        if wait is not None and wait > self.max_retry_after:
+            self.breaker.trip(wait)
+            return None
+        self.breaker.record_failure()
+        if attempt + 1 >= tries or self.breaker.state != 'closed' or not self.budget.withdraw():
+            return None
+        if wait is not None:
+            return wait
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def run(self, func, tries=None):
+        """Call func() under the policy, sleeping between retries."""
+        tries = tries or self.tries
+        self.budget.deposit()
+        for attempt in range(tries):
+            self.check()
+            try:
+                result = func()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, tries)
+                if delay is None:
+                    raise
+                logging.warning("%s request failed: %s. Retrying in %.2f seconds...", self.name, e, delay)
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def run_async(self, factory, tries=None):
+        """Await factory() under the policy; retry waits do not block the event loop."""
+        tries = tries or self.tries
+        self.budget.deposit()
+        for attempt in range(tries):
+            self.check()
+            try:
+                result = await factory()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, tries)
+                if delay is None:
+                    raise
+                logging.warning("%s request failed: %s. Retrying in %.2f seconds...", self.name, e, delay)
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
@@ -0,0 +1,163 @@
+import re
+import math
+import heapq
+import threading
+from collections import defaultdict
+from operator import itemgetter
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that say what to search rather than what to search for
+STOP_WORDS = {
+    'a', 'an', 'the', 'my', 'me', 'i', 'is', 'are', 'was', 'be', 's', 'do', 'did', 'have', 'has', 'any',
+    'about', 'for', 'with', 'to', 'of', 'on', 'in', 'at', 'and', 'or', 'it', 'that', 'this', 'there',
+    'find', 'search', 'look', 'looking', 'show', 'tell', 'please', 'when', 'what', 'where', 'which',
+    'task', 'event', 'calendar', 'schedule', 'list', 'called', 'named', 'mention', 'mentioning',
+}
+
+
+def terms(text):
+    """Lowercase index terms with stop words dropped and plurals folded ("reports" -> "report")."""
+    result = []
+    for word in WORD_RE.findall(text.lower()):
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        if word not in STOP_WORDS:
+            result.append(word)
+    return result
+
+
+class SearchIndex:
+    """Inverted index over task or event records for keyword lookups without the network.
+
+    Records are added and removed one by one as the local store changes, so the
+    index never has to be rebuilt. Matches are ranked by the share of the query's
+    IDF weight they contain. With a `vectors` function (word -> vector or None),
+    query words that appear in no record are matched to similar indexed words.
+    """
+
+    def __init__(self, text, vectors=None, min_similarity=0.6):
+        self.text = text
+        self.vectors = vectors
+        self.min_similarity = min_similarity
+        self.records = {}
+        self.doc_terms = {}
+        self.postings = defaultdict(set)
+        self.lock = threading.Lock()
+        # Matrix of indexed-term vectors for similarity lookups, rebuilt when the vocabulary changes
+        self.term_vectors = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def upsert(self, records):
+        """Add or update records by id, re-indexing only those whose text changed."""
+        with self.lock:
+            for record in records:
+                doc_terms = frozenset(terms(self.text(record)))
+                old_terms = self.doc_terms.get(record.id)
+                self.records[record.id] = record
+                if old_terms == doc_terms:
+                    continue
+                if old_terms:
+                    self.unlink(record.id, old_terms - doc_terms)
+                for term in doc_terms - (old_terms or frozenset()):
+                    if term not in self.postings:
+                        self.term_vectors = None
+                    self.postings[term].add(record.id)
+                self.doc_terms[record.id] = doc_terms
+
+    def remove(self, ids):
+        with self.lock:
+            for record_id in ids:
+                self.records.pop(record_id, None)
+                old_terms = self.doc_terms.pop(record_id, None)
+                if old_terms:
+                    self.unlink(record_id, old_terms)
+
+    def replace(self, records):
+        """Make the index hold exactly these records."""
+        records = list(records)
+        keep = {record.id for record in records}
+        with self.lock:
+            stale = [record_id for record_id in self.records if record_id not in keep]
+        self.remove(stale)
+        self.upsert(records)
+
+    def unlink(self, record_id, old_terms):
+        for term in old_terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.discard(record_id)
+                if not posting:
+                    del self.postings[term]
+                    self.term_vectors = None
+
+    def idf(self, term):
+        return math.log(1 + len(self.records) / (1 + len(self.postings.get(term, ()))))
+
+    def similar_terms(self, word):
+        """Indexed terms whose vectors are close to word's, as (term, similarity) pairs."""
+        vector = self.vectors(word)
+        if vector is None:
+            return []
+        import numpy
+        if self.term_vectors is None:
+            known = [(term, self.vectors(term)) for term in self.postings]
+            known = [(term, v) for term, v in known if v is not None and v.any()]
+            if not known:
+                self.term_vectors = ([], numpy.zeros((0, len(vector))))
+            else:
+                matrix = numpy.array([v for _, v in known], dtype='float32')
+                matrix /= numpy.linalg.norm(matrix, axis=1, keepdims=True)
+                self.term_vectors = ([term for term, _ in known], matrix)
+        names, matrix = self.term_vectors
+        norm = numpy.linalg.norm(vector)
+        if not names or not norm:
+            return []
+        similarities = matrix @ (vector / norm)
+        return [(names[i], float(similarities[i])) for i in numpy.flatnonzero(similarities >= self.min_similarity)]
+
+    def search(self, query, limit=10, extra=()):
+        """Return (score, record) pairs for records matching the query, best first.
+
+        extra holds records that are not indexed (e.g. writes not yet synced);
+        they are scored the same way.
+        """
+        with self.lock:
+            weights = {}
+            for word in set(terms(query)):
+                if word in self.postings:
+                    weights[word] = self.idf(word)
+                    continue
+                similar = self.similar_terms(word) if self.vectors is not None else []
+                for term, similarity in similar:
+                    weights[term] = max(weights.get(term, 0), similarity * self.idf(term))
+                if not similar:
+                    # An unknown word still counts towards the total, so partial matches rank lower
+                    weights.setdefault(word, self.idf(word))
+            total = sum(weights.values())
+            if not total:
+                return []
+            scores = {}
+            for term, weight in weights.items():
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+                if not scores:
+                    scores = dict.fromkeys(posting, weight)
+                    continue
+                get = scores.get
+                for record_id in posting:
+                    scores[record_id] = get(record_id, 0) + weight
+            # Only the best few are needed, which is much cheaper than sorting every match
+            best = (heapq.nlargest(limit, scores.items(), key=itemgetter(1)) if limit
+                    else sorted(scores.items(), key=itemgetter(1), reverse=True))
+            results = [(score / total, self.records[record_id]) for record_id, score in best]
+        for record in extra:
+            score = sum(weights.get(term, 0) for term in set(terms(self.text(record))))
+            if score:
+                results.append((score / total, record))
+        if extra:
+            results.sort(key=itemgetter(0), reverse=True)
+        return results[:limit] if limit else results
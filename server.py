@@ -0,0 +1,258 @@
+"""Server mode: one loaded NLU and one set of service clients shared by many sessions over HTTP.
+
+Each session is a HeadlessAssistant with its own context and follow-up
+answers; the spaCy model, intent registry, Notion/Calendar/Weather managers
+and their caches are loaded once. Requests run on a fixed worker pool. When
+the pool and its queue are full, new requests are turned away with 503 and
+Retry-After instead of piling up.
+
+Endpoints (JSON bodies):
+    POST   /sessions          start a session -> {"session": ID}
+    POST   /sessions/ID       run a command: {"text": "...", "answers": [...]} -> result
+    DELETE /sessions/ID       end a session
+    GET    /status            sessions, queue and rejection counts
+
+Usage: python server.py [--port PORT] [--workers N] [--queue N] [--max-sessions N] [--stub]
+"""
+import sys
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from app import nlp, intent_registry
+from nlu import CommandParser
+from tracing import tracer
+from headless import HeadlessAssistant, make_managers
+
+BUSY_RESPONSE = (b"HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\n"
+                 b"Content-Type: application/json\r\nContent-Length: 27\r\n\r\n"
+                 b'{"error": "server is busy"}')
+
+
+class Session:
+    __slots__ = ('id', 'assistant', 'lock', 'last_used')
+
+    def __init__(self, session_id, assistant):
+        self.id = session_id
+        self.assistant = assistant
+        # One command at a time per session, so its follow-up answers and context stay in order
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionManager:
+    """Live sessions, oldest-used first; idle ones are closed after idle_timeout seconds."""
+
+    def __init__(self, create_assistant, max_sessions=1000, idle_timeout=1800):
+        self.create_assistant = create_assistant
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.created = 0
+
+    def create(self):
+        """Start a session, or return None when max_sessions are live and none has gone idle."""
+        self.expire()
+        with self.lock:
+            if len(self.sessions) >= self.max_sessions:
+                return None
+        session = Session(uuid.uuid4().hex, self.create_assistant())
+        with self.lock:
+            self.sessions[session.id] = session
+            self.created += 1
+        return session
+
+    def get(self, session_id):
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self.sessions.move_to_end(session_id)
+            return session
+
+    def close(self, session_id):
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def expire(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            while self.sessions:
+                session = next(iter(self.sessions.values()))
+                if session.last_used > cutoff:
+                    break
+                del self.sessions[session.id]
+
+    def __len__(self):
+        return len(self.sessions)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server whose requests run on a fixed pool, with at most max_pending waiting for a worker."""
+
+    # Let the accept loop see bursts and answer 503 itself, rather than the kernel dropping connections
+    request_queue_size = 128
+
+    def __init__(self, address, handler, workers=8, max_pending=32):
+        super().__init__(address, handler)
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server")
+        self.capacity = threading.BoundedSemaphore(workers + max_pending)
+        self.rejected = 0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        if not self.capacity.acquire(blocking=False):
+            # Answer straight from the accepting thread; the pool never sees the request
+            self.rejected += 1
+            try:
+                request.sendall(BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        with self.lock:
+            self.in_flight += 1
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self.lock:
+                self.in_flight -= 1
+            self.capacity.release()
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+
+def make_handler(sessions, server_stats):
+    class AssistantHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, data):
+            body = json.dumps(data, default=str).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return {}
+            return json.loads(self.rfile.read(length))
+
+        def session_id(self):
+            parts = self.path.strip('/').split('/')
+            return parts[1] if len(parts) == 2 and parts[0] == 'sessions' else None
+
+        def do_GET(self):
+            if self.path == '/status':
+                self.send_json(200, server_stats())
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/sessions':
+                session = sessions.create()
+                if session is None:
+                    self.send_json(503, {'error': 'too many sessions'})
+                else:
+                    self.send_json(201, {'session': session.id})
+                return
+            session = sessions.get(self.session_id())
+            if session is None:
+                self.send_json(404, {'error': 'no such session'})
+                return
+            try:
+                command = self.read_json()
+                text = command['text']
+            except (ValueError, KeyError, TypeError):
+                self.send_json(400, {'error': 'expected a JSON object with "text"'})
+                return
+            if not session.lock.acquire(blocking=False):
+                self.send_json(429, {'error': 'the session is still answering a command'})
+                return
+            try:
+                with tracer.span('server', 'command'):
+                    result = session.assistant.process(text, command.get('answers', ()))
+            finally:
+                session.lock.release()
+            if result['exit']:
+                sessions.close(session.id)
+            self.send_json(200, result)
+
+        def do_DELETE(self):
+            if sessions.close(self.session_id()):
+                self.send_json(200, {'closed': True})
+            else:
+                self.send_json(404, {'error': 'no such session'})
+
+        def log_message(self, format, *args):
+            logging.debug("%s - %s", self.address_string(), format % args)
+
+    return AssistantHandler
+
+
+def create_server(port, managers, parser, host='127.0.0.1', workers=8, max_pending=32, max_sessions=1000,
+                  idle_timeout=1800):
+    """Build the server; call serve_forever() on the result."""
+    sessions = SessionManager(lambda: HeadlessAssistant(parser=parser, **managers), max_sessions, idle_timeout)
+    server = None
+
+    def stats():
+        return {
+            'sessions': len(sessions),
+            'sessions_created': sessions.created,
+            'in_flight': server.in_flight,
+            'rejected': server.rejected,
+            'workers': server.workers,
+        }
+
+    server = PooledHTTPServer((host, port), make_handler(sessions, stats), workers, max_pending)
+    server.sessions = sessions
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve the assistant to many sessions over HTTP")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--workers', type=int, default=8, help="requests handled at once")
+    arg_parser.add_argument('--queue', type=int, default=32, help="requests waiting for a worker before 503")
+    arg_parser.add_argument('--max-sessions', type=int, default=1000)
+    arg_parser.add_argument('--idle-timeout', type=float, default=1800, help="seconds before an idle session ends")
+    arg_parser.add_argument('--stub', action='store_true', help="use in-memory Notion, Calendar and Weather stubs")
+    arg_parser.add_argument('--stub-latency-ms', type=float, default=0, help="simulated latency per stub call")
+    args = arg_parser.parse_args()
+
+    managers = make_managers(args.stub, args.stub_latency_ms)
+    parser = CommandParser(nlp, intent_registry)
+    # Load the model now rather than on the first session's first command
+    nlp.warm()
+    server = create_server(args.port, managers, parser, args.host, args.workers, args.queue,
+                           args.max_sessions, args.idle_timeout)
+    print(f"Serving the assistant on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import logging
+from time_parser import split_time_phrase
+
+
+class SlotFiller:
+    """Fills an intent's slots with as few spoken questions as possible.
+
+    A small state machine: RECALL takes slots from the command and then from
+    recent context; ASK puts every missing time slot and one free-text slot
+    into a single prompt; PARSE splits the reply between them, since a time
+    phrase can be cut off the end or start of it. ASK and PARSE repeat for
+    whatever the reply left out, up to max_rounds questions. No reply to a
+    required slot ends in FAILED; an optional one falls back to its default.
+    """
+
+    RECALL, ASK, PARSE, DONE, FAILED = 'recall', 'ask', 'parse', 'done', 'failed'
+
+    def __init__(self, listen, context, max_rounds=3):
+        self.listen = listen
+        self.context = context
+        self.max_rounds = max_rounds
+
+    @staticmethod
+    def prompt(slots):
+        return f"Please tell me {' and '.join(slot.question for slot in slots)}."
+
+    def fill(self, slots, entities):
+        """Return (True, entities with every slot filled) or (False, what to say)."""
+        values = dict(entities)
+        settled = {slot.name for slot in slots if values.get(slot.name)}
+        state = self.RECALL
+        rounds = 0
+        asking, answer = [], None
+        while True:
+            if state == self.RECALL:
+                for slot in slots:
+                    if slot.name not in settled and slot.recall:
+                        value = self.context.get(slot.recall, max_age=slot.recall_ttl)
+                        if value:
+                            logging.debug("Slot %s recalled from context: %s", slot.name, value)
+                            values[slot.name] = value
+                            settled.add(slot.name)
+                state = self.ASK
+            elif state == self.ASK:
+                missing = [slot for slot in slots if slot.name not in settled]
+                if not missing:
+                    state = self.DONE
+                elif rounds >= self.max_rounds:
+                    state = self.FAILED
+                else:
+                    # A reply can hold one free-text answer; times are split off it
+                    asking = [slot for slot in missing if slot.kind != 'time'][:1]
+                    asking += [slot for slot in missing if slot.kind == 'time']
+                    answer = self.listen(self.prompt(asking))
+                    rounds += 1
+                    state = self.PARSE
+            elif state == self.PARSE:
+                if not answer:
+                    if any(slot.required for slot in asking):
+                        state = self.FAILED
+                        continue
+                    for slot in asking:
+                        values[slot.name] = slot.default
+                        settled.add(slot.name)
+                    state = self.ASK
+                    continue
+                rest = answer
+                for slot in asking:
+                    if slot.kind == 'time':
+                        phrase = answer if len(asking) == 1 else None
+                        if phrase is None:
+                            rest, phrase = split_time_phrase(rest)
+                        if phrase:
+                            values[slot.name] = phrase
+                            settled.add(slot.name)
+                for slot in asking:
+                    if slot.kind != 'time' and rest.strip():
+                        values[slot.name] = rest.strip()
+                        settled.add(slot.name)
+                state = self.ASK
+            elif state == self.DONE:
+                for slot in slots:
+                    if not values.get(slot.name) and slot.default is not None:
+                        values[slot.name] = slot.default
+                return True, values
+            else:
+                missing = [slot for slot in slots if slot.name not in settled and slot.required]
+                if not missing:
+                    state = self.DONE
+                    continue
+                return False, missing[0].missing
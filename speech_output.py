@@ -0,0 +1,106 @@
+import time
+import queue
+import logging
+import threading
+from difflib import SequenceMatcher
+from tracing import tracer
+
+
+def combine_items(items, max_items=5, intro=None):
+    """Join list items into one utterance, summarising anything past max_items.
+
+    Items may be records; only the ones actually spoken are formatted.
+    """
+    items = list(items)
+    parts = [intro] if intro else []
+    parts.extend(str(item) for item in items[:max_items])
+    if len(items) > max_items:
+        parts.append(f"And {len(items) - max_items} more.")
+    return " ".join(parts)
+
+
+class SpeechOutput:
+    """Speech output thread that owns the TTS engine and speaks queued text.
+
+    say() returns immediately. Text queued while the engine is busy is combined
+    into one utterance, and cancel() drops queued text and stops the current
+    utterance at the next word so a new command can barge in.
+    """
+
+    def __init__(self, engine_factory):
+        self.engine_factory = engine_factory
+        self.queue = queue.Queue()
+        self.generation = 0
+        self.speaking_generation = None
+        # What is being (or was just) said, for telling our own voice apart from the user's
+        self.spoken_text = ""
+        self.spoken_until = 0.0
+        self.unfinished = 0
+        self.idle = threading.Condition()
+        self.engine = None
+        self.thread = threading.Thread(target=self.run, name="speech-output", daemon=True)
+        self.thread.start()
+
+    def say(self, text):
+        with self.idle:
+            self.unfinished += 1
+            self.queue.put((self.generation, text))
+
+    def cancel(self):
+        """Drop queued speech and interrupt the current utterance."""
+        with self.idle:
+            self.generation += 1
+
+    def is_speaking(self):
+        with self.idle:
+            return self.unfinished > 0
+
+    def wait_until_idle(self, timeout=None):
+        with self.idle:
+            return self.idle.wait_for(lambda: self.unfinished == 0, timeout=timeout)
+
+    def is_echo(self, heard, window=2.0):
+        """Whether recognised text is most likely the assistant hearing itself."""
+        heard = heard.lower().strip()
+        spoken = self.spoken_text
+        if not heard or not spoken or time.monotonic() - self.spoken_until > window:
+            return False
+        return heard in spoken or SequenceMatcher(None, heard, spoken).ratio() > 0.6
+
+    def on_word(self, name, location, length):
+        if self.speaking_generation != self.generation:
+            self.engine.stop()
+
+    def run(self):
+        # Some TTS drivers must be used from the thread that created them
+        try:
+            self.engine = self.engine_factory()
+            self.engine.connect('started-word', self.on_word)
+        except Exception as e:
+            logging.exception("Failed to initialise the TTS engine.")
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self.idle:
+                generation = self.generation
+                texts = [text for item_generation, text in batch if item_generation == generation]
+            if texts and self.engine is not None:
+                text = " ".join(texts)
+                self.spoken_text = text.lower()
+                self.spoken_until = float('inf')
+                self.speaking_generation = generation
+                try:
+                    with tracer.span('speak'):
+                        self.engine.say(text)
+                        self.engine.runAndWait()
+                except Exception as e:
+                    logging.exception("Failed to speak.")
+                self.speaking_generation = None
+                self.spoken_until = time.monotonic()
+            with self.idle:
+                self.unfinished -= len(batch)
+                self.idle.notify_all()
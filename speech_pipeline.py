@@ -0,0 +1,160 @@
+import time
+import queue
+import logging
+import threading
+import speech_recognition as sr
+from tracing import tracer
+
+
+class RecognizerBackend:
+    """Wraps one of speech_recognition's recognize_* engines, e.g. google, sphinx or whisper."""
+
+    def __init__(self, recognizer, name='google', **options):
+        self.name = name
+        self.method = getattr(recognizer, f"recognize_{name}")
+        self.options = options
+
+    def recognize(self, audio):
+        """Return the transcript, raising sr.UnknownValueError or sr.RequestError like the engines do."""
+        return self.method(audio, **self.options)
+
+
+class FallbackBackend:
+    """Uses a second engine (e.g. offline sphinx) when the first cannot be reached."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = primary.name
+
+    def recognize(self, audio):
+        try:
+            return self.primary.recognize(audio)
+        except sr.RequestError as e:
+            logging.warning("%s recognition failed (%s); using %s.", self.primary.name, e, self.fallback.name)
+            return self.fallback.recognize(audio)
+
+
+def recognize_result(backend, audio):
+    """Run the backend and turn its outcome into a (kind, value) result."""
+    try:
+        with tracer.span('recognize', getattr(backend, 'name', None)):
+            return 'text', backend.recognize(audio)
+    except sr.UnknownValueError:
+        return 'unknown', None
+    except sr.RequestError as e:
+        return 'error', str(e)
+
+
+class SpeechPipeline:
+    """Continuous capture from one long-lived audio stream, with recognition on a worker thread.
+
+    The capture thread calibrates once when the stream opens and then segments
+    speech by energy-based voice activity detection, queueing each utterance.
+    A recognizer thread transcribes them while the next one is being captured.
+    """
+
+    def __init__(self, recognizer, backend, source_factory=sr.Microphone, phrase_time_limit=10):
+        self.recognizer = recognizer
+        self.backend = backend
+        self.source_factory = source_factory
+        self.phrase_time_limit = phrase_time_limit
+        self.audio_queue = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.lock = threading.Lock()
+        # Utterances captured before this moment (e.g. while the assistant was talking) are dropped
+        self.discard_before = 0.0
+        self.running = False
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self.recognize_loop, name="speech-recognizer", daemon=True).start()
+        if self.source_factory is not None:
+            threading.Thread(target=self.capture_loop, name="speech-capture", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def capture_loop(self):
+        try:
+            with self.source_factory() as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                logging.info("Microphone calibrated, energy threshold %.0f.", self.recognizer.energy_threshold)
+                while self.running:
+                    try:
+                        audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=self.phrase_time_limit)
+                    except sr.WaitTimeoutError:
+                        continue
+                    self.submit_audio(audio)
+        except Exception as e:
+            logging.exception("Audio capture stopped.")
+            self.results.put((time.monotonic(), 'error', str(e)))
+
+    def submit_audio(self, audio, captured_at=None):
+        """Queue a captured utterance for recognition."""
+        with self.lock:
+            self.pending += 1
+        self.audio_queue.put((captured_at or time.monotonic(), audio))
+
+    def recognize_loop(self):
+        while self.running:
+            captured_at, audio = self.audio_queue.get()
+            try:
+                if captured_at < self.discard_before:
+                    continue
+                kind, value = recognize_result(self.backend, audio)
+                self.results.put((captured_at, kind, value))
+            finally:
+                with self.lock:
+                    self.pending -= 1
+
+    def discard_pending(self):
+        """Drop everything captured so far, e.g. the assistant's own voice after it speaks."""
+        self.discard_before = time.monotonic()
+
+    def next_utterance(self, timeout=5):
+        """Return ('text', transcript), ('unknown', None), ('error', message) or ('timeout', None)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            with self.lock:
+                recognizing = self.pending > 0
+            # Keep waiting past the deadline while an utterance is still being transcribed
+            if remaining <= 0 and not recognizing:
+                return 'timeout', None
+            try:
+                captured_at, kind, value = self.results.get(timeout=max(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if captured_at >= self.discard_before:
+                return kind, value
+
+
+class PerUtteranceCapture:
+    """Opens the microphone for each utterance; ambient noise calibration is still done only once."""
+
+    def __init__(self, recognizer, backend, source_factory=sr.Microphone, phrase_time_limit=10):
+        self.recognizer = recognizer
+        self.backend = backend
+        self.source_factory = source_factory
+        self.phrase_time_limit = phrase_time_limit
+        self.calibrated = False
+
+    def start(self):
+        return self
+
+    def discard_pending(self):
+        pass
+
+    def next_utterance(self, timeout=5):
+        with self.source_factory() as source:
+            if not self.calibrated:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                self.calibrated = True
+            try:
+                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=self.phrase_time_limit)
+            except sr.WaitTimeoutError:
+                return 'timeout', None
+        return recognize_result(self.backend, audio)
@@ -0,0 +1,129 @@
+import time
+import threading
+from datetime import datetime, timedelta
+from event_store import resolve_time_window
+from records import Task, Event
+from search_index import SearchIndex
+
+
+def simulate_latency(latency_ms):
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+
+
+class StubNotionManager:
+    """In-memory stand-in for NotionManager, for headless runs and benchmarks."""
+
+    def __init__(self, latency_ms=0, tasks=20):
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.tasks = [Task(f"stub-task-{i}", f"Sample task {i}", "General") for i in range(tasks)]
+        self.counter = tasks
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, tasks):
+        for listener in self.listeners:
+            listener(tasks, [], False)
+
+    def add_task(self, task_name, task_type, priority='normal'):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            self.counter += 1
+            task = Task(f"stub-task-{self.counter}", task_name, task_type, priority)
+            self.tasks.insert(0, task)
+        self.notify([task])
+        return True, "Task added. It will be synced to Notion in the background."
+
+    def bulk_add_tasks(self, tasks):
+        tasks = list(tasks)
+        with self.lock:
+            added = [Task(f"stub-task-{self.counter + i + 1}", name, task_type or "General", priority)
+                     for i, (name, task_type, priority) in enumerate(tasks)]
+            self.counter += len(added)
+            self.tasks[:0] = added
+        self.notify(added)
+        return True, f"{len(tasks)} tasks queued for Notion."
+
+    def read_tasks(self):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            tasks = list(self.tasks)
+        if not tasks:
+            return False, "There are no tasks in your Notion database."
+        return True, tasks
+
+    def sync_due(self, within=0):
+        return False
+
+    def search_tasks(self, query, limit=5):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            index = SearchIndex(lambda task: f"{task.name} {task.type}")
+            index.replace(self.tasks)
+        matches = index.search(query, limit)
+        if not matches:
+            return False, "I couldn't find any matching tasks."
+        return True, [task for _, task in matches]
+
+
+class StubCalendarManager:
+    """In-memory stand-in for CalendarManager."""
+
+    def __init__(self, latency_ms=0, events=10):
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        now = datetime.now().astimezone().replace(minute=0, second=0, microsecond=0)
+        self.events = [Event(f"stub-event-{i}", f"Sample event {i}", now + timedelta(hours=6 * i))
+                       for i in range(events)]
+
+    def add_event(self, event_name, event_time, priority='normal'):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            self.events.append(Event(f"stub-event-{len(self.events)}", f"[{priority.capitalize()}] {event_name}", event_time))
+        return True, "Event added to your calendar successfully!"
+
+    def read_events(self, window=None):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            events = sorted(self.events, key=lambda event: event.start.timestamp())
+        bounds = resolve_time_window(window) if window else None
+        if bounds:
+            events = [event for event in events if bounds[0] <= event.start < bounds[1]]
+            if not events:
+                return False, f"You have no events {window}."
+        if not events:
+            return False, "No upcoming events found."
+        return True, events
+
+    def sync_due(self, within=0):
+        return False
+
+    def search_events(self, query, limit=5):
+        simulate_latency(self.latency_ms)
+        with self.lock:
+            index = SearchIndex(lambda event: event.summary)
+            index.replace(self.events)
+        matches = index.search(query, limit)
+        if not matches:
+            return False, "I couldn't find any matching events."
+        return True, [event for _, event in matches]
+
+
+class StubWeatherManager:
+    """Returns a canned weather report for any location."""
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+
+    def is_fresh(self, location, within=0):
+        return True
+
+    def get_weather(self, location):
+        simulate_latency(self.latency_ms)
+        return True, (
+            f"The current weather in {location} is Clear sky with a temperature of 20°C, "
+            f"feels like 19°C. Humidity is at 50% and wind speed is 3 meters per second."
+        )
@@ -0,0 +1,94 @@
+import sqlite3
+import threading
+from records import Task
+
+# Tasks not yet confirmed by Notion are shown with this id prefix
+LOCAL_ID_PREFIX = "local:"
+
+
+class TaskStore:
+    """Local SQLite mirror of the Notion task database.
+
+    on_change(tasks, removed_ids, full=False), when given, is called after every
+    write so derived views such as the search index can follow along.
+    """
+
+    def __init__(self, path='assistant.db', on_change=None):
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id TEXT PRIMARY KEY, name TEXT, type TEXT, priority TEXT, last_edited_time TEXT)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_last_edited ON tasks (last_edited_time)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def get_meta(self, key, default=None):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def upsert_pages(self, pages):
+        """Insert or update pages, dropping archived ones. Returns the newest last_edited_time seen."""
+        tasks, removed_ids, newest = self.write_pages(pages)
+        if self.on_change:
+            self.on_change(tasks, removed_ids)
+        return newest
+
+    def replace_all(self, pages):
+        """Load a full snapshot, removing tasks that no longer exist in Notion.
+
+        on_change gets the whole task list with full=True, rather than one change per page.
+        """
+        pages = list(pages)
+        _, removed_ids, newest = self.write_pages(pages)
+        seen = {page["id"] for page in pages}
+        with self.lock, self.conn:
+            stale = [(row[0],) for row in self.conn.execute("SELECT id FROM tasks") if row[0] not in seen]
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", stale)
+        if self.on_change:
+            self.on_change(self.all_tasks(), removed_ids + [row[0] for row in stale], full=True)
+        return newest
+
+    def write_pages(self, pages):
+        tasks, removed, newest = [], [], None
+        for page in pages:
+            if page.get("archived") or page.get("in_trash"):
+                removed.append((page["id"],))
+            else:
+                tasks.append(Task.from_notion(page))
+            edited = page.get("last_edited_time")
+            if edited and (newest is None or edited > newest):
+                newest = edited
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tasks (id, name, type, priority, last_edited_time) "
+                "VALUES (?, ?, ?, ?, ?)", [task.row() for task in tasks]
+            )
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", removed)
+        return tasks, [row[0] for row in removed], newest
+
+    def all_tasks(self):
+        """Return Task records, most recently edited first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id, name, type, priority, last_edited_time FROM tasks ORDER BY last_edited_time DESC"
+            ).fetchall()
+        return [Task(*row) for row in rows]
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
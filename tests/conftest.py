@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# The assistant's modules live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class FakeService(ThreadingHTTPServer):
+    """Answers every request with the next scripted (status, body, headers), repeating the last one."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FakeHandler)
+        self.script = [(200, {}, {})]
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def respond(self, *responses):
+        with self.lock:
+            self.script = [(response[0], response[1], response[2] if len(response) > 2 else {})
+                           for response in responses]
+
+    def next_response(self, method, path):
+        with self.lock:
+            self.requests.append((method, path, time.monotonic()))
+            return self.script.pop(0) if len(self.script) > 1 else self.script[0]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def answer(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        status, body, headers = self.server.next_response(self.command, self.path)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake():
+    server = FakeService()
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from async_services import service_loop
+
+
+def test_semaphore_made_on_another_thread_works_under_contention():
+    made = []
+    thread = threading.Thread(target=lambda: made.append(service_loop.semaphore(1)))
+    thread.start()
+    thread.join()
+    [semaphore] = made
+    active, peak = 0, 0
+
+    async def call(n):
+        nonlocal active, peak
+        async with semaphore:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return n
+
+    async def contend():
+        return await asyncio.gather(*(call(n) for n in range(5)))
+
+    assert service_loop.run(contend(), timeout=5) == [0, 1, 2, 3, 4]
+    assert peak == 1
+
+
+def test_gather_calls_keeps_order_and_reports_failures_and_timeouts():
+    def fail():
+        raise ValueError("down")
+
+    def slow():
+        threading.Event().wait(0.5)
+        return "late"
+
+    results = service_loop.gather_calls([(str.upper, "a"), (fail,), (slow,)], timeout=0.1)
+    assert results[0] == "A"
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], TimeoutError)
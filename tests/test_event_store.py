@@ -0,0 +1,198 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from event_store import EventStore, find_time_window, resolve_time_window, sync_events
+
+
+class Gone(Exception):
+    """Looks like googleapiclient's HttpError for 410 Gone."""
+
+    def __init__(self):
+        super().__init__("Sync token is no longer valid")
+        self.resp = SimpleNamespace(status=410)
+
+
+class FakeRequest:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class FakeCalendar:
+    """Calendar API stand-in: events().list() with pagination and syncTokens over a change log."""
+
+    def __init__(self, page_size=2):
+        self.page_size = page_size
+        self.log = []
+        self.expired = set()
+        self.requests = []
+
+    def put(self, event_id, summary, day, status='confirmed'):
+        start = datetime(2026, 10, day, 9, tzinfo=timezone.utc)
+        self.log.append({
+            'id': event_id, 'summary': summary, 'status': status,
+            'start': {'dateTime': start.isoformat()},
+            'end': {'dateTime': (start + timedelta(hours=1)).isoformat()},
+        })
+
+    def cancel(self, event_id):
+        self.log.append({'id': event_id, 'status': 'cancelled'})
+
+    def events(self):
+        return self
+
+    def list(self, calendarId, singleEvents, maxResults, pageToken=None, syncToken=None):
+        self.requests.append({'pageToken': pageToken, 'syncToken': syncToken})
+        if syncToken in self.expired:
+            return FakeRequest(Gone())
+        if syncToken is not None:
+            items = self.log[int(syncToken):]
+        else:
+            latest = {}
+            for item in self.log:
+                latest[item['id']] = item
+            items = [item for item in latest.values() if item['status'] != 'cancelled']
+        offset = int(pageToken or 0)
+        page = items[offset:offset + self.page_size]
+        result = {'items': page}
+        if offset + self.page_size < len(items):
+            result['nextPageToken'] = str(offset + self.page_size)
+        else:
+            result['nextSyncToken'] = str(len(self.log))
+        return FakeRequest(result)
+
+
+def summaries(store):
+    return sorted(event.summary for event in store.all_events())
+
+
+@pytest.fixture
+def store():
+    return EventStore(':memory:')
+
+
+@pytest.fixture
+def calendar():
+    calendar = FakeCalendar()
+    calendar.put('a', 'Standup', 19)
+    calendar.put('b', 'Dentist', 20)
+    calendar.put('c', 'Lunch', 21)
+    return calendar
+
+
+def test_full_sync_follows_pages_and_stores_the_sync_token(store, calendar):
+    assert sync_events(calendar, store) == 3
+    assert summaries(store) == ['Dentist', 'Lunch', 'Standup']
+    assert [request['pageToken'] for request in calendar.requests] == [None, '2']
+    assert store.get_meta('calendar_sync_token') == '3'
+
+
+def test_incremental_sync_applies_only_changes(store, calendar):
+    sync_events(calendar, store)
+    calendar.put('b', 'Dentist (moved)', 22)
+    calendar.put('d', 'Gym', 23)
+    assert sync_events(calendar, store) == 2
+    assert calendar.requests[-1]['syncToken'] == '3'
+    assert summaries(store) == ['Dentist (moved)', 'Gym', 'Lunch', 'Standup']
+    assert store.get_meta('calendar_sync_token') == '5'
+
+
+def test_cancelled_events_are_removed(store, calendar):
+    changes = []
+    store.on_change = lambda events, removed: changes.append(removed)
+    sync_events(calendar, store)
+    calendar.cancel('a')
+    sync_events(calendar, store)
+    assert summaries(store) == ['Dentist', 'Lunch']
+    assert changes[-1] == ['a']
+
+
+def test_expired_sync_token_resets_and_runs_a_full_sync(store, calendar):
+    sync_events(calendar, store)
+    # Deleted while the token was valid but never seen by the store
+    calendar.log = [item for item in calendar.log if item['id'] != 'c']
+    calendar.put('d', 'Gym', 23)
+    calendar.expired.add('3')
+    assert sync_events(calendar, store) == 3
+    assert calendar.requests[-3]['syncToken'] == '3'
+    assert calendar.requests[-1]['syncToken'] is None
+    assert summaries(store) == ['Dentist', 'Gym', 'Standup']
+    assert store.get_meta('calendar_sync_token') == '3'
+
+
+def test_other_errors_are_raised(store, calendar):
+    error = RuntimeError("network down")
+    calendar.list = lambda **kwargs: FakeRequest(error)
+    with pytest.raises(RuntimeError):
+        sync_events(calendar, store)
+    assert store.get_meta('calendar_sync_token') is None
+
+
+def test_events_between_returns_overlapping_events_in_order(store, calendar):
+    sync_events(calendar, store)
+    start = datetime(2026, 10, 20, tzinfo=timezone.utc)
+    found = store.events_between(start, start + timedelta(days=2))
+    assert [event.summary for event in found] == ['Dentist', 'Lunch']
+
+
+# Wednesday 21 October 2026, 15:30 UTC
+NOW = datetime(2026, 10, 21, 15, 30, tzinfo=timezone.utc)
+MIDNIGHT = NOW.replace(hour=0, minute=0)
+
+
+def day(offset, hour=0):
+    return MIDNIGHT + timedelta(days=offset, hours=hour)
+
+
+@pytest.mark.parametrize('phrase, expected', [
+    ('today', (day(0), day(1))),
+    ('tonight', (day(0, 18), day(1))),
+    ('tomorrow', (day(1), day(2))),
+    ('this week', (NOW, day(5))),
+    ('next week', (day(5), day(12))),
+    ('this weekend', (day(3), day(5))),
+    ('this month', (NOW, datetime(2026, 11, 1, tzinfo=timezone.utc))),
+    ('next month', (datetime(2026, 11, 1, tzinfo=timezone.utc), datetime(2026, 12, 1, tzinfo=timezone.utc))),
+    ('friday', (day(2), day(3))),
+    ('on monday', (day(5), day(6))),
+    # Today's weekday means today, unless "next" is said
+    ('wednesday', (day(0), day(1))),
+    ('next wednesday', (day(7), day(8))),
+    ('Tomorrow ', (day(1), day(2))),
+    ('someday', None),
+])
+def test_resolve_time_window(phrase, expected):
+    assert resolve_time_window(phrase, NOW) == expected
+
+
+def test_next_month_in_december_rolls_over_the_year():
+    now = datetime(2026, 12, 31, 23, tzinfo=timezone.utc)
+    assert resolve_time_window('next month', now) == (
+        datetime(2027, 1, 1, tzinfo=timezone.utc), datetime(2027, 2, 1, tzinfo=timezone.utc))
+
+
+@pytest.mark.parametrize('phrase, first, last', [
+    # On a Wednesday both days are taken from the week ahead, and all of Friday is included
+    ('between monday and friday', date(2026, 10, 26), date(2026, 10, 31)),
+    ('between friday and monday', date(2026, 10, 23), date(2026, 10, 27)),
+    ('between december 20 and january 5', date(2026, 12, 20), date(2027, 1, 6)),
+])
+def test_between_ends_after_it_starts(phrase, first, last):
+    start, end = resolve_time_window(phrase, NOW)
+    assert (start.date(), end.date()) == (first, last)
+
+
+@pytest.mark.parametrize('text, phrase', [
+    ("what's on friday", 'on friday'),
+    ("show events next week", 'next week'),
+    ("show events between monday and friday", 'between monday and friday'),
+    ("read events", None),
+])
+def test_find_time_window(text, phrase):
+    assert find_time_window(text) == phrase
@@ -0,0 +1,137 @@
+"""GoogleServiceFactory: clients built offline from a cached discovery document, and background token renewal."""
+import os
+import json
+import tempfile
+from datetime import timedelta
+
+import pytest
+from googleapiclient.http import HttpMock
+
+# Keep app's import-time setup out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "assistant.log"))
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import app
+import google_service
+from google_service import utcnow
+
+STUB_DISCOVERY = {
+    "kind": "discovery#restDescription", "name": "calendar", "version": "v3",
+    "rootUrl": "https://www.googleapis.com/", "servicePath": "calendar/v3/",
+    "resources": {"events": {"methods": {"list": {
+        "id": "calendar.events.list", "path": "calendars/{calendarId}/events", "httpMethod": "GET",
+        "parameters": {"calendarId": {"type": "string", "required": True, "location": "path"}},
+        "parameterOrder": ["calendarId"], "response": {"$ref": "Events"},
+    }}}},
+    "schemas": {"Events": {"id": "Events", "type": "object"}},
+}
+
+
+@pytest.fixture
+def factory(monkeypatch, tmp_path):
+    monkeypatch.setenv("GOOGLE_DISCOVERY_CACHE", str(tmp_path / "discovery"))
+    monkeypatch.setenv("GOOGLE_TOKEN_REFRESH_MARGIN", "120")
+    factory = app.make_google_services()
+    factory.token_path = str(tmp_path / "token.json")
+    yield factory
+    factory.close()
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Fail the test if building a client goes anywhere but the cache directory."""
+    def no_network(*args, **kwargs):
+        raise AssertionError("went to the network")
+    monkeypatch.setattr(google_service.GoogleServiceFactory, 'fetch_discovery_document', no_network)
+    import googleapiclient.discovery_cache
+    monkeypatch.setattr(googleapiclient.discovery_cache, 'get_static_doc', no_network)
+
+
+def test_client_is_built_once_from_the_cached_document(factory, offline):
+    os.makedirs(factory.cache_dir)
+    with open(os.path.join(factory.cache_dir, "calendar.v3.json"), 'w', encoding='utf-8') as f:
+        json.dump(STUB_DISCOVERY, f)
+    http = HttpMock(headers={'status': '200'})
+    http.data = '{"kind": "calendar#events", "items": []}'
+    factory.http = http
+
+    service = factory.service('calendar', 'v3', interactive=False)
+    assert factory.service('calendar', 'v3', interactive=False) is service
+    assert service.events().list(calendarId='primary').execute() == {"kind": "calendar#events", "items": []}
+    assert http.uri == "https://www.googleapis.com/calendar/v3/calendars/primary/events?alt=json"
+
+
+class FakeCredentials:
+    def __init__(self, expires_in):
+        self.refresh_token = 'refresh'
+        self.expiry = utcnow() + timedelta(seconds=expires_in)
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.expiry = utcnow() + timedelta(hours=1)
+
+    def to_json(self):
+        return '{}'
+
+
+class Timers:
+    """Stands in for threading.Timer, remembering each delay instead of starting a thread."""
+
+    def __init__(self):
+        self.delays = []
+
+    def __call__(self, delay, function):
+        self.delays.append(delay)
+        return self
+
+    def start(self):
+        pass
+
+    def is_alive(self):
+        return False
+
+    def cancel(self):
+        pass
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    timers = Timers()
+    monkeypatch.setattr(google_service.threading, 'Timer', timers)
+    return timers
+
+
+def test_token_is_renewed_the_configured_margin_before_it_expires(factory, timers):
+    assert factory.refresh_margin == 120
+    factory.creds = FakeCredentials(expires_in=600)
+    factory.schedule_refresh()
+    assert timers.delays == [pytest.approx(480, abs=5)]
+
+
+def test_token_inside_the_margin_is_renewed_at_once_and_then_rescheduled(factory, timers):
+    factory.creds = FakeCredentials(expires_in=60)
+    factory.schedule_refresh()
+    assert timers.delays == [0]
+    factory.background_refresh()
+    assert factory.creds.refreshes == 1
+    assert os.path.exists(factory.token_path)
+    assert timers.delays[1] == pytest.approx(3600 - 120, abs=5)
+
+
+def test_failed_background_refresh_tries_again_in_a_minute(factory, timers):
+    factory.creds = FakeCredentials(expires_in=60)
+
+    def offline(request):
+        raise OSError("network is unreachable")
+    factory.creds.refresh = offline
+    factory.background_refresh()
+    assert timers.delays == [60]
+
+
+def test_calendar_manager_never_starts_the_browser_sign_in(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "assistant.db"))
+    monkeypatch.setattr(app.google_services, 'service', lambda api, version, interactive: calls.append(interactive))
+    app.CalendarManager()
+    assert calls == [False]
@@ -0,0 +1,30 @@
+from intent_registry import IntentRegistry
+
+
+def test_cached_registry_imports_no_plugin(tmp_path):
+    cache_path = str(tmp_path / 'intent_cache.json')
+    IntentRegistry(cache_path=cache_path).load()
+    registry = IntentRegistry(cache_path=cache_path)
+    registry.load()
+    assert registry.imported == set()
+    assert 'read_tasks' in registry.read_intents
+    assert registry.topics['weather'] == 'get_weather'
+
+
+def test_services_of_recent_intents(tmp_path):
+    cache_path = str(tmp_path / 'intent_cache.json')
+    IntentRegistry(cache_path=cache_path).load()
+    registry = IntentRegistry(cache_path=cache_path)
+    assert registry.services(['read_tasks', 'add_task']) == {'notion_manager'}
+    assert registry.services(['search']) == {'notion_manager', 'calendar_manager'}
+    assert registry.services(['exit', 'unknown']) == set()
+    assert registry.services([]) == set()
+    assert registry.imported == set()
+
+
+def test_intent_imports_its_plugin_on_first_use():
+    registry = IntentRegistry()
+    intent = registry.intent('get_weather')
+    assert intent.name == 'get_weather'
+    assert 'plugins.weather' in registry.imported
+    assert registry.intent('no_such_intent') is None
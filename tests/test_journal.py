@@ -0,0 +1,276 @@
+"""The write journal, and replays that must not create a journaled write twice."""
+import os
+import sqlite3
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+# Keep app's import-time setup out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "assistant.log"))
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import app
+import journal
+from journal import Journal, JournalEntry
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(journal, 'time', SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def log():
+    return Journal(':memory:')
+
+
+def test_append_returns_a_fresh_key_per_write(log):
+    first = log.append('task', {'name': "Buy milk"})
+    second = log.append('task', {'name': "Buy milk"})
+    assert first != second and len(first) == 32
+    assert [entry.key for entry in log.pending('task')] == [first, second]
+
+
+def test_appending_a_journaled_key_again_is_ignored(log):
+    key = log.append('task', {'name': "Buy milk"}, key='abc')
+    assert log.append('task', {'name': "Something else"}, key='abc') == key
+    [entry] = log.pending('task')
+    assert entry.payload == {'name': "Buy milk"}
+
+
+def test_append_many_is_one_batch_with_the_given_keys(log):
+    keys = log.append_many('task', [{'n': 1}, {'n': 2}, {'n': 3}], ['a', None, 'c'])
+    assert keys[0] == 'a' and keys[2] == 'c' and keys[1]
+    assert [entry.payload['n'] for entry in log.pending('task')] == [1, 2, 3]
+
+
+def test_pending_is_per_kind_and_oldest_first(log):
+    log.append('task', {'n': 1})
+    log.append('event', {'n': 2})
+    log.append('task', {'n': 3})
+    assert [entry.payload['n'] for entry in log.pending('task')] == [1, 3]
+    assert log.pending_count('task') == 2 and log.pending_count() == 3
+
+
+def test_applied_entries_are_no_longer_pending(log):
+    log.append('task', {'n': 1})
+    entry = log.pending('task')[0]
+    log.mark_applied(entry.seq, 'page-1')
+    assert log.pending('task') == [] and log.pending_count() == 0
+    assert log.due('task', 10) == []
+
+
+def test_failed_entry_waits_for_its_retry_time(clock, log):
+    log.append('task', {'n': 1})
+    entry = log.pending('task')[0]
+    log.mark_sending(entry.seq)
+    log.mark_failed(entry.seq, clock.now + 30, "503 Service Unavailable")
+    assert log.due('task', 10) == []
+    [waiting] = log.pending('task')
+    assert waiting.attempts == 1
+    clock.now += 31
+    assert [entry.seq for entry in log.due('task', 10)] == [entry.seq]
+
+
+def test_retry_now_makes_waiting_entries_due(clock, log):
+    log.append_many('task', [{'n': 1}, {'n': 2}])
+    for entry in log.pending('task'):
+        log.mark_failed(entry.seq, clock.now + 600, "timeout")
+    assert log.due('task', 10) == []
+    assert log.retry_now('task') == 2
+    assert len(log.due('task', 10)) == 2
+    # Nothing is waiting any more
+    assert log.retry_now('task') == 0
+
+
+def test_due_respects_the_limit_and_skips_entries_in_flight(log):
+    log.append_many('task', [{'n': n} for n in range(5)])
+    seqs = [entry.seq for entry in log.pending('task')]
+    assert [entry.seq for entry in log.due('task', 2)] == seqs[:2]
+    assert [entry.seq for entry in log.due('task', 2, exclude={seqs[0], seqs[1]})] == seqs[2:4]
+
+
+def test_prune_drops_only_old_applied_entries(clock, log):
+    log.append_many('task', [{'n': 1}, {'n': 2}, {'n': 3}])
+    first, second, _ = log.pending('task')
+    log.mark_applied(first.seq)
+    clock.now += 100
+    log.mark_applied(second.seq)
+    clock.now += 10
+    assert log.prune(older_than=50) == 1
+    assert log.prune(older_than=50) == 0
+    # The unapplied entry is never pruned, however old
+    clock.now += 10_000
+    assert log.prune(older_than=50) == 1
+    assert log.pending_count() == 1
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "assistant.db")
+    key = Journal(path).append('event', {'summary': "Dentist"})
+    reopened = Journal(path)
+    assert [(entry.key, entry.payload) for entry in reopened.pending('event')] == [(key, {'summary': "Dentist"})]
+
+
+class Conflict(Exception):
+    """Looks like googleapiclient's HttpError for 409 Conflict."""
+
+    def __init__(self):
+        super().__init__("The requested identifier already exists")
+        self.resp = SimpleNamespace(status=409)
+
+
+class FakeRequest:
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self):
+        return self.run()
+
+
+class FakeCalendar:
+    """events().insert() and get() over a dict, with client-chosen ids as Google Calendar has them."""
+
+    def __init__(self):
+        self.events_by_id = {}
+        self.inserts = 0
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        def run():
+            self.inserts += 1
+            if body['id'] in self.events_by_id:
+                raise Conflict()
+            self.events_by_id[body['id']] = dict(body, status='confirmed')
+            return self.events_by_id[body['id']]
+        return FakeRequest(run)
+
+    def get(self, calendarId, eventId):
+        return FakeRequest(lambda: self.events_by_id[eventId])
+
+
+def event_entry(key, attempts=0):
+    return JournalEntry(1, key, 'event', {
+        'summary': "[Normal] Dentist",
+        'start': {'dateTime': "2026-10-20T09:00:00+00:00"},
+        'end': {'dateTime': "2026-10-20T10:00:00+00:00"},
+    }, 0.0, attempts)
+
+
+@pytest.fixture
+def calendar(monkeypatch, tmp_path):
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "assistant.db"))
+    return app.CalendarManager(service=FakeCalendar())
+
+
+def test_replayed_event_is_not_created_twice(calendar):
+    key = "0123456789abcdef0123456789abcdef"
+    assert calendar.replay_event(event_entry(key)) == key
+    # The response was lost, so the queue replays the same entry: Google answers 409 for the same id
+    assert calendar.replay_event(event_entry(key, attempts=1)) == key
+    assert calendar.service.inserts == 2
+    assert list(calendar.service.events_by_id) == [key]
+    assert [event.id for event in calendar.store.all_events()] == [key]
+
+
+def test_other_insert_errors_reach_the_write_queue(calendar):
+    def fail():
+        raise RuntimeError("boom")
+    calendar.service.insert = lambda calendarId, body: FakeRequest(fail)
+    with pytest.raises(RuntimeError):
+        calendar.replay_event(event_entry("fedcba9876543210fedcba9876543210"))
+
+
+def notion_page(page_id, key):
+    return {
+        "object": "page", "id": page_id, "last_edited_time": "2026-10-02T10:00:00.000Z",
+        "properties": {
+            "Name": {"title": [{"text": {"content": "Buy milk"}}]},
+            "Type": {"rich_text": [{"text": {"content": "Errand"}}]},
+            "Priority": {"select": {"name": "Normal"}},
+            "Key": {"rich_text": [{"text": {"content": key}}]},
+        },
+    }
+
+
+@pytest.fixture
+def notion(fake, monkeypatch, tmp_path):
+    monkeypatch.setenv("NOTION_API_KEY", "test-key")
+    monkeypatch.setenv("NOTION_DATABASE_ID", "database")
+    monkeypatch.setenv("NOTION_IDEMPOTENCY_PROPERTY", "Key")
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "assistant.db"))
+    return app.NotionManager(base_url=fake.url)
+
+
+def task_entry(key, attempts):
+    return JournalEntry(1, key, 'task', {'name': "Buy milk", 'type': "Errand", 'priority': "normal"}, 0.0, attempts)
+
+
+def test_retried_task_finds_the_page_an_earlier_attempt_created(fake, notion):
+    fake.respond((200, {"object": "list", "results": [notion_page("page-1", "key-1")], "has_more": False}))
+    assert notion.replay_task(task_entry("key-1", attempts=1)) == "page-1"
+    [(method, path, _)] = fake.requests
+    assert (method, path) == ('POST', '/v1/databases/database/query')
+    assert [task.id for task in notion.store.all_tasks()] == ["page-1"]
+
+
+def test_retried_task_is_created_when_no_page_has_its_key(fake, notion):
+    fake.respond((200, {"object": "list", "results": [], "has_more": False}), (200, notion_page("page-2", "key-2")))
+    assert notion.replay_task(task_entry("key-2", attempts=1)) == "page-2"
+    assert [path for _, path, _ in fake.requests] == ['/v1/databases/database/query', '/v1/pages']
+
+
+def test_first_send_creates_without_looking_up_the_key(fake, notion):
+    fake.respond((200, notion_page("page-3", "key-3")))
+    assert notion.replay_task(task_entry("key-3", attempts=0)) == "page-3"
+    assert [path for _, path, _ in fake.requests] == ['/v1/pages']
+
+
+def test_send_interrupted_by_a_crash_is_looked_up_after_a_restart(fake, notion, tmp_path):
+    log = Journal(str(tmp_path / "assistant.db"))
+    key = log.append('task', {'name': "Buy milk", 'type': "Errand", 'priority': "normal"})
+    [entry] = log.pending('task')
+    # The process dies after the send starts but before the page id is recorded
+    log.mark_sending(entry.seq)
+    [reloaded] = Journal(str(tmp_path / "assistant.db")).pending('task')
+    assert reloaded.attempts == 1
+    fake.respond((200, {"object": "list", "results": [notion_page("page-4", key)], "has_more": False}))
+    assert notion.replay_task(reloaded) == "page-4"
+    assert [path for _, path, _ in fake.requests] == ['/v1/databases/database/query']
+
+
+def test_failed_entries_are_kept_but_no_longer_pending(log):
+    log.append_many('task', [{'n': 1}, {'n': 2}])
+    first, second = log.pending('task')
+    log.mark_dead(first.seq, "400 validation_error")
+    assert [entry.seq for entry in log.pending('task')] == [second.seq]
+    assert log.pending_count('task') == 1
+    assert [(entry.seq, error) for entry, error in log.failed('task')] == [(first.seq, "400 validation_error")]
+
+
+def test_a_journal_from_before_failed_entries_gains_the_column(tmp_path):
+    path = str(tmp_path / "assistant.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE journal (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT UNIQUE NOT NULL, kind TEXT NOT NULL, "
+        "payload TEXT NOT NULL, created REAL, attempts INTEGER DEFAULT 0, next_attempt REAL DEFAULT 0, "
+        "last_error TEXT, applied REAL, remote_id TEXT)"
+    )
+    conn.execute("INSERT INTO journal (key, kind, payload, created) VALUES ('abc', 'task', '{}', 0)")
+    conn.commit()
+    conn.close()
+    log = Journal(path)
+    assert [entry.key for entry in log.pending('task')] == ['abc'] and log.failed('task') == []
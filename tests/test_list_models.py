@@ -0,0 +1,210 @@
+"""RecordListModel deltas, and the NotionManager change feed that drives the Tasks list."""
+import os
+import time
+import random
+import tempfile
+from operator import attrgetter
+
+import pytest
+
+# Keep app's import-time setup out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "assistant.log"))
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import app
+from list_models import RecordListModel
+from records import Task, Priority
+from task_store import LOCAL_ID_PREFIX
+
+
+class Signals:
+    """Records the row signals a model emits, as the view would see them."""
+
+    def __init__(self, model):
+        self.events = []
+        model.rowsInserted.connect(lambda parent, first, last: self.events.append(('insert', first, last)))
+        model.rowsRemoved.connect(lambda parent, first, last: self.events.append(('remove', first, last)))
+        model.dataChanged.connect(lambda top, bottom: self.events.append(('change', top.row(), bottom.row())))
+        model.modelReset.connect(lambda: self.events.append(('reset',)))
+
+
+def task(id, name=None, priority='normal', type='General'):
+    return Task(id, name or f"Task {id}", type, priority)
+
+
+def names(model):
+    return [row.name for row in model.rows]
+
+
+def full_refresh(model):
+    """The rows a full refresh of the model's current source rows would show."""
+    reference = RecordListModel()
+    reference.sort_key, reference.filter = model.sort_key, model.filter
+    reference.items = dict(model.items)
+    reference.refresh()
+    return reference.rows
+
+
+@pytest.fixture
+def model():
+    model = RecordListModel()
+    model.set_items([task('c'), task('b'), task('a')])
+    return model
+
+
+def test_added_rows_go_to_the_top_when_unsorted(model):
+    signals = Signals(model)
+    model.apply_changes([task('d')], [])
+    assert names(model) == ["Task d", "Task c", "Task b", "Task a"]
+    assert signals.events == [('insert', 0, 0)]
+
+
+def test_removed_keys_remove_only_their_rows(model):
+    signals = Signals(model)
+    model.apply_changes([], ['b', 'missing'])
+    assert names(model) == ["Task c", "Task a"]
+    assert signals.events == [('remove', 1, 1)]
+    assert 'b' not in model.items
+
+
+def test_unchanged_rows_emit_nothing(model):
+    signals = Signals(model)
+    model.apply_changes([task('b')], [])
+    assert signals.events == []
+
+
+def test_edit_that_keeps_its_place_is_repainted_in_place(model):
+    model.set_sort(attrgetter('priority'))
+    signals = Signals(model)
+    model.apply_changes([task('b', "Renamed")], [])
+    assert "Renamed" in names(model)
+    assert signals.events == [('change', 1, 1)]
+
+
+def test_edit_that_changes_the_sort_key_moves_the_row(model):
+    model.set_sort(attrgetter('priority'))
+    signals = Signals(model)
+    model.apply_changes([task('a', priority='high')], [])
+    assert names(model)[0] == "Task a"
+    assert signals.events == [('remove', 2, 2), ('insert', 0, 0)]
+
+
+def test_added_row_is_placed_by_the_sort_key(model):
+    model.set_sort(lambda row: row.name)
+    model.apply_changes([task('bb', "Task bb")], [])
+    assert names(model) == ["Task a", "Task b", "Task bb", "Task c"]
+
+
+def test_filter_applies_to_changes(model):
+    model.set_filter(lambda row: row.priority == Priority.HIGH)
+    assert model.rows == []
+    model.apply_changes([task('a', priority='high'), task('d')], [])
+    assert names(model) == ["Task a"]
+    # An edit that leaves the filter takes the row out, but the source row is kept
+    model.apply_changes([task('a', priority='low')], [])
+    assert model.rows == [] and 'a' in model.items
+    model.set_filter(None)
+    assert names(model) == ["Task a", "Task d", "Task c", "Task b"]
+
+
+def test_removed_and_added_again_in_one_delta(model):
+    model.apply_changes([task('b', "Back")], ['b'])
+    assert names(model) == ["Back", "Task c", "Task a"]
+
+
+@pytest.mark.parametrize('sort_key', [None, attrgetter('priority'), lambda row: row.name])
+def test_random_deltas_match_a_full_refresh(sort_key):
+    rng = random.Random(7)
+    model = RecordListModel()
+    model.sort_key = sort_key
+    model.filter = lambda row: row.type != "Hidden"
+    model.set_items([task(f"t{i}", f"N{rng.randrange(20)}", rng.choice(list(Priority)),
+                          rng.choice(["General", "Hidden"])) for i in range(200)])
+    for round in range(100):
+        upserted, removed = [], []
+        for change in range(rng.randrange(6)):
+            key = rng.choice(list(model.items)) if rng.random() < 0.6 else f"new-{round}-{change}"
+            if rng.random() < 0.3:
+                removed.append(key)
+            else:
+                upserted.append(task(key, f"N{rng.randrange(20)}", rng.choice(list(Priority)),
+                                     rng.choice(["General", "Hidden"])))
+        model.apply_changes(upserted, removed)
+        assert model.rows == full_refresh(model)
+        assert model.keys == [row.id for row in model.rows]
+        assert [model.row_of(key) for key in model.keys] == list(range(len(model.keys)))
+
+
+def test_set_items_only_touches_changed_rows(model):
+    signals = Signals(model)
+    model.set_items([task('d'), task('c'), task('a', "Edited")])
+    assert names(model) == ["Task d", "Task c", "Edited"]
+    assert ('reset',) not in signals.events
+    # The key index is rebuilt after a full diff
+    model.apply_changes([], ['c'])
+    assert names(model) == ["Task d", "Edited"]
+
+
+def page(id, name, edited):
+    return {
+        "object": "page", "id": id, "last_edited_time": edited,
+        "properties": {
+            "Name": {"title": [{"text": {"content": name}}]},
+            "Type": {"rich_text": [{"text": {"content": "General"}}]},
+            "Priority": {"select": {"name": "Normal"}},
+        },
+    }
+
+
+def results(*pages):
+    return {"object": "list", "results": list(pages), "has_more": False}
+
+
+@pytest.fixture
+def notion(fake, monkeypatch, tmp_path):
+    monkeypatch.setenv("NOTION_API_KEY", "test-key")
+    monkeypatch.setenv("NOTION_DATABASE_ID", "database")
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "assistant.db"))
+    return app.NotionManager(base_url=fake.url)
+
+
+def test_notion_changes_keep_a_model_in_step(fake, notion):
+    changes = []
+    notion.add_listener(lambda tasks, removed_ids, full: changes.append((tasks, removed_ids, full)))
+    model = RecordListModel()
+
+    def follow(tasks, removed_ids, full):
+        if full:
+            model.set_items(tasks)
+        else:
+            model.apply_changes(tasks, removed_ids)
+
+    notion.add_listener(follow)
+
+    # No watermark yet, so this is a full sync: one call with the whole list
+    fake.respond((200, results(page("page-a", "Alpha", "2026-10-01T10:00:00.000Z"))))
+    assert notion.sync_tasks() == (True, "Tasks synced with Notion.")
+    [(tasks, removed_ids, full)] = changes
+    assert [(row.id, row.name) for row in tasks] == [("page-a", "Alpha")] and removed_ids == [] and full
+
+    # A new task shows up straight away under its local id, then as its Notion page
+    fake.respond((200, page("page-b", "Beta", "2026-10-02T10:00:00.000Z")))
+    notion.add_task("Beta", "General")
+    local_id = changes[1][0][0].id
+    assert local_id.startswith(LOCAL_ID_PREFIX) and changes[1][1:] == ([], False)
+    assert notion.write_queue.wait_until_flushed(timeout=5)
+    # The stand-in is dropped just after the journal marks the write applied
+    deadline = time.monotonic() + 5
+    while len(changes) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [row.id for row in changes[2][0]] == ["page-b"]
+    assert changes[3] == ([], [local_id], False)
+
+    # An incremental sync passes on just the edited page
+    fake.respond((200, results(page("page-b", "Beta edited", "2026-10-03T10:00:00.000Z"))))
+    notion.sync_tasks()
+    assert [(row.id, row.name) for row in changes[4][0]] == [("page-b", "Beta edited")]
+    assert len(changes) == 5
+
+    assert names(model) == ["Beta edited", "Alpha"]
+    assert model.rows == notion.read_tasks()[1]
@@ -0,0 +1,124 @@
+import os
+import sys
+import gzip
+import json
+import queue
+import logging
+
+import pytest
+
+from log_pipeline import DebugSampler, JsonFormatter, LogListener, RecordQueueHandler, setup_logging
+
+
+@pytest.fixture(autouse=True)
+def root_logger():
+    """Put back the root handlers and level that setup_logging replaces."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield root
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def make_record(msg="Synced %s tasks", args=(3,), level=logging.INFO, lineno=10, **extra):
+    record = logging.LogRecord('root', level, 'app.py', lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_records_reach_the_file_from_a_background_thread(root_logger, tmp_path):
+    path = tmp_path / "assistant.log"
+    listener = setup_logging(str(path))
+    assert [type(handler) for handler in root_logger.handlers] == [RecordQueueHandler]
+    logging.info("Synced %s tasks", 3)
+    listener.stop()
+    assert path.read_text(encoding='utf-8').rstrip().endswith("INFO:Synced 3 tasks")
+
+
+def test_rotated_files_are_gzipped_and_capped(tmp_path):
+    path = tmp_path / "assistant.log"
+    listener = setup_logging(str(path), max_bytes=300, backups=2)
+    for n in range(60):
+        logging.info("line %03d %s", n, "x" * 40)
+    listener.stop()
+    assert sorted(os.listdir(tmp_path)) == ["assistant.log", "assistant.log.1.gz", "assistant.log.2.gz"]
+    with gzip.open(tmp_path / "assistant.log.1.gz", 'rt', encoding='utf-8') as f:
+        rotated = f.read()
+    assert "line" in rotated and "x" * 40 in rotated
+    # The newest lines stay in the live file
+    assert "line 059" in path.read_text(encoding='utf-8')
+
+
+def test_uncompressed_rotation_keeps_plain_files(tmp_path):
+    listener = setup_logging(str(tmp_path / "assistant.log"), max_bytes=300, backups=1, compress=False)
+    for n in range(30):
+        logging.info("line %03d %s", n, "x" * 40)
+    listener.stop()
+    assert sorted(os.listdir(tmp_path)) == ["assistant.log", "assistant.log.1"]
+
+
+def test_json_lines_carry_extra_fields(tmp_path):
+    path = tmp_path / "assistant.log"
+    listener = setup_logging(str(path), json_format=True)
+    logging.info("Intent handled", extra={'intent': 'read_tasks', 'ms': 12.5})
+    try:
+        raise ValueError("bad date")
+    except ValueError:
+        logging.exception("Failed to parse %s", "tomorrow-ish")
+    listener.stop()
+    first, second = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert first['message'] == "Intent handled" and first['level'] == "INFO"
+    assert first['intent'] == 'read_tasks' and first['ms'] == 12.5
+    assert 'exception' not in first
+    assert second['message'] == "Failed to parse tomorrow-ish"
+    assert "ValueError: bad date" in second['exception']
+
+
+def test_json_formatter_renders_values_json_cannot():
+    entry = json.loads(JsonFormatter().format(make_record(when=object)))
+    assert entry['when'] == str(object)
+
+
+def test_queue_handler_merges_arguments_and_renders_the_traceback():
+    handler = RecordQueueHandler(queue.SimpleQueue())
+    record = make_record()
+    try:
+        raise KeyError("TASK_NAME")
+    except KeyError:
+        record.exc_info = sys.exc_info()
+    prepared = handler.prepare(record)
+    assert prepared.msg == "Synced 3 tasks" and prepared.args is None
+    assert prepared.exc_info is None and "KeyError: 'TASK_NAME'" in prepared.exc_text
+
+
+def test_debug_sampler_thins_each_debug_line():
+    sampler = DebugSampler(rate=3)
+    kept = [sampler.filter(make_record(level=logging.DEBUG, lineno=10)) for _ in range(7)]
+    assert kept == [True, False, False, True, False, False, True]
+    # Another line is counted on its own, and INFO and above always pass
+    assert sampler.filter(make_record(level=logging.DEBUG, lineno=20))
+    assert all(sampler.filter(make_record(level=logging.INFO, lineno=10)) for _ in range(5))
+
+
+def test_debug_sampler_rate_one_keeps_everything():
+    sampler = DebugSampler(rate=0)
+    assert sampler.rate == 1
+    assert all(sampler.filter(make_record(level=logging.DEBUG)) for _ in range(5))
+
+
+def test_listener_start_and_stop_are_idempotent(tmp_path):
+    handler = logging.FileHandler(str(tmp_path / "assistant.log"), delay=True)
+    log_queue = queue.SimpleQueue()
+    listener = LogListener(log_queue, handler)
+    listener.start()
+    thread = listener._thread
+    listener.start()
+    assert listener._thread is thread
+    log_queue.put(make_record())
+    listener.stop()
+    listener.stop()
+    assert not listener.running
+    assert "Synced 3 tasks" in (tmp_path / "assistant.log").read_text()
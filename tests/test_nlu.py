@@ -0,0 +1,111 @@
+import pytest
+
+from intent_registry import IntentRegistry
+from nlu import CommandParser, LexicalIntentMatcher, inflections, lexical_priority, tokenize
+
+
+PATTERNS = {
+    'add_task': [[{"LEMMA": "add"}, {"POS": "DET", "OP": "?"}, {"LOWER": "task"}, {"OP": "*"}]],
+    'read_tasks': [[{"LOWER": "what"}, {"LEMMA": "be"}, {"LOWER": "my"}, {"LOWER": "tasks"}]],
+    'exit': [[{"LEMMA": "stop"}]],
+    'wildcard': [[{"LOWER": "remind"}, {"POS": "PRON"}, {"LOWER": "later"}]],
+}
+
+
+def test_tokenize_splits_clitics():
+    assert tokenize("What's on Friday?") == ['what', "'s", 'on', 'friday']
+    assert tokenize("Don’t stop") == ['don', "'t", 'stop']
+
+
+def test_inflections():
+    assert {'add', 'adds', 'added', 'adding'} <= inflections('add')
+    assert {'stopped', 'stopping'} <= inflections('stop')
+    assert {'is', 'are', "'s"} <= inflections('be')
+
+
+def test_optional_tokens_and_inflections_match():
+    matcher = LexicalIntentMatcher(PATTERNS)
+    assert matcher.classify(tokenize("add task call mom")) == 'add_task'
+    assert matcher.classify(tokenize("adding a task")) == 'add_task'
+    assert matcher.classify(tokenize("what's my tasks")) == 'read_tasks'
+    assert matcher.classify(tokenize("what are my tasks")) == 'read_tasks'
+    assert matcher.classify(tokenize("what are your tasks")) is None
+
+
+def test_longest_match_wins():
+    matcher = LexicalIntentMatcher(PATTERNS)
+    # The open-ended add_task match runs to the end, past "stop"
+    assert matcher.classify(tokenize("add a task to stop by the bank")) == 'add_task'
+    assert matcher.classify(tokenize("please stop")) == 'exit'
+
+
+def test_open_ended_match_runs_to_the_end():
+    matcher = LexicalIntentMatcher(PATTERNS)
+    assert matcher.match(tokenize("please add a task now")) == [('add_task', 1, 5)]
+
+
+def test_patterns_with_inner_wildcards_are_left_to_spacy():
+    matcher = LexicalIntentMatcher(PATTERNS)
+    assert matcher.classify(tokenize("remind me later")) is None
+
+
+def test_trie_round_trips_through_its_root():
+    root = LexicalIntentMatcher(PATTERNS).root
+    assert LexicalIntentMatcher(root=root).classify(tokenize("stop")) == 'exit'
+
+
+def test_lexical_priority():
+    assert lexical_priority(tokenize("add an urgent task")) == 'high'
+    assert lexical_priority(tokenize("add a quick task")) == 'low'
+    assert lexical_priority(tokenize("add a task")) == 'normal'
+
+
+@pytest.fixture(scope='module')
+def parser():
+    # split_requests and the lexical fast path never touch the spaCy model
+    return CommandParser(None, IntentRegistry())
+
+
+@pytest.mark.parametrize('command', [
+    "add a task to buy milk and stop by the bank",
+    "create a task email sam, then quit smoking",
+    "add a task to review the report and end of year budget",
+    "add a task to buy milk and find a plumber",
+])
+def test_task_name_is_not_split(parser, command):
+    assert parser.split_requests(command) == [[command, 'add_task']]
+
+
+def test_event_name_is_not_split(parser):
+    command = "add an event lunch with sam and quit"
+    assert parser.split_requests(command) == [[command, 'add_event']]
+
+
+def test_write_request_is_parsed_whole(parser, monkeypatch):
+    parsed = []
+    monkeypatch.setattr(parser, 'parse', lambda command: parsed.append(command) or ('add_task', {}, 'normal'))
+    assert parser.parse_commands("add a task to buy milk and stop by the bank") == [('add_task', {}, 'normal')]
+    assert parsed == ["add a task to buy milk and stop by the bank"]
+
+
+def test_read_requests_are_split(parser):
+    assert parser.split_requests("what are my tasks and the weather") == [
+        ['what are my tasks', 'read_tasks'],
+        ['the weather', 'get_weather'],
+    ]
+
+
+def test_topic_continues_read_request(parser):
+    intents = [intent for intent, _, _ in parser.parse_commands("read tasks and events")]
+    assert intents == ['read_tasks', 'read_events']
+
+
+def test_read_then_write_is_not_split(parser):
+    segments = parser.split_requests("read tasks and add a task to call mom")
+    assert len(segments) == 1
+
+
+def test_clause_without_intent_stays_with_previous(parser):
+    assert parser.split_requests("show events between monday and friday") == [
+        ['show events between monday and friday', 'read_events'],
+    ]
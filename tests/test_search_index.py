@@ -0,0 +1,106 @@
+import numpy
+import pytest
+
+from records import Task
+from search_index import SearchIndex, terms
+
+
+def index_of(*tasks, **kwargs):
+    index = SearchIndex(lambda task: f"{task.name} {task.type}", **kwargs)
+    index.upsert(tasks)
+    return index
+
+
+def ids(results):
+    return [record.id for _, record in results]
+
+
+def test_terms_drop_stop_words_and_fold_plurals():
+    assert terms("Find my tasks about the quarterly Reports") == ['quarterly', 'report']
+    # Short words and double s are left alone
+    assert terms("bus class gas") == ['bus', 'class', 'gas']
+
+
+@pytest.fixture
+def index():
+    return index_of(
+        Task('1', "Write quarterly report", "Work"),
+        Task('2', "Book dentist appointment", "Health"),
+        Task('3', "Review report draft", "Work"),
+    )
+
+
+def test_all_query_words_rank_above_some(index):
+    results = index.search("quarterly report")
+    assert ids(results) == ['1', '3']
+    assert results[0][0] == pytest.approx(1.0)
+    assert 0 < results[1][0] < 1
+
+
+def test_rarer_words_weigh_more(index):
+    # "dentist" is in one task and "work" in two, so the dentist task ranks first
+    assert ids(index.search("dentist work"))[0] == '2'
+
+
+def test_unknown_words_lower_the_score(index):
+    [(score, record)] = index.search("dentist tomorrow")
+    assert record.id == '2' and score < 1
+
+
+def test_no_match_and_stop_word_queries_return_nothing(index):
+    assert index.search("holiday") == []
+    assert index.search("find my task") == []
+
+
+def test_limit_keeps_the_best(index):
+    assert len(index.search("report", limit=1)) == 1
+    assert len(index.search("report", limit=None)) == 2
+
+
+def test_upsert_reindexes_changed_text(index):
+    index.upsert([Task('2', "Book hairdresser appointment", "Health")])
+    assert index.search("dentist") == []
+    assert ids(index.search("hairdresser")) == ['2']
+    assert 'dentist' not in index.postings
+
+
+def test_upsert_with_same_text_keeps_the_new_record(index):
+    index.upsert([Task('1', "Write quarterly report", "Work", "high")])
+    [(_, record)] = index.search("quarterly")
+    assert record.priority.label == "High"
+
+
+def test_remove_and_replace(index):
+    index.remove(['1', 'missing'])
+    assert ids(index.search("report")) == ['3'] and len(index) == 2
+    index.replace([Task('3', "Review report draft", "Work"), Task('4', "Pay rent", "Home")])
+    assert len(index) == 2
+    assert index.search("dentist") == []
+    assert ids(index.search("rent")) == ['4']
+
+
+def test_extra_records_are_scored_alongside(index):
+    unsent = Task('local:1', "Quarterly budget", "Work")
+    results = index.search("quarterly", extra=[unsent, Task('local:2', "Unrelated", "Home")])
+    assert sorted(ids(results)) == ['1', 'local:1']
+
+
+VECTORS = {
+    'physician': numpy.array([1.0, 0.1, 0.0]),
+    'dentist': numpy.array([0.9, 0.2, 0.0]),
+    'report': numpy.array([0.0, 0.0, 1.0]),
+}
+
+
+def test_similar_words_match_through_vectors():
+    index = index_of(Task('1', "Call dentist", "Health"), Task('2', "Send report", "Work"),
+                     vectors=VECTORS.get)
+    assert ids(index.search("physician")) == ['1']
+    # The vector matrix is rebuilt once the vocabulary changes
+    index.upsert([Task('3', "Physician visit", "Health")])
+    assert ids(index.search("physician")) == ['3']
+
+
+def test_words_without_vectors_match_nothing_similar():
+    index = index_of(Task('1', "Call dentist", "Health"), vectors=VECTORS.get)
+    assert index.search("holiday") == []
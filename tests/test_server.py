@@ -0,0 +1,177 @@
+"""Server mode against the in-memory service stubs, with commands that stay on the parser's fast path."""
+import os
+import json
+import time
+import socket
+import tempfile
+import threading
+import http.client
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+# Keep app's import-time setup out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "assistant.log"))
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import server as server_module
+from app import nlp, intent_registry
+from nlu import CommandParser
+from headless import make_managers
+from server import PooledHTTPServer, create_server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server_module, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    return server.server_address[1]
+
+
+def stop(server):
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def assistant_server(clock):
+    server = create_server(0, make_managers(stub=True), CommandParser(nlp, intent_registry),
+                           workers=2, max_pending=2, max_sessions=2, idle_timeout=60)
+    server.port = serve(server)
+    yield server
+    stop(server)
+
+
+def request(port, method, path, body=None):
+    """Return (status, decoded JSON body)."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        connection.request(method, path, payload, {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+    finally:
+        connection.close()
+
+
+def test_session_lifecycle(assistant_server):
+    port = assistant_server.port
+    status, body = request(port, 'POST', '/sessions')
+    assert status == 201
+    path = f"/sessions/{body['session']}"
+
+    status, result = request(port, 'POST', path, {'text': "read tasks"})
+    assert status == 200 and result['intent'] == 'read_tasks'
+    assert result['replies'][0].startswith("You have 20 tasks.")
+    assert request(port, 'POST', path, {'answers': []})[0] == 400
+
+    assert request(port, 'GET', '/status')[1]['sessions'] == 1
+    assert request(port, 'DELETE', path) == (200, {'closed': True})
+    assert request(port, 'POST', path, {'text': "read tasks"})[0] == 404
+    assert request(port, 'DELETE', path)[0] == 404
+
+
+def test_exit_command_ends_the_session(assistant_server):
+    port = assistant_server.port
+    path = f"/sessions/{request(port, 'POST', '/sessions')[1]['session']}"
+    status, result = request(port, 'POST', path, {'text': "goodbye"})
+    assert status == 200 and result['exit']
+    assert request(port, 'POST', path, {'text': "read tasks"})[0] == 404
+
+
+def test_max_sessions_then_idle_sessions_expire(assistant_server, clock):
+    port = assistant_server.port
+    first = request(port, 'POST', '/sessions')[1]['session']
+    clock.now += 30
+    second = request(port, 'POST', '/sessions')[1]['session']
+    assert request(port, 'POST', '/sessions') == (503, {'error': 'too many sessions'})
+
+    # The first session has been idle past the timeout; the second was used 31 seconds ago
+    clock.now += 31
+    status, body = request(port, 'POST', '/sessions')
+    assert status == 201
+    assert request(port, 'POST', f"/sessions/{first}", {'text': "read tasks"})[0] == 404
+    assert request(port, 'POST', f"/sessions/{second}", {'text': "read tasks"})[0] == 200
+    assert request(port, 'GET', '/status')[1]['sessions_created'] == 3
+
+
+def test_busy_session_answers_429(assistant_server):
+    port = assistant_server.port
+    session_id = request(port, 'POST', '/sessions')[1]['session']
+    session = assistant_server.sessions.get(session_id)
+    # Stands in for a command from the same session that is still being answered
+    with session.lock:
+        status, body = request(port, 'POST', f"/sessions/{session_id}", {'text': "read tasks"})
+    assert status == 429 and 'still answering' in body['error']
+    assert request(port, 'POST', f"/sessions/{session_id}", {'text': "read tasks"})[0] == 200
+
+
+class BlockingHandler(BaseHTTPRequestHandler):
+    """Holds every request until the test releases it."""
+
+    release = threading.Event()
+
+    def do_GET(self):
+        self.release.wait(timeout=10)
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_full_pool_and_queue_answer_503_with_retry_after():
+    BlockingHandler.release.clear()
+    server = PooledHTTPServer(('127.0.0.1', 0), BlockingHandler, workers=1, max_pending=1)
+    port = serve(server)
+    try:
+        # One request on the only worker and one waiting for it fill the server
+        results = []
+        held = [threading.Thread(target=lambda: results.append(request(port, 'GET', '/')))
+                for _ in range(2)]
+        for thread in held:
+            thread.start()
+        for _ in range(200):
+            if server.in_flight == 2:
+                break
+            time.sleep(0.01)
+        assert server.in_flight == 2
+
+        # Turned away by the accepting thread before the request is even read
+        with socket.create_connection(('127.0.0.1', port), timeout=10) as sock:
+            response = b''
+            while chunk := sock.recv(4096):
+                response += chunk
+        head, body = response.split(b'\r\n\r\n', 1)
+        assert head.split(b'\r\n')[0] == b"HTTP/1.0 503 Service Unavailable"
+        assert b"Retry-After: 1" in head.split(b'\r\n')
+        assert json.loads(body) == {'error': 'server is busy'}
+        assert server.rejected == 1
+
+        BlockingHandler.release.set()
+        for thread in held:
+            thread.join(timeout=10)
+        assert results == [(200, {'ok': True})] * 2
+        # Capacity is given back once the requests finish
+        assert request(port, 'GET', '/') == (200, {'ok': True})
+    finally:
+        BlockingHandler.release.set()
+        stop(server)
@@ -0,0 +1,170 @@
+"""Circuit breakers, retry budgets and Retry-After against a local fake of the Notion and OpenWeather APIs."""
+import os
+import time
+import tempfile
+
+import pytest
+
+# Keep app's import-time setup out of the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(), "assistant.log"))
+os.environ.setdefault("INTENT_CACHE_PATH", "")
+
+import app
+from resilience import CircuitBreaker, RetryBudget
+
+WEATHER = {
+    'weather': [{'description': 'light rain'}],
+    'main': {'temp': 12.5, 'feels_like': 11.0, 'humidity': 80},
+    'wind': {'speed': 3.1},
+}
+NOTION_DOWN = {'object': 'error', 'status': 503, 'code': 'service_unavailable', 'message': 'Notion is down'}
+
+
+@pytest.fixture
+def policy_settings(monkeypatch):
+    monkeypatch.setenv("BREAKER_FAILURE_THRESHOLD", "2")
+    monkeypatch.setenv("BREAKER_RESET_TIMEOUT", "0.3")
+    monkeypatch.setenv("RETRY_MAX_ATTEMPTS", "3")
+    monkeypatch.setenv("RETRY_MAX_WAIT", "1")
+
+
+def quick_retries(manager):
+    # Backoff in milliseconds rather than seconds
+    manager.policy.base_delay = manager.policy.max_delay = 0.01
+    return manager
+
+
+@pytest.fixture
+def weather(fake, policy_settings, monkeypatch):
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test-key")
+    fake.respond((200, WEATHER))
+    return quick_retries(app.WeatherManager(base_url=fake.url + "/data/2.5/weather"))
+
+
+@pytest.fixture
+def notion(fake, policy_settings, monkeypatch, tmp_path):
+    monkeypatch.setenv("NOTION_API_KEY", "test-key")
+    monkeypatch.setenv("NOTION_DATABASE_ID", "database")
+    monkeypatch.setenv("TASK_STORE_PATH", str(tmp_path / "assistant.db"))
+    return quick_retries(app.NotionManager(base_url=fake.url))
+
+
+def test_weather_is_fetched_from_the_configured_url(fake, weather):
+    success, report = weather.fetch_weather("Paris")
+    assert success and "light rain" in report.lower()
+    method, path, _ = fake.requests[0]
+    assert method == 'GET' and path.startswith("/data/2.5/weather?q=Paris")
+
+
+def test_breaker_opens_after_repeated_failures(fake, weather):
+    fake.respond((503, {}))
+    assert weather.fetch_weather("Paris") == (False, "The weather service is busy right now. Please try again later.")
+    # Two failures reach the threshold, so the third attempt is never made
+    assert len(fake.requests) == 2
+    assert weather.policy.breaker.state == 'open'
+    assert weather.fetch_weather("Paris") == (False, "The weather service is unavailable right now.")
+    assert len(fake.requests) == 2
+
+
+def test_half_open_trial_closes_the_breaker(fake, weather):
+    fake.respond((503, {}))
+    weather.fetch_weather("Paris")
+    time.sleep(0.35)
+    assert weather.policy.breaker.state == 'half-open'
+    fake.respond((200, WEATHER))
+    success, _ = weather.fetch_weather("Paris")
+    assert success
+    assert weather.policy.breaker.state == 'closed'
+
+
+def test_failed_trial_reopens_the_breaker(fake, weather):
+    fake.respond((503, {}))
+    weather.fetch_weather("Paris")
+    time.sleep(0.35)
+    requests_before = len(fake.requests)
+    weather.fetch_weather("Paris")
+    # Only the single trial call goes out
+    assert len(fake.requests) == requests_before + 1
+    assert weather.policy.breaker.state == 'open'
+
+
+def test_retry_after_is_waited_out(fake, weather):
+    fake.respond((429, {}, {'Retry-After': '0.4'}), (200, WEATHER))
+    success, _ = weather.fetch_weather("Paris")
+    assert success
+    (_, _, first), (_, _, second) = fake.requests
+    assert second - first >= 0.4
+
+
+def test_long_retry_after_fails_fast_and_opens_the_breaker(fake, weather):
+    fake.respond((429, {}, {'Retry-After': '120'}), (200, WEATHER))
+    success, _ = weather.fetch_weather("Paris")
+    assert not success
+    assert len(fake.requests) == 1
+    assert weather.fetch_weather("Paris") == (False, "The weather service is unavailable right now.")
+    assert len(fake.requests) == 1
+
+
+def test_client_errors_do_not_count_against_the_breaker(fake, weather):
+    fake.respond((404, {'message': 'city not found'}))
+    for _ in range(3):
+        assert weather.fetch_weather("Atlantis") == (
+            False, "Could not retrieve weather data. Please check the location and try again.")
+    assert len(fake.requests) == 3
+    assert weather.policy.breaker.state == 'closed'
+
+
+def test_retry_budget_limits_retries_during_an_outage(fake, weather):
+    # Keep the breaker closed so only the budget limits retries
+    weather.policy.breaker.failure_threshold = 100
+    counts = []
+    for _ in range(3):
+        before = len(fake.requests)
+        fake.respond((500, {}))
+        weather.fetch_weather("Paris")
+        counts.append(len(fake.requests) - before)
+    # Three reserve tokens and 0.2 earned per call: two retries, then one, then none
+    assert counts == [3, 2, 1]
+
+
+def test_notion_answers_unavailable_without_calling_it_while_the_breaker_is_open(fake, notion):
+    fake.respond((503, NOTION_DOWN))
+    success, message = notion.sync_tasks()
+    assert not success
+    assert fake.requests[0][:2] == ('POST', '/v1/databases/database/query')
+    assert notion.policy.breaker.state == 'open'
+    requests_before = len(fake.requests)
+    started = time.monotonic()
+    assert notion.read_tasks() == (False, "Notion is unavailable right now.")
+    assert time.monotonic() - started < 0.2
+    assert len(fake.requests) == requests_before
+
+
+def test_notion_sync_resumes_after_the_reset_timeout(fake, notion):
+    fake.respond((503, NOTION_DOWN))
+    notion.sync_tasks()
+    time.sleep(0.35)
+    fake.respond((200, {'object': 'list', 'results': [], 'has_more': False}))
+    assert notion.sync_tasks() == (True, "Tasks synced with Notion.")
+    assert notion.policy.breaker.state == 'closed'
+
+
+def test_breaker_trial_that_never_reports_back_is_given_up_on():
+    breaker = CircuitBreaker("Service", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    # The trial is still running, so nothing else gets through
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_retry_budget_refills_with_calls():
+    budget = RetryBudget(ratio=0.5, reserve=1, max_tokens=2)
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
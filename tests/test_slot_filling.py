@@ -0,0 +1,175 @@
+from types import SimpleNamespace
+
+import pytest
+
+import context_store
+from context_store import ContextStore
+from intent_registry import Slot
+from slot_filling import SlotFiller
+from time_parser import split_time_phrase
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(context_store, 'time', SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def context(clock):
+    return ContextStore(':memory:', ttl=60, max_history=3)
+
+
+def test_values_expire_after_the_ttl(clock, context):
+    context['last_location'] = "Paris"
+    assert context['last_location'] == "Paris" and 'last_location' in context
+    clock.now += 61
+    assert context.get('last_location') is None and 'last_location' not in context
+    with pytest.raises(KeyError):
+        context['last_location']
+
+
+def test_a_value_can_have_its_own_ttl(clock, context):
+    context.set('last_task', {'name': "Buy milk"}, ttl=600)
+    clock.now += 300
+    assert context['last_task'] == {'name': "Buy milk"}
+
+
+def test_max_age_is_checked_against_when_the_value_was_written(clock, context):
+    context['last_task_type'] = "Work"
+    clock.now += 30
+    assert context.get('last_task_type', max_age=20) is None
+    assert context.get('last_task_type', max_age=40) == "Work"
+
+
+def test_pop_removes_the_value(context):
+    context['last_location'] = "Paris"
+    assert context.pop('last_location') == "Paris"
+    assert context.pop('last_location', "gone") == "gone"
+
+
+def test_history_keeps_the_latest_requests_oldest_first(clock, context):
+    for n in range(5):
+        clock.now += 1
+        context.record(f"intent_{n}", {'n': n})
+    assert [intent for intent, _, _ in context.history()] == ['intent_2', 'intent_3', 'intent_4']
+    assert context.history(limit=1) == [('intent_4', {'n': 4}, clock.now)]
+
+
+def test_context_survives_a_restart_but_expired_values_do_not(clock, tmp_path):
+    path = str(tmp_path / "assistant.db")
+    context = ContextStore(path, ttl=60)
+    context['last_location'] = "Paris"
+    context.set('short', "gone soon", ttl=5)
+    context.record('get_weather', {'LOCATION': "Paris"})
+    clock.now += 10
+    reopened = ContextStore(path, ttl=60)
+    assert reopened['last_location'] == "Paris"
+    assert 'short' not in reopened
+    [(intent, entities, _)] = reopened.history()
+    assert (intent, entities) == ('get_weather', {'LOCATION': "Paris"})
+
+
+def test_clear_forgets_everything(context):
+    context['last_location'] = "Paris"
+    context.record('get_weather', {})
+    context.clear()
+    assert 'last_location' not in context and context.history() == []
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("dentist tomorrow at 3pm", ("dentist", "tomorrow at 3pm")),
+    ("tomorrow at 3pm dentist", ("dentist", "tomorrow at 3pm")),
+    ("team lunch on friday", ("team lunch", "on friday")),
+    ("dentist", ("dentist", None)),
+])
+def test_split_time_phrase(text, expected):
+    assert split_time_phrase(text) == expected
+
+
+class Listener:
+    """Answers prompts from a script and remembers them."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+
+    def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return self.answers.pop(0) if self.answers else None
+
+
+EVENT_SLOTS = (
+    Slot('EVENT_NAME', "the event name", missing="Event name is required to add an event."),
+    Slot('TIME', "the event time", kind='time', missing="Event time is required to add an event."),
+)
+TASK_SLOTS = (
+    Slot('TASK_NAME', "the task name", missing="Task name is required to add a task."),
+    Slot('TASK_TYPE', "the task type", required=False, default="General", recall='last_task_type', recall_ttl=600),
+)
+
+
+def test_slots_in_the_command_need_no_questions(context):
+    listen = Listener()
+    assert SlotFiller(listen, context).fill(EVENT_SLOTS, {'EVENT_NAME': "dentist", 'TIME': "at 3pm"}) == (
+        True, {'EVENT_NAME': "dentist", 'TIME': "at 3pm"})
+    assert listen.prompts == []
+
+
+def test_name_and_time_are_asked_in_one_prompt(context):
+    listen = Listener("dentist tomorrow at 3pm")
+    assert SlotFiller(listen, context).fill(EVENT_SLOTS, {}) == (
+        True, {'EVENT_NAME': "dentist", 'TIME': "tomorrow at 3pm"})
+    assert listen.prompts == ["Please tell me the event name and the event time."]
+
+
+def test_only_what_the_reply_left_out_is_asked_again(context):
+    listen = Listener("dentist", "tomorrow at 3pm")
+    success, values = SlotFiller(listen, context).fill(EVENT_SLOTS, {})
+    assert success and values == {'EVENT_NAME': "dentist", 'TIME': "tomorrow at 3pm"}
+    assert listen.prompts[1] == "Please tell me the event time."
+
+
+def test_a_lone_time_slot_takes_the_whole_reply(context):
+    listen = Listener("whenever suits")
+    assert SlotFiller(listen, context).fill(EVENT_SLOTS, {'EVENT_NAME': "dentist"}) == (
+        True, {'EVENT_NAME': "dentist", 'TIME': "whenever suits"})
+
+
+def test_no_reply_to_a_required_slot_fails(context):
+    assert SlotFiller(Listener(), context).fill(EVENT_SLOTS, {'TIME': "at 3pm"}) == (
+        False, "Event name is required to add an event.")
+
+
+def test_questions_stop_after_max_rounds(context):
+    slots = (Slot('EVENT_NAME', "the event name"), Slot('PLACE', "the place", missing="I need a place."))
+    listen = Listener("dentist", "the clinic")
+    # One free-text slot is asked per round, so the place would need a second question
+    assert SlotFiller(listen, context, max_rounds=1).fill(slots, {}) == (False, "I need a place.")
+    assert listen.prompts == ["Please tell me the event name."]
+
+
+def test_optional_slot_is_recalled_from_recent_context(clock, context):
+    context['last_task_type'] = "Work"
+    listen = Listener()
+    assert SlotFiller(listen, context).fill(TASK_SLOTS, {'TASK_NAME': "report"}) == (
+        True, {'TASK_NAME': "report", 'TASK_TYPE': "Work"})
+    assert listen.prompts == []
+
+
+def test_stale_context_is_not_recalled_and_silence_takes_the_default(clock, context):
+    context.set('last_task_type', "Work", ttl=3600)
+    clock.now += 601
+    listen = Listener()
+    assert SlotFiller(listen, context).fill(TASK_SLOTS, {'TASK_NAME': "report"}) == (
+        True, {'TASK_NAME': "report", 'TASK_TYPE': "General"})
+    assert listen.prompts == ["Please tell me the task type."]
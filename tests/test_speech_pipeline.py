@@ -0,0 +1,89 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+import speech_recognition as sr
+
+from speech_pipeline import FallbackBackend, RecognizerBackend, SpeechPipeline
+
+
+class FakeBackend:
+    """Transcribes scripted "audio": text comes back as is, and some words stand for the engines' errors."""
+
+    def __init__(self, name='google', delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.heard = []
+
+    def recognize(self, audio):
+        self.heard.append(audio)
+        time.sleep(self.delay)
+        if audio == 'mumble':
+            raise sr.UnknownValueError()
+        if audio == 'offline':
+            raise sr.RequestError("recognition connection failed")
+        return audio
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = SpeechPipeline(recognizer=None, backend=FakeBackend(), source_factory=None).start()
+    yield pipeline
+    pipeline.stop()
+
+
+def test_results_come_back_in_capture_order(pipeline):
+    for audio in ["what's the weather", 'mumble', 'offline', "read my tasks"]:
+        pipeline.submit_audio(audio)
+    assert [pipeline.next_utterance(timeout=5) for _ in range(4)] == [
+        ('text', "what's the weather"), ('unknown', None),
+        ('error', "recognition connection failed"), ('text', "read my tasks"),
+    ]
+
+
+def test_discard_pending_drops_what_was_captured_before(pipeline):
+    pipeline.backend.delay = 0.05
+    pipeline.submit_audio("the assistant's own voice")
+    pipeline.submit_audio("more of it")
+    pipeline.discard_pending()
+    pipeline.submit_audio("add a task")
+    assert pipeline.next_utterance(timeout=5) == ('text', "add a task")
+    assert pipeline.next_utterance(timeout=0.05) == ('timeout', None)
+
+
+def test_timeout_when_nothing_was_said(pipeline):
+    started = time.monotonic()
+    assert pipeline.next_utterance(timeout=0.1) == ('timeout', None)
+    assert time.monotonic() - started >= 0.1
+
+
+def test_utterance_being_recognized_is_waited_for_past_the_timeout(pipeline):
+    pipeline.backend.delay = 0.3
+    pipeline.submit_audio("add a task")
+    assert pipeline.next_utterance(timeout=0.05) == ('text', "add a task")
+
+
+def test_fallback_is_used_only_when_the_primary_cannot_be_reached():
+    primary, fallback = FakeBackend('google'), FakeBackend('sphinx')
+    pipeline = SpeechPipeline(None, FallbackBackend(primary, fallback), source_factory=None).start()
+    try:
+        pipeline.submit_audio("read my tasks")
+        pipeline.submit_audio('offline')
+        pipeline.submit_audio('mumble')
+        assert pipeline.next_utterance(timeout=5) == ('text', "read my tasks")
+        # The offline engine is asked with the same audio, and fails in its own way here
+        assert pipeline.next_utterance(timeout=5) == ('error', "recognition connection failed")
+        assert pipeline.next_utterance(timeout=5) == ('unknown', None)
+    finally:
+        pipeline.stop()
+    assert primary.heard == ["read my tasks", 'offline', 'mumble']
+    assert fallback.heard == ['offline']
+
+
+def test_recognizer_backend_calls_the_named_engine_with_its_options():
+    calls = []
+    recognizer = SimpleNamespace(recognize_whisper=lambda audio, **options: calls.append((audio, options)) or "hi")
+    backend = RecognizerBackend(recognizer, 'whisper', model='base', language='english')
+    assert backend.name == 'whisper'
+    assert backend.recognize("audio") == "hi"
+    assert calls == [("audio", {'model': 'base', 'language': 'english'})]
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from time_parser import TimeResolver, parse_spec
+
+TZ = 'Europe/London'
+
+
+@pytest.fixture
+def resolver():
+    return TimeResolver(TZ)
+
+
+@pytest.fixture
+def now(resolver):
+    # Wednesday 21 October 2026, 15:30 in London
+    return datetime(2026, 10, 21, 15, 30, tzinfo=resolver.tz)
+
+
+def at(now, days, hour, minute=0):
+    return datetime.combine(now.date() + timedelta(days=days), datetime.min.time().replace(hour=hour, minute=minute),
+                            tzinfo=now.tzinfo)
+
+
+@pytest.mark.parametrize('text, days, hour, minute', [
+    ("tomorrow at 3pm", 1, 15, 0),
+    ("Tomorrow at 3 p.m.", 1, 15, 0),
+    ("today at 17:45", 0, 17, 45),
+    ("the day after tomorrow at noon", 2, 12, 0),
+    ("tonight", 0, 21, 0),
+    ("tonight at 8", 0, 20, 0),
+    ("tomorrow morning", 1, 9, 0),
+    ("tomorrow at 7 in the evening", 1, 19, 0),
+    ("this afternoon", 0, 15, 0),
+    # "at 3" for an event means the afternoon
+    ("friday at 3", 2, 15, 0),
+    ("friday at 10:30 am", 2, 10, 30),
+    ("3 p.m. on thursday", 1, 15, 0),
+    # Today's weekday is today; "next" moves it a week on
+    ("wednesday at 6pm", 0, 18, 0),
+    ("next wednesday", 7, 9, 0),
+    ("monday", 5, 9, 0),
+    # A time on its own is the next time the clock shows it
+    ("4pm", 0, 16, 0),
+    ("10 am", 1, 10, 0),
+    ("midnight", 1, 0, 0),
+])
+def test_common_forms(resolver, now, text, days, hour, minute):
+    assert resolver.resolve(text, now) == at(now, days, hour, minute)
+
+
+@pytest.mark.parametrize('text, delta', [
+    ("in 2 hours", timedelta(hours=2)),
+    ("in 45 minutes", timedelta(minutes=45)),
+    ("in a week", timedelta(weeks=1)),
+    ("three days from now", timedelta(days=3)),
+])
+def test_offsets_from_now(resolver, now, text, delta):
+    assert resolver.resolve(text, now) == now + delta
+
+
+def test_results_are_in_the_configured_timezone(resolver, now):
+    result = resolver.resolve("tomorrow at 9am", now.astimezone(TimeResolver('America/New_York').tz))
+    assert str(result.tzinfo) == TZ
+    assert (result.hour, result.date()) == (9, now.date() + timedelta(days=1))
+
+
+@pytest.mark.parametrize('text', ["tomorrow on friday", "today at 3 on monday", "next thursday fortnight", "",
+                                  "whenever"])
+def test_uncommon_forms_are_not_compiled(text):
+    assert parse_spec(text) is None
+
+
+def test_uncommon_forms_fall_back_to_dateparser(resolver, now):
+    result = resolver.resolve("December 25th at 5pm", now)
+    assert (result.month, result.day, result.hour) == (12, 25, 17)
+    assert result.tzinfo == resolver.tz
+    assert resolver.resolve("", now) is None
+
+
+def test_impossible_clock_time_is_left_to_dateparser(resolver, now, dateparser_calls):
+    resolver.resolve("10:75", now)
+    assert dateparser_calls == ["10:75"]
+
+
+@pytest.fixture
+def dateparser_calls(monkeypatch):
+    import dateparser
+    calls = []
+    parse = dateparser.parse
+
+    def counting_parse(text, *args, **kwargs):
+        calls.append(text)
+        return parse(text, *args, **kwargs)
+
+    monkeypatch.setattr(dateparser, 'parse', counting_parse)
+    return calls
+
+
+def test_fallback_is_cached_per_day(resolver, now, dateparser_calls):
+    first = resolver.resolve("December 25th", now)
+    assert resolver.resolve("december 25th ", now + timedelta(hours=2)) == first
+    assert len(dateparser_calls) == 1
+    # The same words may mean another date tomorrow
+    resolver.resolve("December 25th", now + timedelta(days=1))
+    assert len(dateparser_calls) == 2
+
+
+def test_fallback_relative_to_now_is_not_cached(resolver, now, dateparser_calls):
+    resolver.resolve("2 hours ago", now)
+    resolver.resolve("2 hours ago", now)
+    assert len(dateparser_calls) == 2
+
+
+def test_fallback_cache_is_bounded(now, dateparser_calls):
+    resolver = TimeResolver(TZ, cache_size=2)
+    for text in ("December 25th", "January 3rd", "February 14th"):
+        resolver.resolve(text, now)
+    assert len(resolver.cache) == 2
+    resolver.resolve("December 25th", now)
+    assert len(dateparser_calls) == 4
+
+
+def test_unknown_timezone_uses_the_system_offset():
+    resolver = TimeResolver('Not/AZone')
+    assert resolver.tz_name is None
+    assert resolver.now().utcoffset() is not None
@@ -0,0 +1,103 @@
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ttl_cache, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def wait_for_refresh(cache):
+    deadline = time.perf_counter() + 5
+    while cache.refreshing and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def test_fresh_entry_is_served_from_cache(clock):
+    cache = TTLCache(ttl=10)
+    calls = []
+    loader = lambda: calls.append(1) or (True, 'sunny')
+    assert cache.get_or_load('paris', loader) == (True, 'sunny')
+    clock.now += 9
+    assert cache.get_or_load('paris', loader) == (True, 'sunny')
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_failures_are_not_cached(clock):
+    cache = TTLCache(ttl=10)
+    assert cache.get_or_load('paris', lambda: (False, 'offline')) == (False, 'offline')
+    assert cache.get_or_load('paris', lambda: (True, 'sunny')) == (True, 'sunny')
+    assert cache.stats()['misses'] == 2
+
+
+def test_stale_entry_is_served_while_it_refreshes(clock):
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load('paris', lambda: (True, 'sunny'))
+    clock.now += 50
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return True, 'rain'
+
+    assert cache.get_or_load('paris', slow_loader) == (True, 'sunny')
+    # A second stale read does not start another refresh
+    assert cache.get_or_load('paris', slow_loader) == (True, 'sunny')
+    assert cache.stats()['stale_hits'] == 2
+    release.set()
+    wait_for_refresh(cache)
+    assert cache.get_or_load('paris', lambda: (True, 'never called')) == (True, 'rain')
+
+
+def test_failed_refresh_keeps_the_stale_value(clock):
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load('paris', lambda: (True, 'sunny'))
+    clock.now += 50
+    cache.get_or_load('paris', lambda: (False, 'offline'))
+    wait_for_refresh(cache)
+    assert cache.get_or_load('paris', lambda: (True, 'rain')) == (True, 'sunny')
+
+
+def test_entry_past_the_stale_window_is_loaded_again(clock):
+    cache = TTLCache(ttl=10, stale_ttl=100)
+    cache.get_or_load('paris', lambda: (True, 'sunny'))
+    clock.now += 111
+    assert cache.get_or_load('paris', lambda: (True, 'rain')) == (True, 'rain')
+    assert cache.stats()['misses'] == 2
+
+
+def test_is_fresh_looks_ahead(clock):
+    cache = TTLCache(ttl=10)
+    cache.put('paris', 'sunny')
+    clock.now += 5
+    assert cache.is_fresh('paris')
+    assert cache.is_fresh('paris', within=4)
+    assert not cache.is_fresh('paris', within=5)
+    assert not cache.is_fresh('london')
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_entries=2)
+    cache.put('paris', 1)
+    cache.put('london', 2)
+    cache.get_or_load('paris', lambda: (True, 'unused'))
+    cache.put('rome', 3)
+    assert cache.is_fresh('paris') and cache.is_fresh('rome')
+    assert not cache.is_fresh('london')
@@ -0,0 +1,167 @@
+import time
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import write_queue
+from journal import Journal
+from resilience import ServicePolicy
+from write_queue import RateLimiter, WriteQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(write_queue, 'time', SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+def test_burst_then_refill(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+
+
+def test_tokens_never_exceed_the_burst(clock):
+    limiter = RateLimiter(rate=10, burst=2)
+    clock.now += 60
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def test_acquire_waits_for_the_next_token(clock):
+    limiter = RateLimiter(rate=4, burst=1)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == [pytest.approx(0.25)]
+
+
+class ServiceError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("service unavailable")
+        self.headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+
+
+@pytest.fixture
+def journal():
+    return Journal(':memory:')
+
+
+def test_writes_are_applied_in_the_background(journal):
+    applied = []
+    queue = WriteQueue(journal, 'task', lambda entry: applied.append(entry.payload) or f"page-{entry.key}",
+                       rate=1000)
+    queue.start()
+    keys = queue.enqueue_many([{'name': 'one'}, {'name': 'two'}])
+    assert queue.wait_until_flushed(timeout=5)
+    assert sorted(task['name'] for task in applied) == ['one', 'two']
+    assert queue.pending() == []
+    assert len(set(keys)) == 2
+
+
+def test_failed_write_backs_off_and_keeps_its_key(journal):
+    attempts = []
+    succeed = threading.Event()
+
+    def apply(entry):
+        attempts.append(entry.key)
+        if not succeed.is_set():
+            raise ServiceError()
+        return 'page'
+
+    queue = WriteQueue(journal, 'task', apply, rate=1000, max_backoff=60)
+    key = queue.enqueue({'name': 'one'})
+    queue.flush(queue.pending()[0])
+    entry, = queue.pending()
+    assert entry.attempts == 1
+    # Not due again until its backoff has passed
+    assert journal.due('task', 10) == []
+    succeed.set()
+    queue.nudge()
+    queue.flush(journal.due('task', 10)[0])
+    assert queue.pending() == []
+    assert attempts == [key, key]
+
+
+def test_send_is_counted_before_it_starts(journal):
+    seen = []
+
+    def apply(entry):
+        # A crash here must leave the journal knowing this write may have been sent
+        seen.append(journal.pending('task')[0].attempts)
+        return 'page'
+
+    queue = WriteQueue(journal, 'task', apply, rate=1000)
+    queue.enqueue({'name': 'one'})
+    queue.flush(queue.pending()[0])
+    assert seen == [1] and queue.pending() == []
+
+
+def test_retry_after_extends_the_backoff(journal):
+    def apply(entry):
+        raise ServiceError(retry_after=120)
+
+    queue = WriteQueue(journal, 'task', apply, rate=1000, max_backoff=60)
+    queue.enqueue({'name': 'one'})
+    before = time.time()
+    queue.flush(queue.pending()[0])
+    next_attempt = journal.conn.execute("SELECT next_attempt FROM journal").fetchone()[0]
+    assert next_attempt >= before + 120
+
+
+def test_wait_until_flushed_times_out(journal):
+    queue = WriteQueue(journal, 'task', lambda entry: None, rate=1000)
+    queue.enqueue({'name': 'never started'})
+    assert not queue.wait_until_flushed(timeout=0.05)
+
+
+class Rejected(Exception):
+    """Looks like a Notion API error for a request the service will never accept."""
+
+    def __init__(self, status):
+        super().__init__(f"{status} validation_error")
+        self.status = status
+
+
+def test_rejected_write_is_set_aside_and_reported(journal):
+    failed = []
+
+    def apply(entry):
+        raise Rejected(400)
+
+    queue = WriteQueue(journal, 'task', apply, rate=1000, policy=ServicePolicy("Notion"),
+                       on_failed=lambda entry, error: failed.append(entry.key))
+    queue.start()
+    key = queue.enqueue({'name': 'bad'})
+    # Nothing is left to wait for, so an import does not block on the rejected write
+    assert queue.wait_until_flushed(timeout=5)
+    assert failed == [key] and queue.pending() == []
+    [(entry, error)] = queue.failed()
+    assert entry.key == key and error == "400 validation_error"
+    assert journal.due('task', 10) == [] and journal.retry_now('task') == 0
+
+
+@pytest.mark.parametrize('error', [Rejected(503), Rejected(429), ServiceError()])
+def test_transient_failures_are_retried(journal, error):
+    def apply(entry):
+        raise error
+
+    queue = WriteQueue(journal, 'task', apply, rate=1000, policy=ServicePolicy("Notion"))
+    queue.enqueue({'name': 'one'})
+    queue.flush(queue.pending()[0])
+    assert len(queue.pending()) == 1 and queue.failed() == []
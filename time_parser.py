@@ -0,0 +1,211 @@
+import os
+import re
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+}
+
+UNIT_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800}
+
+# Hour used for a part of the day mentioned without a time ("tomorrow morning"), or for a bare day
+PERIOD_HOURS = {'morning': 9, 'afternoon': 15, 'evening': 19, 'night': 21, None: 9}
+
+NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+UNIT = r"(minute|hour|day|week)s?"
+
+# Each rule matches one piece of a time expression at the current position.
+# A phrase the rules cannot consume completely is left to dateparser.
+RULES = [
+    ('offset', re.compile(r"(?:the\s+)?day\s+after\s+tomorrow\b"), lambda m: 2),
+    ('offset', re.compile(r"today\b"), lambda m: 0),
+    ('tonight', re.compile(r"tonight\b"), lambda m: 0),
+    ('offset', re.compile(r"tomorrow\b"), lambda m: 1),
+    ('weekday', re.compile(r"(?:(this|next|coming)\s+)?(" + "|".join(WEEKDAYS) + r")\b"),
+     lambda m: (WEEKDAYS.index(m.group(2)), m.group(1) == 'next')),
+    ('delta', re.compile(r"in\s+" + NUMBER + r"\s+" + UNIT + r"\b"), lambda m: (m.group(1), m.group(2))),
+    ('delta', re.compile(NUMBER + r"\s+" + UNIT + r"\s+from\s+now\b"), lambda m: (m.group(1), m.group(2))),
+    ('clock', re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\b\.?"),
+     lambda m: (int(m.group(1)) % 12 + (12 if m.group(3) == 'p' else 0), int(m.group(2) or 0), True)),
+    ('clock', re.compile(r"(\d{1,2}):(\d{2})\b"), lambda m: (int(m.group(1)), int(m.group(2)), False)),
+    ('clock', re.compile(r"at\s+(\d{1,2})\b(?!:|\s*[ap]\.?\s*m\b)"), lambda m: (int(m.group(1)), 0, False)),
+    ('clock', re.compile(r"(?:noon|midday)\b"), lambda m: (12, 0, True)),
+    ('clock', re.compile(r"midnight\b"), lambda m: (0, 0, True)),
+    ('period', re.compile(r"(?:in\s+the\s+)?(morning|afternoon|evening|night)\b"), lambda m: (m.group(1), False)),
+    ('period', re.compile(r"this\s+(morning|afternoon|evening)\b"), lambda m: (m.group(1), True)),
+    ('filler', re.compile(r"(?:at|on|by|,)(?:\s+|$)"), lambda m: None),
+]
+
+# Kinds that each name the day, so only one may appear
+DAY_KINDS = ('offset', 'weekday')
+
+SPACE_RE = re.compile(r"\s+")
+
+# Phrases whose meaning depends on the time of day, not just the date, so dateparser results are not cached
+NOW_RELATIVE_RE = re.compile(r"\b(ago|now|hours?|minutes?|seconds?|hrs?|mins?|secs?)\b")
+
+
+@lru_cache(maxsize=1024)
+def parse_spec(text):
+    """Compile a time expression into a spec that can be resolved against any reference time.
+
+    Returns a dict with some of 'offset', 'weekday', 'delta', 'clock' and 'period',
+    or None when the phrase isn't one of the common forms.
+    """
+    text = SPACE_RE.sub(" ", text.lower().strip(" .?!"))
+    spec = {}
+    pos = 0
+    while pos < len(text):
+        if text[pos] == ' ':
+            pos += 1
+            continue
+        for kind, pattern, value in RULES:
+            match = pattern.match(text, pos)
+            if match:
+                break
+        else:
+            return None
+        value = value(match)
+        if kind == 'tonight':
+            spec['offset'] = 0
+            spec.setdefault('period', 'night')
+        elif kind == 'delta':
+            count, unit = value
+            count = NUMBER_WORDS.get(count) or int(count)
+            spec['delta'] = count * UNIT_SECONDS[unit]
+        elif kind == 'period':
+            period, today = value
+            spec['period'] = period
+            if today:
+                spec['offset'] = 0
+        elif kind != 'filler':
+            if kind in spec or (kind in DAY_KINDS and any(day in spec for day in DAY_KINDS)):
+                # "tomorrow on friday": contradictory, let dateparser have a go
+                return None
+            spec[kind] = value
+        pos = match.end()
+    return spec or None
+
+
+def split_time_phrase(text):
+    """Split a reply like "dentist tomorrow at 3pm" into ("dentist", "tomorrow at 3pm").
+
+    The time must be a common form at the end or the start of the text.
+    Returns (text, None) when there is none.
+    """
+    words = text.strip(" .?!").split()
+    for i in range(len(words)):
+        if parse_spec(" ".join(words[i:])):
+            return " ".join(words[:i]), " ".join(words[i:])
+    for i in range(len(words) - 1, 0, -1):
+        if parse_spec(" ".join(words[:i])):
+            return " ".join(words[i:]), " ".join(words[:i])
+    return text, None
+
+
+def local_timezone_name():
+    """Best-effort IANA name of the system timezone, or None."""
+    name = os.getenv("TZ")
+    if name and "/" in name:
+        return name.lstrip(":")
+    path = os.path.realpath("/etc/localtime")
+    if "zoneinfo/" in path:
+        return path.split("zoneinfo/", 1)[1]
+    return None
+
+
+class TimeResolver:
+    """Turns spoken time expressions into timezone-aware datetimes.
+
+    Common forms ("tomorrow at 3pm", "next monday", "in 2 hours") are handled by
+    a compiled parser; anything else falls back to dateparser, whose results are
+    cached per (text, reference day).
+    """
+
+    def __init__(self, timezone=None, cache_size=512):
+        self.tz_name = timezone or local_timezone_name()
+        self.tz = None
+        if self.tz_name:
+            try:
+                from zoneinfo import ZoneInfo
+                self.tz = ZoneInfo(self.tz_name)
+            except Exception as e:
+                logging.error("Unknown timezone %s; using the system offset.", self.tz_name)
+                self.tz_name = None
+        if self.tz is None:
+            self.tz = datetime.now().astimezone().tzinfo
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def resolve(self, text, now=None):
+        """Return an aware datetime for the expression, or None if it can't be understood."""
+        if not text:
+            return None
+        now = now.astimezone(self.tz) if now else self.now()
+        spec = parse_spec(text)
+        if spec is not None:
+            try:
+                return self.resolve_spec(spec, now)
+            except ValueError:
+                # An impossible clock time like 10:75; see what dateparser makes of it
+                pass
+        return self.fallback(text, now)
+
+    def at(self, day, hour, minute=0):
+        return datetime.combine(day, time(hour % 24, minute), tzinfo=self.tz)
+
+    def resolve_spec(self, spec, now):
+        if 'delta' in spec:
+            return now + timedelta(seconds=spec['delta'])
+        period = spec.get('period')
+        hour, minute, explicit = spec.get('clock') or (PERIOD_HOURS[period], 0, True)
+        if not explicit and hour < 12 and (period in ('afternoon', 'evening', 'night') or
+                                           (period is None and hour < 8)):
+            # "at 3" for an event means 3pm; "at 7 in the evening" means 19:00
+            hour += 12
+        today = now.date()
+        if 'weekday' in spec:
+            weekday, next_week = spec['weekday']
+            days_ahead = (weekday - today.weekday()) % 7
+            if next_week and days_ahead == 0:
+                days_ahead = 7
+            return self.at(today + timedelta(days=days_ahead), hour, minute)
+        if 'offset' in spec:
+            return self.at(today + timedelta(days=spec['offset']), hour, minute)
+        # A time on its own means the next time the clock shows it
+        result = self.at(today, hour, minute)
+        if result <= now:
+            result = self.at(today + timedelta(days=1), hour, minute)
+        return result
+
+    def fallback(self, text, now):
+        """Parse with dateparser, cached per (text, reference day) unless the text is relative to now."""
+        key = (text.lower().strip(), now.date())
+        cacheable = not NOW_RELATIVE_RE.search(key[0])
+        if cacheable:
+            with self.lock:
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    return self.cache[key]
+        import dateparser
+        settings = {'RELATIVE_BASE': now.replace(tzinfo=None), 'PREFER_DATES_FROM': 'future'}
+        result = dateparser.parse(text, languages=['en'], settings=settings)
+        if result is not None:
+            result = result.astimezone(self.tz) if result.tzinfo else result.replace(tzinfo=self.tz)
+        if cacheable:
+            with self.lock:
+                self.cache[key] = result
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return result
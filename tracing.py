@@ -0,0 +1,158 @@
+import json
+import time
+import asyncio
+import bisect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in milliseconds for the exported histogram buckets
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+
+class Histogram:
+    """Latency histogram with fixed buckets, plus a window of recent samples for percentiles."""
+
+    def __init__(self, window=1024):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, ms):
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.recent.append(ms)
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        samples = sorted(self.recent)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Tracer:
+    """Collects per-stage (and per-intent) durations for the command pipeline."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, ms, label=None):
+        with self.lock:
+            histogram = self.histograms.get((stage, label))
+            if histogram is None:
+                histogram = self.histograms[(stage, label)] = Histogram()
+            histogram.observe(ms)
+            if label is not None:
+                # Keep an unlabelled roll-up per stage for the status bar
+                overall = self.histograms.get((stage, None))
+                if overall is None:
+                    overall = self.histograms[(stage, None)] = Histogram()
+                overall.observe(ms)
+
+    @contextmanager
+    def span(self, stage, label=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - started) * 1000, label)
+
+    def traced(self, stage, label=None):
+        """Decorator that records each call of the function as a span."""
+        def decorator(func):
+            name = label or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage, name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def percentiles(self, stage, label=None):
+        """Return (p50, p95) in milliseconds, or None when nothing was recorded."""
+        with self.lock:
+            histogram = self.histograms.get((stage, label))
+            if histogram is None or not histogram.count:
+                return None
+            return histogram.percentile(0.5), histogram.percentile(0.95)
+
+    def summary(self):
+        with self.lock:
+            return [
+                {
+                    'stage': stage,
+                    'label': label,
+                    'count': histogram.count,
+                    'mean_ms': histogram.total / histogram.count,
+                    'p50_ms': histogram.percentile(0.5),
+                    'p95_ms': histogram.percentile(0.95),
+                    'buckets': dict(zip([str(bound) for bound in BUCKETS_MS], histogram.buckets)),
+                }
+                for (stage, label), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][0], item[0][1] or ''))
+            ]
+
+    def dump_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus_text(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        lines = ["# TYPE assistant_stage_duration_ms histogram"]
+        with self.lock:
+            for (stage, label), histogram in sorted(self.histograms.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                if label is None and any(key[0] == stage and key[1] is not None for key in self.histograms):
+                    # The roll-up is derivable from the labelled series
+                    continue
+                labels = f'stage="{stage}"' + (f',label="{label}"' if label else '')
+                cumulative = 0
+                for bound, count in zip(BUCKETS_MS, histogram.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else str(bound)
+                    lines.append(f'assistant_stage_duration_ms_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'assistant_stage_duration_ms_sum{{{labels}}} {histogram.total}')
+                lines.append(f'assistant_stage_duration_ms_count{{{labels}}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose /metrics (Prometheus text) and /metrics.json on a local HTTP port."""
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = tracer.prometheus_text().encode(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(tracer.summary()).encode(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+        logging.info("Serving metrics on http://%s:%d/metrics", host, port)
+        return server
+
+
+tracer = Tracer()
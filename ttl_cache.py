@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a TTL and stale-while-revalidate reads."""
+
+    def __init__(self, ttl=600, max_entries=64, stale_ttl=3600):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # How long past the TTL an entry may still be served while it refreshes
+        self.stale_ttl = stale_ttl
+        self.entries = OrderedDict()
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        """Return a cached (True, value), or call loader() and cache it if it succeeds.
+
+        loader must return a (success, value) tuple; failures are never cached.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                    return True, value
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self.entries.move_to_end(key)
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return True, value
+            self.misses += 1
+        success, value = loader()
+        if success:
+            self.put(key, value)
+        return success, value
+
+    def _refresh(self, key, loader):
+        try:
+            success, value = loader()
+            if success:
+                self.put(key, value)
+        except Exception as e:
+            logging.exception("Background cache refresh failed.")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def is_fresh(self, key, within=0):
+        """True if key is cached and will still be within its TTL in `within` seconds."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry is not None and time.monotonic() - entry[1] + within < self.ttl
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'size': len(self.entries),
+            }
@@ -0,0 +1,158 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from resilience import error_status, retry_after
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` calls per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self):
+        """Take a token if one is available right now; never waits."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class WriteQueue:
+    """Replays one kind of journal entry to its remote service in the background.
+
+    Writes are journaled locally first, so they survive restarts and network
+    outages, and are retried with capped exponential backoff until the service
+    accepts them. apply(entry) performs the write, sending entry.key as its
+    idempotency key, and returns the remote id; entry.attempts is the number
+    of earlier sends, which are counted before each send starts. on_applied(entry, remote_id),
+    when given, is called once the journal records the write as applied.
+
+    With a ServicePolicy, an HTTP error it does not count as transient (a 400
+    for an invalid property, say) would fail the same way on every retry, so
+    the entry is marked failed in the journal instead and on_failed(entry, error)
+    is called.
+    """
+
+    def __init__(self, journal, kind, apply, rate=3.0, workers=3, max_backoff=900, name="writer", on_applied=None,
+                 policy=None, on_failed=None):
+        self.journal = journal
+        self.kind = kind
+        self.apply = apply
+        self.on_applied = on_applied
+        self.policy = policy
+        self.on_failed = on_failed
+        self.name = name
+        self.limiter = RateLimiter(rate, burst=workers)
+        self.workers = workers
+        self.max_backoff = max_backoff
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.in_flight = set()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.idle = threading.Condition(self.lock)
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name=f"{self.name}-replay", daemon=True)
+            self.thread.start()
+
+    def enqueue(self, payload, key=None):
+        """Journal one write and schedule it. Returns its idempotency key."""
+        return self.enqueue_many([payload], [key])[0]
+
+    def enqueue_many(self, payloads, keys=None):
+        keys = self.journal.append_many(self.kind, payloads, keys)
+        self.wake.set()
+        return keys
+
+    def pending(self):
+        return self.journal.pending(self.kind)
+
+    def failed(self):
+        """(entry, error) for each write the service rejected, oldest first."""
+        return self.journal.failed(self.kind)
+
+    def rejected(self, exc):
+        """True if the service answered with an error that retrying cannot fix."""
+        return self.policy is not None and error_status(exc) is not None and not self.policy.is_transient(exc)
+
+    def nudge(self):
+        """Retry waiting entries now instead of at the end of their backoff, e.g. after a successful sync."""
+        if self.journal.retry_now(self.kind):
+            self.wake.set()
+
+    def run(self):
+        while True:
+            with self.lock:
+                free = self.workers - len(self.in_flight)
+                entries = self.journal.due(self.kind, free, exclude=set(self.in_flight)) if free else []
+                for entry in entries:
+                    self.in_flight.add(entry.seq)
+            for entry in entries:
+                self.executor.submit(self.flush, entry)
+            # Poll for retries that come due even when nothing new is enqueued
+            self.wake.wait(timeout=1.0)
+            self.wake.clear()
+
+    def flush(self, entry):
+        try:
+            self.limiter.acquire()
+            self.journal.mark_sending(entry.seq)
+            remote_id = self.apply(entry)
+            self.journal.mark_applied(entry.seq, remote_id)
+            if self.on_applied:
+                self.on_applied(entry, remote_id)
+            if entry.attempts:
+                # The service is answering again, so entries backing off from the outage can go now
+                self.nudge()
+        except Exception as e:
+            if self.rejected(e):
+                logging.error("%s rejected %s %s; it will not be retried: %s",
+                              self.policy.name, self.kind, entry.key, e)
+                self.journal.mark_dead(entry.seq, str(e))
+                if self.on_failed:
+                    self.on_failed(entry, str(e))
+                return
+            # Honour a Retry-After from the service when it asks for a longer wait
+            backoff = max(min(self.max_backoff, 2 ** entry.attempts), retry_after(e) or 0)
+            logging.error("Failed to replay %s %s: %s. Retrying in %s seconds...", self.kind, entry.key, e, backoff)
+            self.journal.mark_failed(entry.seq, time.time() + backoff, str(e))
+        finally:
+            with self.lock:
+                self.in_flight.discard(entry.seq)
+                self.idle.notify_all()
+            self.wake.set()
+
+    def wait_until_flushed(self, timeout=None):
+        """Block until every entry of this kind is applied or failed. Returns False if the timeout elapsed first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while self.journal.pending_count(self.kind):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.idle.wait(timeout=1.0 if remaining is None else min(remaining, 1.0))
+        return True